@@ -0,0 +1,24 @@
+"""add user data version
+
+Revision ID: a4e6c1f8d207
+Revises: f2c8d4a7b913
+Create Date: 2025-02-11 14:35:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e6c1f8d207'
+down_revision = 'f2c8d4a7b913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    op.drop_column('users', 'data_version')
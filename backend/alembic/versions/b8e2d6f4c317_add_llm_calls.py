@@ -0,0 +1,46 @@
+"""add llm call telemetry
+
+Revision ID: b8e2d6f4c317
+Revises: a4e6c1f8d207
+Create Date: 2025-02-13 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2d6f4c317'
+down_revision = 'a4e6c1f8d207'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('llm_calls',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('operation', sa.String(), nullable=False),
+        sa.Column('prompt_mode', sa.String(), nullable=True),
+        sa.Column('outcome', sa.String(), nullable=False),
+        sa.Column('error_type', sa.String(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('queue_wait_ms', sa.Float(), nullable=False),
+        sa.Column('first_chunk_ms', sa.Float(), nullable=True),
+        sa.Column('total_ms', sa.Float(), nullable=False),
+        sa.Column('chunk_count', sa.Integer(), nullable=False),
+        sa.Column('response_bytes', sa.Integer(), nullable=False),
+        sa.Column('parse_failures', sa.Integer(), nullable=False),
+        sa.Column('input_tokens', sa.Integer(), nullable=True),
+        sa.Column('output_tokens', sa.Integer(), nullable=True),
+        sa.Column('tokens_estimated', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_llm_calls_id'), 'llm_calls', ['id'], unique=False)
+    op.create_index('ix_llm_calls_started_outcome', 'llm_calls', ['started_at', 'outcome'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_llm_calls_started_outcome', table_name='llm_calls')
+    op.drop_index(op.f('ix_llm_calls_id'), table_name='llm_calls')
+    op.drop_table('llm_calls')
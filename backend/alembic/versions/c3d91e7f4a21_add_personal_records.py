@@ -0,0 +1,49 @@
+"""add personal records index
+
+Revision ID: c3d91e7f4a21
+Revises: b07fb1dd60b4
+Create Date: 2025-02-03 10:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d91e7f4a21'
+down_revision = 'b07fb1dd60b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create personal_records table
+    op.create_table('personal_records',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('exercise_name', sa.String(), nullable=False),
+        sa.Column('record_type', sa.Enum('HEAVIEST_SET', 'ESTIMATED_1RM', 'BEST_VOLUME_DAY', 'REP_MAX', name='recordtype'), nullable=False),
+        sa.Column('reps', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.Column('set_reps', sa.Integer(), nullable=True),
+        sa.Column('exercise_id', sa.Integer(), nullable=True),
+        sa.Column('achieved_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'exercise_name', 'record_type', 'reps', name='uq_personal_records_key')
+    )
+    op.create_index(op.f('ix_personal_records_id'), 'personal_records', ['id'], unique=False)
+
+    # Allow e1RM samples in progress_metrics and index the per-exercise series
+    op.execute("ALTER TYPE metrictype ADD VALUE IF NOT EXISTS 'ESTIMATED_1RM'")
+    op.create_index('ix_progress_metrics_series', 'progress_metrics',
+                    ['user_id', 'exercise_name', 'metric_type', 'timestamp'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_progress_metrics_series', table_name='progress_metrics')
+    op.drop_index(op.f('ix_personal_records_id'), table_name='personal_records')
+    op.drop_table('personal_records')
+    op.execute('DROP TYPE IF EXISTS recordtype')
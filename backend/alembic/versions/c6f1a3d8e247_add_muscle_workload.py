@@ -0,0 +1,154 @@
+"""add acute and chronic workload to muscle tracking
+
+Revision ID: c6f1a3d8e247
+Revises: b8e2d6f4c317
+Create Date: 2025-02-17 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import json
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f1a3d8e247'
+down_revision = 'b8e2d6f4c317'
+branch_labels = None
+depends_on = None
+
+WORKLOAD_COLUMNS = ('muscle_id', 'acute_load', 'chronic_load', 'load_updated_at', 'load_started_at')
+
+# The model as of this revision; the app's may change later
+ACUTE_RATE = 2.0 / (7 + 1)
+CHRONIC_RATE = 2.0 / (28 + 1)
+
+# Tables as of this revision, so the backfill doesn't depend on the app's current models
+workout_sessions = sa.table('workout_sessions',
+    sa.column('id', sa.Integer), sa.column('user_id', sa.Integer), sa.column('start_time', sa.DateTime))
+exercises = sa.table('exercises',
+    sa.column('id', sa.Integer), sa.column('session_id', sa.Integer), sa.column('total_volume', sa.Float),
+    sa.column('reps', sa.JSON), sa.column('weight', sa.JSON))
+muscle_activations = sa.table('muscle_activations',
+    sa.column('exercise_id', sa.Integer), sa.column('muscle_id', sa.SmallInteger),
+    sa.column('estimated_volume', sa.Float))
+muscle_tracking = sa.table('muscle_tracking',
+    sa.column('user_id', sa.Integer), sa.column('muscle_id', sa.SmallInteger), sa.column('last_trained', sa.DateTime),
+    sa.column('acute_load', sa.Float), sa.column('chronic_load', sa.Float),
+    sa.column('load_updated_at', sa.DateTime), sa.column('load_started_at', sa.DateTime))
+
+
+def _as_list(value):
+    # Arrays have been stored as JSON text, sometimes encoded twice
+    while isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _volume(total_volume, reps, weight):
+    if total_volume is not None:
+        return float(total_volume)
+    reps, weight = _as_list(reps), _as_list(weight)
+    if len(reps) == 1:
+        reps = reps * len(weight)
+    if len(weight) == 1:
+        weight = weight * len(reps)
+    volume = 0.0
+    for w, r in zip(weight, reps):
+        try:
+            volume += max(float(w), 0.0) * max(int(r), 0)
+        except (TypeError, ValueError):
+            continue
+    return volume
+
+
+def _backfill(bind):
+    """Fold every logged activation, oldest first, into per-(user, muscle) EWMA state"""
+    history = bind.execute(
+        sa.select(
+            workout_sessions.c.user_id, muscle_activations.c.muscle_id, workout_sessions.c.start_time,
+            exercises.c.total_volume, exercises.c.reps, exercises.c.weight, muscle_activations.c.estimated_volume
+        )
+        .select_from(muscle_activations)
+        .join(exercises, muscle_activations.c.exercise_id == exercises.c.id)
+        .join(workout_sessions, exercises.c.session_id == workout_sessions.c.id)
+        .where(workout_sessions.c.user_id.isnot(None), muscle_activations.c.muscle_id.isnot(None),
+               workout_sessions.c.start_time.isnot(None))
+        .order_by(workout_sessions.c.user_id, muscle_activations.c.muscle_id, workout_sessions.c.start_time)
+    )
+    states = {}
+    for user_id, muscle_id, start_time, total_volume, reps, weight, estimated_volume in history:
+        load = _volume(total_volume, reps, weight) * (estimated_volume or 0.0)
+        state = states.get((user_id, muscle_id))
+        if state is None:
+            states[(user_id, muscle_id)] = {
+                "user_id": user_id, "muscle_id": muscle_id, "acute_load": ACUTE_RATE * load,
+                "chronic_load": CHRONIC_RATE * load, "load_updated_at": start_time,
+                "load_started_at": start_time, "last_trained": start_time,
+            }
+            continue
+        days = (start_time - state["load_updated_at"]).total_seconds() / 86400.0
+        state["acute_load"] = state["acute_load"] * (1 - ACUTE_RATE) ** days + ACUTE_RATE * load
+        state["chronic_load"] = state["chronic_load"] * (1 - CHRONIC_RATE) ** days + CHRONIC_RATE * load
+        state["load_updated_at"] = state["last_trained"] = start_time
+
+    rows = list(states.values())
+    for offset in range(0, len(rows), 1000):
+        op.bulk_insert(muscle_tracking, rows[offset:offset + 1000])
+
+
+def upgrade():
+    # muscle_tracking was only ever created by create_all, so it may not exist yet
+    if not sa.inspect(op.get_bind()).has_table('muscle_tracking'):
+        op.create_table('muscle_tracking',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('muscle_name', sa.String(), nullable=True),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('last_trained', sa.DateTime(), nullable=True),
+            sa.Column('total_volume', sa.Float(), nullable=True),
+            sa.Column('exercise_count', sa.Integer(), nullable=True),
+            sa.Column('weekly_volume', sa.Float(), nullable=True),
+            sa.Column('monthly_volume', sa.Float(), nullable=True),
+            sa.Column('coverage_rating', sa.String(), nullable=True),
+            sa.Column('recovery_status', sa.Float(), nullable=True),
+            sa.Column('week_start', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_muscle_tracking_id'), 'muscle_tracking', ['id'], unique=False)
+        op.create_index(op.f('ix_muscle_tracking_muscle_name'), 'muscle_tracking', ['muscle_name'], unique=False)
+
+    op.add_column('muscle_tracking', sa.Column('muscle_id', sa.SmallInteger(), nullable=True))
+    op.add_column('muscle_tracking', sa.Column('acute_load', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('muscle_tracking', sa.Column('chronic_load', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('muscle_tracking', sa.Column('load_updated_at', sa.DateTime(), nullable=True))
+    op.add_column('muscle_tracking', sa.Column('load_started_at', sa.DateTime(), nullable=True))
+    op.create_foreign_key('muscle_tracking_muscle_id_fkey', 'muscle_tracking', 'muscles',
+                          ['muscle_id'], ['id'])
+    op.create_unique_constraint('uq_muscle_tracking_user_muscle', 'muscle_tracking', ['user_id', 'muscle_id'])
+
+    # Seed the state from existing history with the model applied at ingest
+    _backfill(op.get_bind())
+
+
+def downgrade():
+    # Rows with a muscle_id were all written by this revision; if there are no others,
+    # upgrade created the table (or found it empty) and it goes entirely
+    bind = op.get_bind()
+    legacy_rows = bind.execute(sa.text("SELECT count(*) FROM muscle_tracking WHERE muscle_id IS NULL")).scalar()
+    if not legacy_rows:
+        op.drop_index(op.f('ix_muscle_tracking_muscle_name'), table_name='muscle_tracking')
+        op.drop_index(op.f('ix_muscle_tracking_id'), table_name='muscle_tracking')
+        op.drop_table('muscle_tracking')
+        return
+
+    op.execute("DELETE FROM muscle_tracking WHERE muscle_id IS NOT NULL")
+    op.drop_constraint('uq_muscle_tracking_user_muscle', 'muscle_tracking', type_='unique')
+    op.drop_constraint('muscle_tracking_muscle_id_fkey', 'muscle_tracking', type_='foreignkey')
+    for column in reversed(WORKLOAD_COLUMNS):
+        op.drop_column('muscle_tracking', column)
@@ -0,0 +1,131 @@
+"""add canonical exercise identity
+
+Revision ID: d5a8b2c6e913
+Revises: c3d91e7f4a21
+Create Date: 2025-02-05 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import re
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8b2c6e913'
+down_revision = 'c3d91e7f4a21'
+branch_labels = None
+depends_on = None
+
+# The catalog as of this revision: (canonical name, movement pattern, aliases), already normalized
+CATALOG = (
+    ('squat', 'squat', ('back squat', 'front squat', 'bodyweight squat')),
+    ('deadlift', 'hinge', ('conventional deadlift', 'romanian deadlift', 'sumo deadlift')),
+    ('bench press', 'push', ('flat bench press', 'incline bench press', 'decline bench press')),
+    ('row', 'pull', ('barbell row', 'dumbbell row', 'pendlay row')),
+    ('overhead press', 'push', ('standing press', 'seated press', 'push press')),
+    ('pull up', 'pull', ('chin up', 'neutral grip pull up', 'wide grip pull up')),
+)
+
+# Tables as of this revision, so the seed and backfill don't depend on the app's current models
+canonical_exercises = sa.table('canonical_exercises',
+    sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('movement_pattern', sa.String),
+    sa.column('created_at', sa.DateTime))
+exercise_aliases = sa.table('exercise_aliases',
+    sa.column('alias', sa.String), sa.column('canonical_exercise_id', sa.Integer))
+exercise_templates = sa.table('exercise_templates',
+    sa.column('name', sa.String), sa.column('movement_pattern', sa.String))
+exercises = sa.table('exercises',
+    sa.column('name', sa.String), sa.column('canonical_exercise_id', sa.Integer))
+
+
+def _normalize(name):
+    # Alias key rules as of this revision: lowercase, separators to spaces, no punctuation, singular words
+    text = re.sub(r"[_\-/]+", " ", (name or "").lower())
+    text = re.sub(r"[^a-z0-9 ]+", "", text)
+    words = []
+    for word in text.split():
+        if len(word) > 2 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+def _seed_and_backfill(bind):
+    """Register the catalog and templates, then point existing exercises at their canonical ids"""
+    aliases = {}
+
+    def register(key, movement_pattern):
+        canonical_id = bind.execute(canonical_exercises.insert().values(
+            name=key, movement_pattern=movement_pattern, created_at=sa.func.now()
+        ).returning(canonical_exercises.c.id)).scalar_one()
+        add_alias(key, canonical_id)
+        return canonical_id
+
+    def add_alias(key, canonical_id):
+        bind.execute(exercise_aliases.insert().values(alias=key, canonical_exercise_id=canonical_id))
+        aliases[key] = canonical_id
+
+    for key, movement_pattern, variations in CATALOG:
+        canonical_id = aliases.get(key) or register(key, movement_pattern)
+        for variation in variations:
+            if variation not in aliases:
+                add_alias(variation, canonical_id)
+
+    if sa.inspect(bind).has_table('exercise_templates'):
+        for name, movement_pattern in bind.execute(sa.select(exercise_templates.c.name, exercise_templates.c.movement_pattern)):
+            key = _normalize(name)
+            if key and key not in aliases:
+                register(key, movement_pattern)
+
+    names = bind.execute(sa.select(exercises.c.name).where(exercises.c.name.isnot(None)).distinct()).scalars().all()
+    for name in names:
+        key = _normalize(name)
+        if not key:
+            continue
+        canonical_id = aliases.get(key) or register(key, None)
+        bind.execute(exercises.update().where(exercises.c.name == name).values(canonical_exercise_id=canonical_id))
+
+
+def upgrade():
+    # Create canonical_exercises table
+    op.create_table('canonical_exercises',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('movement_pattern', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_canonical_exercises_id'), 'canonical_exercises', ['id'], unique=False)
+    op.create_index(op.f('ix_canonical_exercises_name'), 'canonical_exercises', ['name'], unique=True)
+
+    # Create exercise_aliases table
+    op.create_table('exercise_aliases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('alias', sa.String(), nullable=False),
+        sa.Column('canonical_exercise_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['canonical_exercise_id'], ['canonical_exercises.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_exercise_aliases_id'), 'exercise_aliases', ['id'], unique=False)
+    op.create_index(op.f('ix_exercise_aliases_alias'), 'exercise_aliases', ['alias'], unique=True)
+
+    # Add canonical FK to exercises
+    op.add_column('exercises', sa.Column('canonical_exercise_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('exercises_canonical_exercise_id_fkey', 'exercises', 'canonical_exercises',
+                          ['canonical_exercise_id'], ['id'])
+    op.create_index(op.f('ix_exercises_canonical_exercise_id'), 'exercises', ['canonical_exercise_id'], unique=False)
+
+    # Seed the catalog and backfill existing exercises with the rules used at ingest as of this revision
+    _seed_and_backfill(op.get_bind())
+
+
+def downgrade():
+    op.drop_index(op.f('ix_exercises_canonical_exercise_id'), table_name='exercises')
+    op.drop_constraint('exercises_canonical_exercise_id_fkey', 'exercises', type_='foreignkey')
+    op.drop_column('exercises', 'canonical_exercise_id')
+    op.drop_index(op.f('ix_exercise_aliases_alias'), table_name='exercise_aliases')
+    op.drop_index(op.f('ix_exercise_aliases_id'), table_name='exercise_aliases')
+    op.drop_table('exercise_aliases')
+    op.drop_index(op.f('ix_canonical_exercises_name'), table_name='canonical_exercises')
+    op.drop_index(op.f('ix_canonical_exercises_id'), table_name='canonical_exercises')
+    op.drop_table('canonical_exercises')
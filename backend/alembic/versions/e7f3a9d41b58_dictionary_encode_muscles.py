@@ -0,0 +1,67 @@
+"""dictionary-encode muscle names
+
+Revision ID: e7f3a9d41b58
+Revises: d5a8b2c6e913
+Create Date: 2025-02-07 11:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7f3a9d41b58'
+down_revision = 'd5a8b2c6e913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    from app.services.muscle_dictionary_service import normalize_muscle_name
+
+    # Create muscles dimension table
+    op.create_table('muscles',
+        sa.Column('id', sa.SmallInteger(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_muscles_name'), 'muscles', ['name'], unique=True)
+
+    op.add_column('muscle_activations', sa.Column('muscle_id', sa.SmallInteger(), nullable=True))
+
+    # Convert existing names with the same normalization used at ingest
+    bind = op.get_bind()
+    raw_names = bind.execute(sa.text(
+        "SELECT DISTINCT muscle_name FROM muscle_activations WHERE muscle_name IS NOT NULL"
+    )).scalars().all()
+    muscle_ids = {}
+    for raw_name in raw_names:
+        name = normalize_muscle_name(raw_name)
+        if not name:
+            continue
+        if name not in muscle_ids:
+            muscle_ids[name] = bind.execute(
+                sa.text("INSERT INTO muscles (name) VALUES (:name) RETURNING id"), {"name": name}
+            ).scalar()
+        bind.execute(
+            sa.text("UPDATE muscle_activations SET muscle_id = :muscle_id WHERE muscle_name = :raw_name"),
+            {"muscle_id": muscle_ids[name], "raw_name": raw_name}
+        )
+
+    op.create_foreign_key('muscle_activations_muscle_id_fkey', 'muscle_activations', 'muscles',
+                          ['muscle_id'], ['id'])
+    op.create_index(op.f('ix_muscle_activations_muscle_id'), 'muscle_activations', ['muscle_id'], unique=False)
+    op.drop_column('muscle_activations', 'muscle_name')
+
+
+def downgrade():
+    op.add_column('muscle_activations', sa.Column('muscle_name', sa.String(), nullable=True))
+    op.execute(
+        "UPDATE muscle_activations SET muscle_name = muscles.name "
+        "FROM muscles WHERE muscles.id = muscle_activations.muscle_id"
+    )
+    op.drop_index(op.f('ix_muscle_activations_muscle_id'), table_name='muscle_activations')
+    op.drop_constraint('muscle_activations_muscle_id_fkey', 'muscle_activations', type_='foreignkey')
+    op.drop_column('muscle_activations', 'muscle_id')
+    op.drop_index(op.f('ix_muscles_name'), table_name='muscles')
+    op.drop_table('muscles')
@@ -0,0 +1,24 @@
+"""add workout session keyset index
+
+Revision ID: f2c8d4a7b913
+Revises: e7f3a9d41b58
+Create Date: 2025-02-10 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8d4a7b913'
+down_revision = 'e7f3a9d41b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_workout_sessions_user_start', 'workout_sessions', ['user_id', 'start_time', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_workout_sessions_user_start', table_name='workout_sessions')
@@ -0,0 +1,49 @@
+from typing import Any, Callable, Dict, List, Sequence
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], max_points: int) -> List[int]:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps, in x order.
+
+    x must be ascending. The first and last points are always kept; every
+    other bucket keeps the point forming the largest triangle with the point
+    kept from the previous bucket and the mean of the next bucket, which
+    preserves peaks and the overall shape. Bucket means and triangle areas are
+    computed with NumPy; only the walk over the max_points buckets is a loop.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return list(range(n))
+
+    # Imported here so booting a worker doesn't pay for NumPy
+    import numpy as np
+
+    xs = np.asarray(x, dtype=np.float64)
+    ys = np.asarray(y, dtype=np.float64)
+
+    # max_points - 2 buckets over the interior points; edges[b]:edges[b + 1] is bucket b
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(xs[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(ys[:n - 1], edges[:-1]) / counts
+    # Each bucket looks ahead to the next one's mean; the last looks at the final point
+    next_x = np.append(mean_x[1:], xs[-1])
+    next_y = np.append(mean_y[1:], ys[-1])
+
+    selected = [0]
+    previous = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        px, py = xs[previous], ys[previous]
+        areas = np.abs((px - next_x[b]) * (ys[lo:hi] - py) - (px - xs[lo:hi]) * (next_y[b] - py))
+        previous = int(lo + np.argmax(areas))
+        selected.append(previous)
+    selected.append(n - 1)
+    return selected
+
+def downsample_series(points: List[Dict[str, Any]], max_points: int,
+                      x: Callable[[Dict[str, Any]], float], y: Callable[[Dict[str, Any]], float]) -> List[Dict[str, Any]]:
+    """At most max_points of a series chosen by LTTB, in the series' original order"""
+    if len(points) <= max_points:
+        return points
+    order = sorted(range(len(points)), key=lambda i: x(points[i]))
+    keep = lttb_indices([x(points[i]) for i in order], [y(points[i]) for i in order], max_points)
+    return [points[i] for i in sorted(order[k] for k in keep)]
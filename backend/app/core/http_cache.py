@@ -0,0 +1,108 @@
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, Iterable, Optional
+from ..models.database import get_db
+from .settings import get_settings
+from ..services.data_version_service import DataVersionService
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of cached payloads changes so clients don't reuse stale bodies
+PAYLOAD_VERSION = 2
+
+# Routes whose window ends "now" change without a data write; their ETags roll over this often
+WINDOW_ETAG_SECONDS = 3600
+
+# Headers a 304 repeats from the response it stands in for
+_REVALIDATION_HEADERS = ("cache-control", "vary")
+
+def cache_policy_headers(cache_control: str, vary: Iterable[str] = ("Accept-Encoding",)) -> Dict[str, str]:
+    """Cache-Control and Vary headers for a policy"""
+    headers = {"Cache-Control": cache_control}
+    vary_header = ", ".join(vary)
+    if vary_header:
+        headers["Vary"] = vary_header
+    return headers
+
+def cache_policy(cache_control: str, vary: Iterable[str] = ("Accept-Encoding",)) -> Callable[[Response], None]:
+    """Build a router dependency that sets Cache-Control and Vary on every response"""
+    headers = cache_policy_headers(cache_control, vary)
+
+    def apply_cache_policy(response: Response):
+        response.headers.update(headers)
+
+    return apply_cache_policy
+
+# Per-user analytics: browsers keep the body but revalidate it with the ETag on every use
+analytics_cache_policy = cache_policy("private, no-cache")
+
+def report_cache_headers() -> Dict[str, str]:
+    """Reports cover days of history, so a few minutes of staleness is acceptable"""
+    return cache_policy_headers(f"private, max-age={get_settings().report_cache_max_age}")
+
+def report_cache_policy(response: Response):
+    """Router dependency applying the report policy; routes returning their own Response pass report_cache_headers()"""
+    response.headers.update(report_cache_headers())
+
+def make_etag(request: Request, user_id: int, data_version: int, window: str = "") -> str:
+    """Strong ETag for a user's response, unique per data version, path, query and time window"""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(
+        f"{PAYLOAD_VERSION}:{user_id}:{data_version}:{window}:{request.url.path}?{query}".encode()
+    ).hexdigest()[:20]
+    return f'"{digest}"'
+
+def utc_timestamp() -> float:
+    return time.time()
+
+def current_window(request: Request) -> str:
+    """Time slot a relative-to-now response belongs to; empty when the query pins start and end"""
+    if "start" in request.query_params and "end" in request.query_params:
+        return ""
+    return str(int(utc_timestamp()) // WINDOW_ETAG_SECONDS)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def _conditional_get(request: Request, response: Response, db: Session, window: str) -> Optional[str]:
+    try:
+        user_id = int(request.query_params["user_id"])
+    except (KeyError, ValueError):
+        # Let the endpoint's own validation report the bad parameter
+        return None
+
+    etag = make_etag(request, user_id, DataVersionService(db).get_version(user_id), window)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers = {k: v for k, v in response.headers.items() if k in _REVALIDATION_HEADERS}
+        raise HTTPException(status_code=304, headers={**headers, "ETag": etag})
+
+    response.headers["ETag"] = etag
+    return etag
+
+def user_etag(request: Request, response: Response, db: Session = Depends(get_db)) -> Optional[str]:
+    """Route dependency answering conditional GETs on per-user data with 304.
+
+    Runs before the endpoint body, so a matching If-None-Match costs one
+    primary-key lookup of the user's data version and no analytics queries.
+    Only for responses that depend on nothing but the user's data.
+    """
+    return _conditional_get(request, response, db, "")
+
+def windowed_user_etag(request: Request, response: Response, db: Session = Depends(get_db)) -> Optional[str]:
+    """user_etag for responses computed over a window ending now (decayed loads, "last N days").
+
+    Those change as time passes even when the data doesn't, so unless the
+    query gives explicit start and end the ETag also changes every
+    WINDOW_ETAG_SECONDS.
+    """
+    return _conditional_get(request, response, db, current_window(request))
@@ -0,0 +1,102 @@
+from collections import deque
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+from threading import Lock
+from typing import Deque, Dict, Optional
+import time
+
+# Number of recent checkout waits kept for the percentile gauges
+RECENT_WAITS = 1024
+
+class PoolMetrics:
+    """Checkout wait times and utilization for one connection pool"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._recent: Deque[float] = deque(maxlen=RECENT_WAITS)
+
+    def observe_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            self._recent.append(seconds)
+
+    def wait_percentile(self, pct: float) -> float:
+        with self._lock:
+            recent = sorted(self._recent)
+        if not recent:
+            return 0.0
+        return recent[min(len(recent) - 1, int(pct / 100 * len(recent)))]
+
+    def snapshot(self, pool: Pool) -> Dict[str, float]:
+        """Current counters plus the pool's live occupancy"""
+        size = pool.size() if isinstance(pool, QueuePool) else 0
+        capacity = size + max(0, getattr(pool, "_max_overflow", 0)) if isinstance(pool, QueuePool) else 0
+        checked_out = pool.checkedout() if isinstance(pool, QueuePool) else 0
+        return {
+            "pool_size": size,
+            "pool_capacity": capacity,
+            "checked_out": checked_out,
+            "utilization": (checked_out / capacity) if capacity else 0.0,
+            "checkouts_total": self.checkouts,
+            "checkout_timeouts_total": self.timeouts,
+            "checkout_wait_seconds_total": self.wait_seconds_total,
+            "checkout_wait_seconds_max": self.wait_seconds_max,
+            "checkout_wait_seconds_p50": self.wait_percentile(50),
+            "checkout_wait_seconds_p99": self.wait_percentile(99),
+        }
+
+class _TimedCheckoutMixin:
+    """Times how long each checkout waits for a connection (queueing plus connect)"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # Keep the same metrics when the pool is recreated (e.g. engine.dispose())
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+class TimedNullPool(_TimedCheckoutMixin, NullPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+def pool_snapshot(pool: Pool) -> Optional[Dict[str, float]]:
+    """Metrics for a pool created by the engine factory, None for untimed pools"""
+    metrics = getattr(pool, "metrics", None)
+    return metrics.snapshot(pool) if metrics else None
+
+def render_prometheus(pool: Pool, prefix: str = "db_pool") -> str:
+    """Pool metrics in the Prometheus text exposition format"""
+    snapshot = pool_snapshot(pool)
+    if snapshot is None:
+        return ""
+    lines = []
+    for name, value in snapshot.items():
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        lines.append(f"{prefix}_{name} {value}")
+    return "\n".join(lines) + "\n"
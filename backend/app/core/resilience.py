@@ -0,0 +1,199 @@
+"""
+Fault-tolerance primitives for calls to slow or flaky upstreams (Bedrock).
+
+- Deadline: one time budget shared by every attempt of a request
+- backoff_delay: capped exponential backoff with full jitter
+- CircuitBreaker: fails fast while the upstream is unhealthy, probes it after a cool-down
+- AIMDLimiter: concurrency limit that grows additively on healthy responses and
+  shrinks multiplicatively on throttling, timeouts or high latency
+"""
+from collections import deque
+from fastapi import HTTPException
+from typing import Callable, Deque, Optional
+import asyncio
+import enum
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+Clock = Callable[[], float]
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+class DeadlineExceededError(TimeoutError):
+    """The request's overall time budget ran out"""
+
+class ConcurrencyLimitError(Exception):
+    """No concurrency slot became free before the deadline"""
+
+class Deadline:
+    """Absolute point in time by which a request must finish"""
+
+    def __init__(self, seconds: float, clock: Clock = time.monotonic):
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: Callable[[], float] = random.random) -> float:
+    """Full-jitter delay before retry number attempt (0-based): uniform in [0, min(cap, base * 2^attempt)]"""
+    return rng() * min(cap, base * (2 ** attempt))
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Opens after failure_threshold failures in a row, rejects calls for
+    recovery_timeout seconds, then lets half_open_max_calls probes through;
+    a successful probe closes it again, a failed one reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Clock = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self.clock() - self._opened_at >= self.recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        state = self.state
+        if state == CircuitState.OPEN:
+            raise CircuitOpenError(self.name, self.recovery_timeout - (self.clock() - self._opened_at))
+        if state == CircuitState.HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                raise CircuitOpenError(self.name, self.recovery_timeout)
+            self._probes += 1
+
+    def abandon_call(self):
+        """A call ended with no verdict (e.g. cancelled); free its half-open probe slot"""
+        if self._state == CircuitState.HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def record_success(self):
+        if self._state != CircuitState.CLOSED:
+            logger.info(f"{self.name} circuit closed")
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != CircuitState.OPEN:
+                logger.warning(f"{self.name} circuit opened after {self._failures} consecutive failures")
+            self._state = CircuitState.OPEN
+            self._opened_at = self.clock()
+
+class AIMDLimiter:
+    """Adaptive concurrency limit (additive increase, multiplicative decrease).
+
+    Each healthy response (fast enough, not throttled) raises the limit by
+    1/limit, i.e. by about one per window of limit calls; each throttle,
+    timeout or response slower than latency_target multiplies it by
+    backoff_ratio. Callers over the limit queue until a slot frees up.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        latency_target: float = 10.0,
+        backoff_ratio: float = 0.5
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self._limit = float(initial_limit)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """Take a slot, waiting up to timeout seconds; raises ConcurrencyLimitError"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted as we gave up; hand the slot straight back
+                self.release()
+            else:
+                waiter.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                raise ConcurrencyLimitError(f"No concurrency slot free (limit {self.limit}, in flight {self.in_flight})")
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def record(self, latency: float, overloaded: bool = False):
+        """Feed one outcome into the limit; overloaded means throttled or timed out"""
+        if overloaded or latency > self.latency_target:
+            self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+        else:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+def upstream_http_error(error: Exception) -> Optional[HTTPException]:
+    """503/504 for resilience failures so clients can back off; None for anything else"""
+    if isinstance(error, CircuitOpenError):
+        return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": str(max(1, round(error.retry_after)))})
+    if isinstance(error, ConcurrencyLimitError):
+        return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "1"})
+    if isinstance(error, DeadlineExceededError):
+        return HTTPException(status_code=504, detail=str(error))
+    return None
@@ -0,0 +1,40 @@
+from fastapi import Response
+from decimal import Decimal
+from typing import Any, Mapping, Optional
+from pydantic import BaseModel
+import orjson
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson does not encode natively"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain dicts/lists (datetimes, enums and numpy values included) to JSON bytes"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class TrustedJSONResponse(Response):
+    """JSON response for data we built ourselves from the database.
+
+    Returning one from an endpoint bypasses FastAPI's response_model validation
+    and jsonable_encoder pass; the route's response_model still documents the
+    schema in OpenAPI, so the content must already match it.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def trusted_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> TrustedJSONResponse:
+    """Build a TrustedJSONResponse, keeping headers that dependencies set on the injected response"""
+    headers: Optional[Mapping[str, str]] = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return TrustedJSONResponse(content, status_code=status_code, headers=headers)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
@@ -13,9 +14,76 @@ class Settings(BaseSettings):
     bedrock_model_id: str = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-haiku-20240307-v1:0")
     agent_id: str = os.getenv("BEDROCK_AGENT_ID", "")
     agent_alias_id: str = os.getenv("BEDROCK_AGENT_ALIAS_ID", "")
+    bedrock_backend: str = os.getenv("BEDROCK_BACKEND", "aws")  # "aws" or "emulator" (offline, see services/agent_emulator.py)
+
+    # Agent Emulator Settings (BEDROCK_BACKEND=emulator)
+    emulator_latency_distribution: str = os.getenv("EMULATOR_LATENCY_DISTRIBUTION", "lognormal")  # fixed, uniform or lognormal
+    emulator_latency_ms: float = float(os.getenv("EMULATOR_LATENCY_MS", "1200"))  # median for lognormal
+    emulator_latency_spread: float = float(os.getenv("EMULATOR_LATENCY_SPREAD", "0.5"))  # lognormal sigma / uniform half-width fraction
+    emulator_chunk_count: int = int(os.getenv("EMULATOR_CHUNK_COUNT", "1"))
+    emulator_throttle_rate: float = float(os.getenv("EMULATOR_THROTTLE_RATE", "0"))
+    emulator_malformed_rate: float = float(os.getenv("EMULATOR_MALFORMED_RATE", "0"))
+    emulator_seed: Optional[int] = int(os.getenv("EMULATOR_SEED")) if os.getenv("EMULATOR_SEED") else None
+
+    # Bedrock Resilience Settings
+    bedrock_request_deadline_seconds: float = float(os.getenv("BEDROCK_REQUEST_DEADLINE_SECONDS", "45"))  # budget for all attempts
+    bedrock_attempt_timeout_seconds: float = float(os.getenv("BEDROCK_ATTEMPT_TIMEOUT_SECONDS", "30"))
+    bedrock_max_attempts: int = int(os.getenv("BEDROCK_MAX_ATTEMPTS", "3"))
+    bedrock_backoff_base_seconds: float = float(os.getenv("BEDROCK_BACKOFF_BASE_SECONDS", "0.5"))
+    bedrock_backoff_max_seconds: float = float(os.getenv("BEDROCK_BACKOFF_MAX_SECONDS", "8"))
+    bedrock_breaker_failure_threshold: int = int(os.getenv("BEDROCK_BREAKER_FAILURE_THRESHOLD", "5"))  # consecutive failures
+    bedrock_breaker_recovery_seconds: float = float(os.getenv("BEDROCK_BREAKER_RECOVERY_SECONDS", "30"))
+    bedrock_concurrency_initial: int = int(os.getenv("BEDROCK_CONCURRENCY_INITIAL", "8"))
+    bedrock_concurrency_min: int = int(os.getenv("BEDROCK_CONCURRENCY_MIN", "1"))
+    bedrock_concurrency_max: int = int(os.getenv("BEDROCK_CONCURRENCY_MAX", "32"))
+    bedrock_latency_target_seconds: float = float(os.getenv("BEDROCK_LATENCY_TARGET_SECONDS", "10"))  # slower responses shrink the limit
+    bedrock_prompt_mode: str = os.getenv("BEDROCK_PROMPT_MODE", "inline")  # "inline", "session" or "agent"; see services/agent_sessions.py
+    bedrock_enable_trace: bool = os.getenv("BEDROCK_ENABLE_TRACE", "false").lower() == "true"  # exact token counts, larger responses
+    bedrock_session_idle_seconds: float = float(os.getenv("BEDROCK_SESSION_IDLE_SECONDS", "540"))  # under the agent's 600s idle TTL
+    bedrock_session_max_turns: int = int(os.getenv("BEDROCK_SESSION_MAX_TURNS", "20"))  # rotate before history outweighs the schema
+    llm_telemetry_enabled: bool = os.getenv("LLM_TELEMETRY_ENABLED", "true").lower() == "true"  # record every call in llm_calls
+    llm_telemetry_batch_size: int = int(os.getenv("LLM_TELEMETRY_BATCH_SIZE", "20"))  # records buffered per insert
+    coalesce_enabled: bool = os.getenv("COALESCE_ENABLED", "true").lower() == "true"  # share identical in-flight agent calls
+    coalesce_redis: bool = os.getenv("COALESCE_REDIS", "false").lower() == "true"  # also across workers
+    coalesce_result_ttl_seconds: float = float(os.getenv("COALESCE_RESULT_TTL_SECONDS", "30"))  # repeats within this window reuse the result
 
     # Database Settings
     database_url: str = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/workout_tracker")
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))  # persistent connections per worker
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "5"))  # extra connections under burst load
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 disables
+    db_pgbouncer_mode: bool = os.getenv("DB_PGBOUNCER_MODE", "false").lower() == "true"  # transaction pooling in front of Postgres
+
+    # Analytics Settings
+    e1rm_formula: str = os.getenv("E1RM_FORMULA", "epley")  # "epley" or "brzycki"
+
+    # HTTP Settings
+    compression_enabled: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    compression_minimum_size: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))  # bytes
+    gzip_level: int = int(os.getenv("GZIP_LEVEL", "6"))
+    brotli_quality: int = int(os.getenv("BROTLI_QUALITY", "5"))  # used only if brotli is installed
+    report_cache_max_age: int = int(os.getenv("REPORT_CACHE_MAX_AGE", "300"))  # seconds
+
+    # Warm-up Settings (run during startup, before the app accepts traffic)
+    warmup_enabled: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    warmup_db_connections: int = int(os.getenv("WARMUP_DB_CONNECTIONS", "2"))
+    warmup_redis: bool = os.getenv("WARMUP_REDIS", "true").lower() == "true"
+    warmup_bedrock: bool = os.getenv("WARMUP_BEDROCK", "true").lower() == "true"
+    warmup_user_id: Optional[int] = int(os.getenv("WARMUP_USER_ID")) if os.getenv("WARMUP_USER_ID") else None  # default: most recently active user
+    warmup_timeout_seconds: float = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "20"))
+
+    # Background Job Settings (LLM processing off the request path)
+    llm_processing_mode: str = os.getenv("LLM_PROCESSING_MODE", "sync")  # "sync" or "async" (202 + job id)
+    job_backend: str = os.getenv("JOB_BACKEND", "local")  # "local" (in-process) or "redis"
+    redis_host: str = os.getenv("REDIS_HOST", "localhost")
+    redis_port: int = int(os.getenv("REDIS_PORT", "6379"))
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))  # worker tasks per API process; 0 with a separate app.worker
+    job_result_ttl_seconds: int = int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+    job_lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "300"))  # a dead worker's job is requeued after this
+    job_max_wait_seconds: float = float(os.getenv("JOB_MAX_WAIT_SECONDS", "30"))  # cap on long-poll waits
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+from sqlalchemy import DateTime, Interval, func, literal, select
+from sqlalchemy.sql.expression import CTE, ColumnElement
+
+BUCKET_UNITS = ("day", "week", "month", "mesocycle")
+MAX_BUCKETS = 5000  # ~13 years of daily buckets
+
+@dataclass(frozen=True)
+class BucketSpec:
+    """Width and alignment of time-series buckets.
+
+    Days start at midnight, weeks and mesocycles on Monday and months on the
+    1st, all in UTC like the stored timestamps. A mesocycle is mesocycle_weeks
+    weeks counted from the start of the requested range.
+    """
+    unit: str = "week"
+    mesocycle_weeks: int = 4
+
+    def __post_init__(self):
+        if self.unit not in BUCKET_UNITS:
+            raise ValueError(f"Bucket must be one of {', '.join(BUCKET_UNITS)}")
+        if self.mesocycle_weeks < 1:
+            raise ValueError("A mesocycle is at least one week")
+
+    @property
+    def step(self) -> Tuple[int, int]:
+        """(months, days) from one bucket start to the next"""
+        if self.unit == "month":
+            return 1, 0
+        return 0, {"day": 1, "week": 7}.get(self.unit, 7 * self.mesocycle_weeks)
+
+    def floor(self, moment: datetime) -> datetime:
+        """Start of the first bucket of a range beginning at moment"""
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.unit == "day":
+            return day
+        if self.unit == "month":
+            return day.replace(day=1)
+        return day - timedelta(days=day.weekday())
+
+    def count(self, start: datetime, end: datetime) -> int:
+        """Number of buckets covering [start, end)"""
+        first = self.floor(start)
+        months, days = self.step
+        if months:
+            whole = (end.year - first.year) * 12 + end.month - first.month
+            return whole + (end > datetime(end.year, end.month, 1))
+        return -(-(end - first) // timedelta(days=days))
+
+def as_utc_naive(moment: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; convert aware datetimes to match"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _advance(moment: ColumnElement, spec: BucketSpec, dialect_name: str) -> ColumnElement:
+    months, days = spec.step
+    if dialect_name == "postgresql":
+        return moment + func.make_interval(0, months, 0, days, type_=Interval)
+    # SQLite date modifiers; buckets start on the 1st so '+1 months' never overflows
+    return func.datetime(moment, f"+{months} months" if months else f"+{days} days", type_=DateTime)
+
+def bucket_series(spec: BucketSpec, start: datetime, end: datetime, dialect_name: str) -> CTE:
+    """Recursive CTE of (bucket_start, bucket_end) rows covering [start, end).
+
+    The portable equivalent of generate_series: the database produces every
+    bucket, including ones with no rows to join, so gaps can be zero-filled in
+    the same statement that aggregates. Recursion stops on a bucket count
+    rather than comparing timestamps, which SQLite stores as text in a
+    different precision than datetime() returns.
+    """
+    first = literal(spec.floor(start), DateTime)
+    buckets = select(
+        first.label("bucket_start"),
+        _advance(first, spec, dialect_name).label("bucket_end"),
+        literal(1).label("n"),
+    ).cte("buckets", recursive=True)
+    return buckets.union_all(
+        select(buckets.c.bucket_end, _advance(buckets.c.bucket_end, spec, dialect_name), buckets.c.n + 1)
+        .where(buckets.c.n < spec.count(start, end))
+    )
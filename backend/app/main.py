@@ -1,14 +1,25 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .routes.chat import router as chat_router
 from .routes.analytics import router as analytics_router
-from .routes.exercise import router as exercise_router
+from .routes.exercise import router as exercise_router, claude_service
 from .routes.workout import router as workout_router
 from .routes.test import router as test_router
-from .database import engine, Base
+from .routes.analysis import router as analysis_router
+from .routes.jobs import router as jobs_router
+from .routes.telemetry import router as telemetry_router
+from .models.database import engine, Base, SessionLocal
+from .services import warmup_service
+from .services.warmup_service import WarmupService
+from .services.job_queue import get_job_queue
+from .services.llm_telemetry_service import get_llm_telemetry
 from .models.user import User
 from .models.exercise import WorkoutSession, Exercise, MuscleActivation
 from .middleware.request_logging import request_logging_middleware
+from .middleware.compression import CompressionMiddleware
+from .core.settings import get_settings
+from .core.pool_metrics import pool_snapshot, render_prometheus
 import logging
 import os
 
@@ -32,23 +43,56 @@ app.add_middleware(
     max_age=3600,
 )
 
-# Create database tables only if not testing
-if not os.getenv("TESTING", "false").lower() == "true":
-    Base.metadata.create_all(bind=engine)
-
 # Add middleware in order
 app.middleware("http")(request_logging_middleware)  # Add request logging first
 
+# Compress large JSON bodies (volume/tracking arrays) on their way out
+settings = get_settings()
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.gzip_level,
+        brotli_quality=settings.brotli_quality
+    )
+
 # Print startup message
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Progressive Overload Backend API")
-    
-    # Log registered routes with detailed information
+
+    # Create database tables at startup rather than import, and only if not testing
+    if not os.getenv("TESTING", "false").lower() == "true":
+        Base.metadata.create_all(bind=engine)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        log_routes()
+
+    # Startup doesn't finish (so nothing is served, /health included) until warm-up is done
+    if settings.warmup_enabled:
+        warmup = WarmupService(
+            engine,
+            SessionLocal,
+            settings,
+            cache_warmers=[claude_service.load_templates]
+        )
+        await warmup.run_with_timeout(settings.warmup_timeout_seconds)
+
+    # Job workers for mode=async requests; set JOB_WORKERS=0 when running app.worker separately
+    if settings.job_workers > 0:
+        get_job_queue().start(settings.job_workers)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await get_job_queue().stop()
+    get_llm_telemetry().flush()
+
+def log_routes():
+    """Log every registered route with detailed information"""
     logger.debug("=== Registered Routes ===")
     for route in app.routes:
         logger.debug(f"\nRoute: {route.path}")
-        logger.debug(f"  Methods: {route.methods}")
+        logger.debug(f"  Methods: {getattr(route, 'methods', None)}")
         logger.debug(f"  Name: {route.name}")
         logger.debug(f"  Endpoint: {route.endpoint.__name__ if hasattr(route, 'endpoint') else 'N/A'}")
         logger.debug(f"  Response Model: {getattr(route, 'response_model', 'N/A')}")
@@ -70,6 +114,10 @@ async def direct_test():
 logger.debug("Registering analytics router...")
 app.include_router(analytics_router, prefix="/api/analytics", tags=["analytics"])
 
+# Register analysis router (its routes carry their own /analysis prefix)
+logger.debug("Registering analysis router...")
+app.include_router(analysis_router, prefix="/api")
+
 # Register test router
 logger.debug("Registering test router...")
 app.include_router(test_router, prefix="/api/test", tags=["test"])
@@ -83,11 +131,11 @@ app.include_router(exercise_router, prefix="/api/exercise", tags=["exercise"])
 logger.debug("Registering workout router...")
 app.include_router(workout_router, prefix="/api/workout", tags=["workout"], responses={404: {"description": "Not found"}})
 
-# Debug print all routes after all routers are registered
-logger.debug("=== All Registered Routes ===")
-for route in app.routes:
-    logger.debug(f"Route: {route.path} [{','.join(route.methods)}] -> {route.endpoint.__name__}")
-logger.debug("===========================")
+logger.debug("Registering jobs router...")
+app.include_router(jobs_router, prefix="/api/jobs", tags=["jobs"])
+
+logger.debug("Registering telemetry router...")
+app.include_router(telemetry_router, prefix="/api/telemetry", tags=["telemetry"])
 
 @app.get("/api/")
 async def root():
@@ -95,4 +143,16 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    report = warmup_service.last_report
+    if report is not None and not report.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "warmup": report.summary()})
+    return {
+        "status": "healthy",
+        "warmup": report.summary() if report else None,
+        "db_pool": pool_snapshot(engine.pool)
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Connection pool metrics in Prometheus text format"""
+    return render_prometheus(engine.pool)
@@ -0,0 +1,186 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Optional
+import logging
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding.strip().lower()] = q
+    return codings
+
+class CompressionMiddleware:
+    """Compresses JSON and text responses with brotli (when installed) or gzip.
+
+    Bodies smaller than minimum_size go out as-is. Streaming responses are
+    compressed chunk by chunk with a sync flush so clients still see each chunk
+    as soon as it is produced.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Pick the best supported coding the client accepts"""
+        codings = parse_accept_encoding(accept_encoding)
+        wildcard = codings.get("*", 0.0)
+        if brotli is not None and codings.get("br", wildcard) > 0:
+            return "br"
+        if codings.get("gzip", wildcard) > 0:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = self.choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+            if encoding:
+                responder = _CompressionResponder(self.app, self, encoding)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+    def make_encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, middleware: CompressionMiddleware, encoding: str) -> None:
+        self.app = app
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send: Optional[Send] = None
+        self.initial_message: Message = {}
+        self.passthrough = False
+        self.started = False
+        self.encoder = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _should_compress(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        if self.initial_message["status"] in (204, 304) or self.initial_message["status"] < 200:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the start message until the first body chunk shows whether to compress
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = not self._should_compress(headers)
+            if not self.passthrough and "accept-encoding" not in headers.get("vary", "").lower():
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if len(body) < self.middleware.minimum_size and not more_body:
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            self.encoder = self.middleware.make_encoder(self.encoding)
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.encoder.compress(body) + self.encoder.flush()
+            else:
+                message["body"] = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        # Remaining chunks of a streaming response
+        if more_body:
+            message["body"] = self.encoder.compress(body) + self.encoder.flush()
+        else:
+            message["body"] = self.encoder.compress(body) + self.encoder.finish()
+        await self.send(message)
@@ -1,22 +1,42 @@
 from .exercise import (
     Exercise, 
+    Muscle,
     MuscleActivation, 
     MuscleTracking,
     ExerciseTemplate,
     WorkoutSession,
-    MuscleActivationLevel
+    MuscleActivationLevel,
+    CanonicalExercise,
+    ExerciseAlias
 )
 from .user import User
+from .progress import (
+    ProgressMetric,
+    PerformanceAggregate,
+    PersonalRecord,
+    MetricType,
+    RecordType
+)
+from .telemetry import LLMCall
 from .database import Base, engine, SessionLocal, get_db
 
 __all__ = [
     'Exercise',
+    'Muscle',
     'MuscleActivation',
     'MuscleTracking',
     'ExerciseTemplate',
     'WorkoutSession',
     'MuscleActivationLevel',
+    'CanonicalExercise',
+    'ExerciseAlias',
     'User',
+    'ProgressMetric',
+    'PerformanceAggregate',
+    'PersonalRecord',
+    'MetricType',
+    'RecordType',
+    'LLMCall',
     'Base',
     'engine',
     'SessionLocal',
@@ -1,11 +1,54 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from ..core.settings import get_settings
+from typing import Any, Dict, Optional
+from ..core.settings import Settings, get_settings
+from ..core.pool_metrics import TimedNullPool, TimedQueuePool
 
-settings = get_settings()
+def engine_options(settings: Settings) -> Dict[str, Any]:
+    """create_engine keyword arguments for the configured database and pool mode"""
+    url = make_url(settings.database_url)
 
-engine = create_engine(settings.database_url)
+    if url.get_backend_name() == "sqlite":
+        options: Dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+        if url.database and url.database != ":memory:":
+            options["poolclass"] = TimedQueuePool
+        return options
+
+    if settings.db_pgbouncer_mode:
+        # PgBouncer owns the pooling; holding our own idle connections would pin its server slots
+        return {"poolclass": TimedNullPool, "pool_pre_ping": settings.db_pool_pre_ping}
+
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_statement_timeout_ms:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
+def create_db_engine(settings: Optional[Settings] = None) -> Engine:
+    """Build the application's engine from settings; the only place engines are configured"""
+    settings = settings or get_settings()
+    db_engine = create_engine(settings.database_url, **engine_options(settings))
+
+    if settings.db_pgbouncer_mode and settings.db_statement_timeout_ms:
+        # PgBouncer rejects startup options and shares server sessions between
+        # clients, so scope the timeout to each transaction instead
+        timeout = int(settings.db_statement_timeout_ms)
+
+        @event.listens_for(db_engine, "begin")
+        def _set_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout}")
+
+    return db_engine
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Table, Enum
+from sqlalchemy import Column, Integer, SmallInteger, String, Float, DateTime, ForeignKey, Table, Enum, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -23,6 +23,7 @@ class Exercise(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     session_id = Column(Integer, ForeignKey('workout_sessions.id'))
     name = Column(String, index=True)
+    canonical_exercise_id = Column(Integer, ForeignKey('canonical_exercises.id'), nullable=True, index=True)
     movement_pattern = Column(String, nullable=True)
     notes = Column(String, nullable=True)
     
@@ -43,6 +44,7 @@ class Exercise(Base):
     # Relationships
     workout_session = relationship("WorkoutSession", back_populates="exercises")
     muscle_activations = relationship("MuscleActivation", back_populates="exercise")
+    canonical_exercise = relationship("CanonicalExercise")
 
     def to_dict(self):
         """Convert exercise to dictionary with proper array handling"""
@@ -58,6 +60,7 @@ class Exercise(Base):
             'id': self.id,
             'session_id': self.session_id,
             'name': self.name,
+            'canonical_exercise_id': self.canonical_exercise_id,
             'movement_pattern': self.movement_pattern,
             'notes': self.notes,
             'num_sets': self.num_sets,
@@ -102,17 +105,30 @@ class MuscleActivationData(BaseModel):
     activation_level: MuscleActivationLevel
     estimated_volume: Optional[float] = None
 
+class Muscle(Base):
+    """Dictionary of muscle names so activations store a small integer id"""
+    __tablename__ = 'muscles'
+
+    # SQLite only autoincrements INTEGER primary keys
+    id = Column(SmallInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+
 class MuscleActivation(Base):
     __tablename__ = 'muscle_activations'
     
     id = Column(Integer, primary_key=True, index=True)
     exercise_id = Column(Integer, ForeignKey('exercises.id'))
-    muscle_name = Column(String, index=True)
+    muscle_id = Column(SmallInteger, ForeignKey('muscles.id'), index=True)
     activation_level = Column(Enum(MuscleActivationLevel))
     estimated_volume = Column(Float, nullable=True)
     
     # Relationships
     exercise = relationship("Exercise", back_populates="muscle_activations")
+    muscle = relationship("Muscle", lazy="joined")
+
+    @property
+    def muscle_name(self) -> Optional[str]:
+        return self.muscle.name if self.muscle else None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert muscle activation to dictionary"""
@@ -125,10 +141,21 @@ class MuscleActivation(Base):
         }
 
 class MuscleTracking(Base):
+    """Per-user, per-muscle training state.
+
+    acute_load and chronic_load are exponentially weighted averages of daily
+    load over ~7 and ~28 days as of load_updated_at. Each stored exercise
+    decays them forward and adds its load, so they never need recomputing
+    from history.
+    """
     __tablename__ = 'muscle_tracking'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'muscle_id', name='uq_muscle_tracking_user_muscle'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    muscle_id = Column(SmallInteger, ForeignKey('muscles.id'), nullable=True)
     muscle_name = Column(String, index=True)
     status = Column(String)
     last_trained = Column(DateTime)
@@ -139,6 +166,10 @@ class MuscleTracking(Base):
     coverage_rating = Column(String)
     recovery_status = Column(Float)
     week_start = Column(DateTime)
+    acute_load = Column(Float, nullable=False, default=0.0)
+    chronic_load = Column(Float, nullable=False, default=0.0)
+    load_updated_at = Column(DateTime, nullable=True)  # Time the loads are decayed to
+    load_started_at = Column(DateTime, nullable=True)  # First workout folded in
     
     # Relationships
     user = relationship("User")
@@ -155,8 +186,35 @@ class ExerciseTemplate(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class CanonicalExercise(Base):
+    """Canonical identity for an exercise, independent of how it was spelled"""
+    __tablename__ = 'canonical_exercises'
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+    movement_pattern = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    aliases = relationship("ExerciseAlias", back_populates="canonical_exercise")
+
+class ExerciseAlias(Base):
+    """Normalized exercise name mapped to its canonical exercise"""
+    __tablename__ = 'exercise_aliases'
+
+    id = Column(Integer, primary_key=True, index=True)
+    alias = Column(String, unique=True, index=True, nullable=False)
+    canonical_exercise_id = Column(Integer, ForeignKey('canonical_exercises.id'), nullable=False)
+
+    # Relationships
+    canonical_exercise = relationship("CanonicalExercise", back_populates="aliases")
+
 class WorkoutSession(Base):
     __tablename__ = 'workout_sessions'
+    __table_args__ = (
+        # Keyset pagination of a user's sessions walks this index newest-first
+        Index('ix_workout_sessions_user_start', 'user_id', 'start_time', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -10,6 +10,13 @@ class MetricType(enum.Enum):
     TOTAL_REPS = "total_reps"
     FREQUENCY = "frequency"
     INTENSITY = "intensity"
+    ESTIMATED_1RM = "estimated_1rm"
+
+class RecordType(enum.Enum):
+    HEAVIEST_SET = "heaviest_set"
+    ESTIMATED_1RM = "estimated_1rm"
+    BEST_VOLUME_DAY = "best_volume_day"
+    REP_MAX = "rep_max"
 
 class ProgressMetric(Base):
     """Stores progress metrics for exercises and muscle groups"""
@@ -26,6 +33,37 @@ class ProgressMetric(Base):
     # Relationships
     user = relationship("User", back_populates="progress_metrics")
 
+    __table_args__ = (
+        # Serves per-exercise time series (e.g. e1RM history) as one index range scan
+        Index("ix_progress_metrics_series", "user_id", "exercise_name", "metric_type", "timestamp"),
+    )
+
+class PersonalRecord(Base):
+    """Current best performance per user, exercise and record type.
+
+    Maintained incrementally when exercises are stored, so reading a record is a
+    single unique-key lookup instead of a scan over every logged set.
+    """
+    __tablename__ = "personal_records"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    exercise_name = Column(String, nullable=False)  # Canonical exercise name
+    record_type = Column(Enum(RecordType), nullable=False)
+    reps = Column(Integer, nullable=False, default=0)  # Rep count for REP_MAX records, 0 otherwise
+    value = Column(Float, nullable=False)
+    weight = Column(Float, nullable=True)  # Weight of the set that set the record
+    set_reps = Column(Integer, nullable=True)  # Reps of the set that set the record
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=True)
+    achieved_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Relationships
+    user = relationship("User", back_populates="personal_records")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "exercise_name", "record_type", "reps", name="uq_personal_records_key"),
+    )
+
 class PerformanceAggregate(Base):
     """Stores aggregated performance data over time periods"""
     __tablename__ = "performance_aggregates"
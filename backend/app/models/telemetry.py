@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, Index
+from datetime import datetime
+from .database import Base
+
+class LLMCall(Base):
+    """One agent invocation (all of its attempts), recorded for latency and reliability reporting"""
+    __tablename__ = "llm_calls"
+
+    id = Column(Integer, primary_key=True, index=True)
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    operation = Column(String, nullable=False, default="invoke_agent")
+    prompt_mode = Column(String, nullable=True)
+    outcome = Column(String, nullable=False)  # success, timeout, throttled, parse_error, circuit_open, ...
+    error_type = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)  # calls actually sent to Bedrock
+    queue_wait_ms = Column(Float, nullable=False, default=0.0)  # waiting for a concurrency slot, all attempts
+    first_chunk_ms = Column(Float, nullable=True)  # last attempt's start to its first completion chunk
+    total_ms = Column(Float, nullable=False)
+    chunk_count = Column(Integer, nullable=False, default=0)
+    response_bytes = Column(Integer, nullable=False, default=0)
+    parse_failures = Column(Integer, nullable=False, default=0)
+    input_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    tokens_estimated = Column(Boolean, nullable=True)
+
+    __table_args__ = (
+        # Reports always scan a time window, optionally per outcome
+        Index("ix_llm_calls_started_outcome", "started_at", "outcome"),
+    )
@@ -9,8 +9,10 @@ class User(Base):
     username = Column(String, unique=True, index=True)
     email = Column(String, unique=True, index=True)
     password = Column(String, nullable=True)  # Store hashed password
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every workout write
     
     workout_sessions = relationship("WorkoutSession", back_populates="user")
     progress_metrics = relationship("ProgressMetric", back_populates="user")
     performance_aggregates = relationship("PerformanceAggregate", back_populates="user")
+    personal_records = relationship("PersonalRecord", back_populates="user")
     insights = relationship("UserInsight", back_populates="user")
@@ -1,8 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime
 from typing import List, Optional
 from ..models.exercise import WorkoutSession, Exercise, MuscleActivation, MuscleActivationLevel
 from ..models.user import User
+from ..services.muscle_dictionary_service import MuscleDictionaryService
 from sqlalchemy import func
 
 class WorkoutRepository:
@@ -47,13 +48,18 @@ class WorkoutRepository:
 
     def get_session_exercises(self, session_id: int) -> List[Exercise]:
         """Get all exercises for a workout session"""
-        return self.db.query(Exercise).filter(Exercise.session_id == session_id).all()
+        return (
+            self.db.query(Exercise)
+            .options(selectinload(Exercise.muscle_activations))
+            .filter(Exercise.session_id == session_id)
+            .all()
+        )
 
     def add_muscle_activation(self, exercise_id: int, muscle_name: str, activation_level: MuscleActivationLevel, volume: float) -> MuscleActivation:
         """Add a muscle activation record for an exercise"""
         activation = MuscleActivation(
             exercise_id=exercise_id,
-            muscle_name=muscle_name,
+            muscle_id=MuscleDictionaryService(self.db).id_for(muscle_name),
             activation_level=activation_level,
             estimated_volume=volume
         )
@@ -88,7 +94,7 @@ class WorkoutRepository:
             .join(WorkoutSession, Exercise.session_id == WorkoutSession.id)
             .filter(
                 WorkoutSession.user_id == user_id,
-                MuscleActivation.muscle_name == muscle_name
+                MuscleActivation.muscle_id == MuscleDictionaryService(self.db).lookup_id(muscle_name)
             )
             .scalar()
         )
@@ -102,7 +108,7 @@ class WorkoutRepository:
             .join(WorkoutSession, Exercise.session_id == WorkoutSession.id)
             .filter(
                 WorkoutSession.user_id == user_id,
-                MuscleActivation.muscle_name == muscle_name
+                MuscleActivation.muscle_id == MuscleDictionaryService(self.db).lookup_id(muscle_name)
             )
             .scalar()
         )
@@ -116,7 +122,7 @@ class WorkoutRepository:
             .join(MuscleActivation, Exercise.id == MuscleActivation.exercise_id)
             .filter(
                 WorkoutSession.user_id == user_id,
-                MuscleActivation.muscle_name == muscle_name
+                MuscleActivation.muscle_id == MuscleDictionaryService(self.db).lookup_id(muscle_name)
             )
             .order_by(WorkoutSession.start_time.desc())
             .first()
@@ -2,13 +2,17 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Dict, List, Optional
 from ..models.database import get_db
+from ..core.http_cache import analytics_cache_policy, user_etag, windowed_user_etag
 from ..services.analysis_service import AnalysisService
+from ..services.personal_record_service import PersonalRecordService, epley_1rm, brzycki_1rm
+from ..models.progress import PersonalRecord, RecordType
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 
 router = APIRouter(
     prefix="/analysis",
-    tags=["analysis"]
+    tags=["analysis"],
+    dependencies=[Depends(analytics_cache_policy)]
 )
 
 class ProgressionResponse(BaseModel):
@@ -30,6 +34,38 @@ class FrequencyResponse(BaseModel):
     consistency_score: float
     days_tracked: int
 
+class PersonalRecordResponse(BaseModel):
+    exercise_name: str
+    record_type: str
+    reps: int
+    value: float
+    weight: Optional[float] = None
+    set_reps: Optional[int] = None
+    epley_1rm: Optional[float] = None
+    brzycki_1rm: Optional[float] = None
+    exercise_id: Optional[int] = None
+    achieved_at: datetime
+
+class EstimatedOneRepMaxPoint(BaseModel):
+    timestamp: datetime
+    estimated_1rm: float
+
+def _to_record_response(record: PersonalRecord) -> PersonalRecordResponse:
+    """Build the API representation of a personal record"""
+    has_set = record.weight is not None and record.set_reps
+    return PersonalRecordResponse(
+        exercise_name=record.exercise_name,
+        record_type=record.record_type.value,
+        reps=record.reps,
+        value=record.value,
+        weight=record.weight,
+        set_reps=record.set_reps,
+        epley_1rm=epley_1rm(record.weight, record.set_reps) if has_set else None,
+        brzycki_1rm=brzycki_1rm(record.weight, record.set_reps) if has_set else None,
+        exercise_id=record.exercise_id,
+        achieved_at=record.achieved_at
+    )
+
 @router.get("/progression/{exercise_name}", response_model=ProgressionResponse)
 async def get_exercise_progression(
     exercise_name: str,
@@ -86,3 +122,44 @@ async def get_workout_frequency(
     """Get workout frequency analysis"""
     analysis_service = AnalysisService(db)
     return analysis_service.analyze_workout_frequency(1, days)  # TODO: Get real user_id
+
+@router.get("/personal-records", response_model=List[PersonalRecordResponse], dependencies=[Depends(user_etag)])
+async def get_personal_records(
+    user_id: int = Query(..., description="User ID to get personal records for"),
+    exercise_name: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get personal records for all exercises, or for a single exercise"""
+    record_service = PersonalRecordService(db)
+    return [_to_record_response(r) for r in record_service.get_records(user_id, exercise_name)]
+
+@router.get("/personal-records/{exercise_name}/{record_type}", response_model=PersonalRecordResponse, dependencies=[Depends(user_etag)])
+async def get_personal_record(
+    exercise_name: str,
+    record_type: RecordType,
+    user_id: int = Query(..., description="User ID to get the record for"),
+    reps: int = Query(default=0, ge=0, description="Rep count for rep_max records"),
+    db: Session = Depends(get_db)
+):
+    """Get a single personal record, e.g. best estimated 1RM or 5-rep max"""
+    record_service = PersonalRecordService(db)
+    record = record_service.get_record(user_id, exercise_name, record_type, reps)
+
+    if not record:
+        raise HTTPException(status_code=404, detail="No record found for this exercise")
+
+    return _to_record_response(record)
+
+@router.get("/e1rm/{exercise_name}", response_model=List[EstimatedOneRepMaxPoint], dependencies=[Depends(windowed_user_etag)])
+async def get_e1rm_history(
+    exercise_name: str,
+    user_id: int = Query(..., description="User ID to get e1RM history for"),
+    days: Optional[int] = Query(default=None, ge=1),
+    db: Session = Depends(get_db)
+):
+    """Get the estimated 1RM time series for an exercise"""
+    record_service = PersonalRecordService(db)
+    return [
+        EstimatedOneRepMaxPoint(timestamp=m.timestamp, estimated_1rm=m.value)
+        for m in record_service.get_e1rm_series(user_id, exercise_name, days)
+    ]
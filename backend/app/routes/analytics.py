@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
-from typing import List, Dict, AsyncGenerator
+from typing import List, Dict, AsyncGenerator, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import func, cast, Date
 from datetime import datetime, timedelta
@@ -12,8 +12,10 @@ from ..models.exercise import (
     MuscleVolumeData
 )
 from ..models.database import get_db
+from ..core.downsampling import downsample_series
+from ..core.http_cache import analytics_cache_policy, windowed_user_etag
+from ..core.responses import trusted_response
 from ..schemas.muscle import MuscleTrackingResponse, MuscleVolumeResponse, VolumeProgressionResponse
-from ..services.bedrock_agent_service import BedrockAgentService
 from ..services.workout_storage_service import WorkoutStorageService
 import logging
 import json
@@ -26,11 +28,9 @@ logger.debug("Creating analytics router...")
 router = APIRouter(
     tags=["analytics"],
     responses={404: {"description": "Not found"}},
+    dependencies=[Depends(analytics_cache_policy)],
 )
 
-# Initialize BedrockAgentService
-bedrock_service = BedrockAgentService()
-
 def get_storage_service(db: Session = Depends(get_db)) -> WorkoutStorageService:
     """Dependency to get WorkoutStorageService instance"""
     return WorkoutStorageService(db)
@@ -50,8 +50,9 @@ async def test_analytics():
     """Test endpoint to verify analytics router is working"""
     return {"status": "Analytics router is working"}
 
-@router.get("/muscle-tracking", response_model=List[MuscleTrackingResponse])
+@router.get("/muscle-tracking", response_model=List[MuscleTrackingResponse], dependencies=[Depends(windowed_user_etag)])
 async def get_muscle_tracking(
+    response: Response,
     user_id: int = Query(..., description="User ID to get tracking data for"),
     storage_service: WorkoutStorageService = Depends(get_storage_service)
 ):
@@ -60,54 +61,81 @@ async def get_muscle_tracking(
         logger.info(f"Getting muscle tracking data for user {user_id}")
         tracking_data = storage_service.get_muscle_tracking(user_id=user_id)
         logger.info(f"Found {len(tracking_data)} muscle tracking entries")
-        return tracking_data
+        return trusted_response(tracking_data, response)
     except Exception as e:
         logger.error(f"Error getting muscle tracking data: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/muscle-volume", response_model=List[MuscleVolumeResponse])
+@router.get("/muscle-volume", response_model=List[MuscleVolumeResponse], dependencies=[Depends(windowed_user_etag)])
 async def get_muscle_volume(
+    response: Response,
     user_id: int = Query(..., description="User ID to get volume data for"),
     timeframe: str = Query(..., regex="^(weekly|monthly)$"),
+    bucket: Optional[str] = Query(None, regex="^(day|week|month|mesocycle)$", description="Bucket width; defaults to day for weekly, week for monthly"),
+    start: Optional[datetime] = Query(None, description="Range start (default: timeframe before end)"),
+    end: Optional[datetime] = Query(None, description="Range end, exclusive (default: now)"),
+    mesocycle_weeks: int = Query(4, ge=1, le=52, description="Weeks per mesocycle bucket"),
     storage_service: WorkoutStorageService = Depends(get_storage_service)
 ):
     """Get volume data for all muscles worked in the specified timeframe"""
     try:
         logger.info(f"Getting muscle volume data for user {user_id} with timeframe {timeframe}")
-        volume_data = storage_service.get_muscle_volume_data(timeframe, user_id=user_id)
+        volume_data = storage_service.get_muscle_volume_data(
+            timeframe, user_id=user_id, bucket=bucket, start=start, end=end, mesocycle_weeks=mesocycle_weeks
+        )
         logger.info(f"Found {len(volume_data)} volume data entries")
-        return volume_data
+        return trusted_response(volume_data, response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting muscle volume data: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/volume-progression", response_model=VolumeProgressionResponse)
+@router.get("/volume-progression", response_model=VolumeProgressionResponse, dependencies=[Depends(windowed_user_etag)])
 async def get_volume_progression(
+    response: Response,
     user_id: int = Query(..., description="User ID to get progression data for"),
     timeframe: str = Query("weekly", description="Timeframe for progression analysis"),
+    bucket: Optional[str] = Query(None, regex="^(day|week|month|mesocycle)$", description="Bucket width; defaults to day for weekly, week for monthly"),
+    start: Optional[datetime] = Query(None, description="Range start (default: timeframe before end)"),
+    end: Optional[datetime] = Query(None, description="Range end, exclusive (default: now)"),
+    mesocycle_weeks: int = Query(4, ge=1, le=52, description="Weeks per mesocycle bucket"),
+    max_points: Optional[int] = Query(None, ge=3, description="Downsample each muscle's series to at most this many points (LTTB)"),
     storage_service: WorkoutStorageService = Depends(get_storage_service)
 ):
     """Get progression data for muscle volume over time"""
     try:
         logger.info(f"Getting volume progression data for user {user_id} with timeframe {timeframe}")
-        volume_data = storage_service.get_muscle_volume_data(timeframe, user_id=user_id)
+        volume_data = storage_service.get_muscle_volume_data(
+            timeframe, user_id=user_id, bucket=bucket, start=start, end=end, mesocycle_weeks=mesocycle_weeks
+        )
         logger.info(f"Found {len(volume_data)} volume data entries")
         
         # Process the data for visualization
-        progression_data = {}
+        series = {}
         for entry in volume_data:
-            muscle_name = entry["muscle_name"]
-            if muscle_name not in progression_data:
-                progression_data[muscle_name] = []
-            progression_data[muscle_name].append({
-                "date": entry["date"].isoformat(),
-                "volume": entry["total_volume"]
-            })
+            series.setdefault(entry["muscle_name"], []).append(entry)
+        
+        if max_points:
+            # Keeps payload and chart render cost bounded however long the history is
+            series = {
+                muscle_name: downsample_series(
+                    entries, max_points, x=lambda e: e["date"].timestamp(), y=lambda e: e["total_volume"]
+                )
+                for muscle_name, entries in series.items()
+            }
+        
+        progression_data = {
+            muscle_name: [{"date": e["date"].isoformat(), "volume": e["total_volume"]} for e in entries]
+            for muscle_name, entries in series.items()
+        }
         
         logger.info(f"Processed data for {len(progression_data)} muscles")
-        return progression_data
+        return trusted_response(progression_data, response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting volume progression data: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List, AsyncGenerator
 from ..services.integration_service import IntegrationService
-from ..services.bedrock_agent_service import BedrockAgentService
+from ..services.bedrock_agent_service import BedrockAgentService, get_bedrock_agent_service
 from ..services.workout_storage_service import WorkoutStorageService
 from sqlalchemy.orm import Session
-from ..models.database import get_db
+from ..models.database import get_db, SessionLocal
+from ..services.job_queue import get_job_queue, job_handler
+from .jobs import JobAcceptedResponse, accepted, processing_mode
+from ..core.responses import trusted_response
+from ..core.resilience import CircuitOpenError, ConcurrencyLimitError, DeadlineExceededError, upstream_http_error
 from datetime import datetime
 from ..models.user import User
 import logging
@@ -19,7 +23,19 @@ router = APIRouter(
     tags=["chat"],
 )
 
-agent_service = BedrockAgentService()
+def get_agent_service(mode: str = Depends(processing_mode)) -> Optional[BedrockAgentService]:
+    """Dependency for the shared Bedrock agent client; 503 if it can't be configured.
+
+    None for mode=async: the job worker resolves its own client, so queueing
+    works on API nodes without AWS credentials.
+    """
+    if mode == "async":
+        return None
+    try:
+        return get_bedrock_agent_service()
+    except ValueError as e:
+        logger.error(f"Bedrock agent unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
 
 class ChatRequest(BaseModel):
     message: str
@@ -54,96 +70,126 @@ async def get_current_user(db: Session = Depends(get_db)) -> User:
         db.refresh(user)
     return user
 
-@router.post("/")
+async def run_chat(message: str, db: Session, bedrock_service: BedrockAgentService) -> Dict[str, Any]:
+    """Send a message to the agent, store the parsed workout and build the chat response"""
+    # TODO: Get actual user ID from auth. Using 1 for now.
+    user_id = 1
+    
+    # Get workout data from Bedrock
+    response = await bedrock_service.invoke_agent(message, user_id=user_id)
+    
+    if not response:
+        raise ValueError("No response received from Bedrock agent")
+    
+    logger.debug(f"Raw response from Claude: {response}")
+    
+    # Parse the response
+    structured_data = response.get("structured_data")
+    display_message = response.get("display_message")
+    
+    if not structured_data:
+        raise ValueError("No structured data found in response")
+        
+    logger.debug(f"Structured data: {structured_data}")
+    logger.debug(f"Exercise data: {structured_data.get('exercise', {})}")
+    logger.debug(f"Sets data: {structured_data.get('exercise', {}).get('sets', {})}")
+    
+    # Store workout data
+    workout_storage = WorkoutStorageService(db)
+    
+    # Create and store session
+    session = workout_storage.create_workout_session(user_id)
+    
+    # Store exercise data
+    exercises = structured_data.get('exercises', [])
+    if not exercises:
+        raise ValueError("No exercises found in structured data")
+        
+    exercise_data = exercises[0]  # Get first exercise
+    exercise = workout_storage.store_exercise_data(
+        session_id=session.id,
+        name=exercise_data.get('name', 'Unknown Exercise'),
+        movement_pattern=exercise_data.get('movement_pattern'),
+        notes=exercise_data.get('notes'),
+        num_sets=exercise_data.get('num_sets'),
+        reps=exercise_data.get('reps'),
+        weight=exercise_data.get('weight'),
+        rpe=exercise_data.get('rpe'),
+        tempo=exercise_data.get('tempo'),
+        total_volume=exercise_data.get('total_volume'),
+        equipment=exercise_data.get('equipment'),
+        difficulty=exercise_data.get('difficulty'),
+        estimated_duration=exercise_data.get('estimated_duration'),
+        rest_period=exercise_data.get('rest_period'),
+        muscle_activations=exercise_data.get('muscle_activations')
+    )
+    
+    # End the session
+    session = workout_storage.end_workout_session(session.id)
+    
+    # Get muscle data
+    volume_data = workout_storage.get_muscle_volume_data(timeframe="weekly", user_id=user_id)
+    tracking_data = workout_storage.get_muscle_tracking(days=30, user_id=user_id)
+    activations = structured_data.get("muscle_activations", [])
+    
+    return {
+        "message": display_message or "Successfully processed your workout",
+        "display_message": None,
+        "structured_data": structured_data,
+        "muscle_data": {
+            "activations": activations,
+            "volume_data": volume_data,
+            "tracking_data": tracking_data
+        },
+        "exercise_id": exercise.id if exercise else None,
+        "workout_data": {
+            "session_id": session.id,
+            "display_message": display_message,
+            "exercise": structured_data.get("exercise", {})
+        },
+        "recommendations": None,
+        "next_steps": None,
+        "session_id": None
+    }
+
+@router.post("/", responses={202: {"model": JobAcceptedResponse}})
 async def chat(
     request: ChatRequest,
-    db: Session = Depends(get_db)
+    http_request: Request,
+    mode: str = Depends(processing_mode),
+    db: Session = Depends(get_db),
+    bedrock_service: Optional[BedrockAgentService] = Depends(get_agent_service)
 ) -> ChatResponse:
-    """Chat endpoint that processes messages and returns responses"""
+    """Chat endpoint that processes messages and returns responses.
+
+    With mode=async the message is queued and a 202 with the job id is returned.
+    """
     try:
-        # TODO: Get actual user ID from auth. Using 1 for now.
-        user_id = 1
-        
-        # Get workout data from Bedrock
-        bedrock_service = BedrockAgentService()
-        response = await bedrock_service.invoke_agent(request.message)
-        
-        if not response:
-            raise ValueError("No response received from Bedrock agent")
-        
-        logger.debug(f"Raw response from Claude: {response}")
-        
-        # Parse the response
-        structured_data = response.get("structured_data")
-        display_message = response.get("display_message")
-        
-        if not structured_data:
-            raise ValueError("No structured data found in response")
-            
-        logger.debug(f"Structured data: {structured_data}")
-        logger.debug(f"Exercise data: {structured_data.get('exercise', {})}")
-        logger.debug(f"Sets data: {structured_data.get('exercise', {}).get('sets', {})}")
-        
-        # Store workout data
-        workout_storage = WorkoutStorageService(db)
-        
-        # Create and store session
-        session = workout_storage.create_workout_session(user_id)
-        
-        # Store exercise data
-        exercises = structured_data.get('exercises', [])
-        if not exercises:
-            raise ValueError("No exercises found in structured data")
-            
-        exercise_data = exercises[0]  # Get first exercise
-        exercise = workout_storage.store_exercise_data(
-            session_id=session.id,
-            name=exercise_data.get('name', 'Unknown Exercise'),
-            movement_pattern=exercise_data.get('movement_pattern'),
-            notes=exercise_data.get('notes'),
-            num_sets=exercise_data.get('num_sets'),
-            reps=exercise_data.get('reps'),
-            weight=exercise_data.get('weight'),
-            rpe=exercise_data.get('rpe'),
-            tempo=exercise_data.get('tempo'),
-            total_volume=exercise_data.get('total_volume'),
-            equipment=exercise_data.get('equipment'),
-            difficulty=exercise_data.get('difficulty'),
-            estimated_duration=exercise_data.get('estimated_duration'),
-            rest_period=exercise_data.get('rest_period'),
-            muscle_activations=exercise_data.get('muscle_activations')
-        )
-        
-        # End the session
-        session = workout_storage.end_workout_session(session.id)
-        
-        # Get muscle data
-        volume_data = workout_storage.get_muscle_volume_data(timeframe="weekly", user_id=user_id)
-        tracking_data = workout_storage.get_muscle_tracking(days=30, user_id=user_id)
-        activations = structured_data.get("muscle_activations", [])
-        
-        # Return response
-        return ChatResponse(
-            message=display_message or "Successfully processed your workout",
-            structured_data=structured_data,
-            muscle_data={
-                "activations": activations,
-                "volume_data": volume_data,
-                "tracking_data": tracking_data
-            },
-            exercise_id=exercise.id if exercise else None,
-            workout_data={
-                "session_id": session.id,
-                "display_message": display_message,
-                "exercise": structured_data.get("exercise", {})
-            }
-        )
+        if mode == "async":
+            job = await get_job_queue().submit("chat", {"message": request.message})
+            return accepted(job, http_request)
+
+        # The volume/tracking arrays come from our own queries,
+        # so they are serialized directly instead of being re-validated
+        return trusted_response(await run_chat(request.message, db, bedrock_service))
         
+    except (CircuitOpenError, ConcurrencyLimitError, DeadlineExceededError) as e:
+        logger.warning(f"Bedrock unavailable: {str(e)}")
+        raise upstream_http_error(e)
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@job_handler("chat")
+async def chat_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Queued chat message, run by a job worker with its own session"""
+    db = SessionLocal()
+    try:
+        return await run_chat(payload["message"], db, get_bedrock_agent_service())
+    finally:
+        db.close()
+
 @router.options("")
 async def chat_options():
     """Handle OPTIONS requests for CORS"""
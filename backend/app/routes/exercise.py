@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional
+from sqlalchemy.orm import Session
+from ..models.database import get_db
 from ..services import MockClaudeService, ExerciseAnalysis
 
 router = APIRouter()
@@ -14,11 +16,12 @@ class WorkoutInput(BaseModel):
     notes: Optional[str] = None
 
 @router.post("/analyze", response_model=ExerciseAnalysis)
-async def analyze_exercise(workout: WorkoutInput):
+async def analyze_exercise(workout: WorkoutInput, db: Session = Depends(get_db)):
     """
     Analyze an exercise description to identify muscles worked and activation levels
     """
     try:
+        claude_service.ensure_templates(db)
         analysis = await claude_service.analyze_exercise(workout.exercise_description)
         return analysis
     except Exception as e:
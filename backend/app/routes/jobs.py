@@ -0,0 +1,67 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import Any, Literal, Optional
+from datetime import datetime
+from ..services.job_queue import Job, get_job_queue
+from ..core.settings import get_settings
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    tags=["jobs"],
+)
+
+class JobAcceptedResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+def processing_mode(mode: Optional[Literal["sync", "async"]] = Query(None)) -> str:
+    """Dependency resolving ?mode=sync|async, defaulting to LLM_PROCESSING_MODE"""
+    return mode or get_settings().llm_processing_mode
+
+def accepted(job: Job, request: Request) -> JSONResponse:
+    """202 response pointing the client at the job's status endpoint"""
+    status_url = str(request.url_for("get_job", job_id=job.id).path)
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status.value, "status_url": status_url},
+        headers={"Location": status_url}
+    )
+
+@router.get("/{job_id}", response_model=JobResponse, name="get_job")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish before answering")
+):
+    """Job status and, once finished, its result or error"""
+    queue = get_job_queue()
+    if wait:
+        job = await queue.wait(job_id, min(wait, get_settings().job_max_wait_seconds))
+    else:
+        job = await queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return JobResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status.value,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
@@ -3,6 +3,7 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..models.database import get_db
+from ..core.http_cache import report_cache_headers, report_cache_policy
 from ..services.report_service import ReportService
 from pydantic import BaseModel
 from datetime import datetime
@@ -10,7 +11,8 @@ from io import StringIO
 
 router = APIRouter(
     prefix="/reports",
-    tags=["reports"]
+    tags=["reports"],
+    dependencies=[Depends(report_cache_policy)]
 )
 
 class ExerciseRecommendationResponse(BaseModel):
@@ -56,12 +58,15 @@ async def export_progress_data(
     """Export progress data in specified format"""
     report_service = ReportService(db)
     data = report_service.export_progress_data(1, format)  # TODO: Get real user_id
+    # The router's cache policy only reaches responses FastAPI builds, not this one
+    headers = report_cache_headers()
     
     if format == "json":
         return StreamingResponse(
             StringIO(data),
             media_type="application/json",
             headers={
+                **headers,
                 "Content-Disposition": f'attachment; filename="progress_report_{datetime.utcnow().date()}.json"'
             }
         )
@@ -70,6 +75,7 @@ async def export_progress_data(
             StringIO(data),
             media_type="text/csv",
             headers={
+                **headers,
                 "Content-Disposition": f'attachment; filename="progress_report_{datetime.utcnow().date()}.csv"'
             }
         )
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Query
+from typing import Any, Dict, Optional
+from ..services.llm_telemetry_service import get_llm_telemetry
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    tags=["telemetry"],
+)
+
+@router.get("/llm")
+async def llm_call_report(
+    hours: float = Query(168, gt=0, le=24 * 90, description="Window size, ending now"),
+    operation: Optional[str] = None
+) -> Dict[str, Any]:
+    """Bedrock call latency percentiles (queue wait, first chunk, total), outcomes and retry rate"""
+    return get_llm_telemetry().report_last(hours, operation=operation)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import Dict, List, Optional
-from ..models.database import get_db
-from ..services.workout_storage_service import WorkoutStorageService
+from ..models.database import get_db, SessionLocal
+from ..services.workout_storage_service import WorkoutStorageService, MAX_SESSION_PAGE_SIZE
 from ..services.integration_service import IntegrationService
+from ..services.job_queue import get_job_queue, job_handler
+from ..core.responses import trusted_response
+from ..core.resilience import CircuitOpenError, ConcurrencyLimitError, DeadlineExceededError, upstream_http_error
+from .jobs import JobAcceptedResponse, accepted, processing_mode
 from ..models.exercise import WorkoutSession, MuscleActivationLevel, Exercise, MuscleActivationData
 from pydantic import BaseModel
 from datetime import datetime
@@ -31,6 +35,10 @@ class WorkoutSessionResponse(BaseModel):
     end_time: Optional[datetime] = None
     total_volume: Optional[float] = None
 
+class WorkoutSessionPageResponse(BaseModel):
+    sessions: List[WorkoutSessionResponse]
+    next_cursor: Optional[str] = None
+
 class ExerciseRequest(BaseModel):
     session_id: int
     exercise_name: str
@@ -52,6 +60,7 @@ class ExerciseResponse(BaseModel):
     id: int
     session_id: int
     name: str
+    canonical_exercise_id: Optional[int] = None
     movement_pattern: Optional[str] = None
     notes: Optional[str] = None
     num_sets: Optional[int] = None
@@ -81,6 +90,7 @@ class ProcessWorkoutResponse(BaseModel):
     id: int
     session_id: int
     name: str
+    canonical_exercise_id: Optional[int] = None
     movement_pattern: Optional[str] = None
     notes: Optional[str] = None
     num_sets: Optional[int] = None
@@ -111,15 +121,27 @@ async def start_workout(request: StartWorkoutRequest, db: Session = Depends(get_
         logger.error(f"Error starting workout session: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/process", response_model=ProcessWorkoutResponse)
+@router.post("/process", response_model=ProcessWorkoutResponse, responses={202: {"model": JobAcceptedResponse}})
 async def process_workout(
     request: ProcessWorkoutRequest,
+    http_request: Request,
+    mode: str = Depends(processing_mode),
     db: Session = Depends(get_db)
 ):
-    """Process workout text through Bedrock and store results"""
+    """Process workout text through Bedrock and store results.
+
+    With mode=async the work is queued and a 202 with the job id is returned.
+    """
     try:
         logger.debug(f"Processing workout for session {request.session_id}")
         logger.debug(f"Workout text: {request.workout_text}")
+
+        if mode == "async":
+            job = await get_job_queue().submit(
+                "process_workout",
+                {"session_id": request.session_id, "workout_text": request.workout_text}
+            )
+            return accepted(job, http_request)
         
         # Process workout through integration service
         integration_service = IntegrationService(db)
@@ -131,10 +153,25 @@ async def process_workout(
             
         return result
         
+    except (CircuitOpenError, ConcurrencyLimitError, DeadlineExceededError) as e:
+        logger.warning(f"Bedrock unavailable: {str(e)}")
+        raise upstream_http_error(e)
     except Exception as e:
         logger.error(f"Error processing workout: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@job_handler("process_workout")
+async def process_workout_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Queued workout processing, run by a job worker with its own session"""
+    db = SessionLocal()
+    try:
+        result = await IntegrationService(db).process_workout(payload["session_id"], payload["workout_text"])
+        if isinstance(result, dict) and "error" in result:
+            raise ValueError(result["error"])
+        return result
+    finally:
+        db.close()
+
 @router.post("/end")
 async def end_workout(
     request: Dict[str, int],
@@ -198,23 +235,33 @@ async def store_exercise(request: ExerciseRequest, db: Session = Depends(get_db)
         logger.error(f"Error storing exercise: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/user-sessions/{user_id}", response_model=List[WorkoutSessionResponse])
-async def get_user_sessions(user_id: int, db: Session = Depends(get_db)):
-    """Get all workout sessions for a user"""
+@router.get("/user-sessions/{user_id}", response_model=WorkoutSessionPageResponse)
+async def get_user_sessions(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=MAX_SESSION_PAGE_SIZE, description="Maximum sessions per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    start_date: Optional[datetime] = Query(None, description="Only sessions starting at or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only sessions starting before this time"),
+    db: Session = Depends(get_db)
+):
+    """Get a page of workout sessions for a user, newest first"""
     logger.debug(f"Getting sessions for user {user_id}")
     try:
         storage_service = WorkoutStorageService(db)
-        sessions = db.query(WorkoutSession).filter(WorkoutSession.user_id == user_id).all()
+        sessions, next_cursor = storage_service.list_user_sessions(
+            user_id,
+            limit=limit,
+            cursor=cursor,
+            start_date=start_date,
+            end_date=end_date
+        )
         logger.debug(f"Found {len(sessions)} sessions")
-        return [
-            WorkoutSessionResponse(
-                id=session.id,
-                start_time=session.start_time,
-                end_time=session.end_time,
-                total_volume=session.total_volume
-            )
-            for session in sessions
-        ]
+        return WorkoutSessionPageResponse(
+            sessions=[WorkoutSessionResponse(**session) for session in sessions],
+            next_cursor=next_cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting user sessions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -226,24 +273,24 @@ async def get_workout_summary(session_id: int, db: Session = Depends(get_db)):
     try:
         storage_service = WorkoutStorageService(db)
         
-        # Get the session
-        session = storage_service.get_workout_session(session_id)
+        # Get the session with its exercises and activations in a fixed number of queries
+        session = storage_service.get_session_graph(session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Workout session not found")
         
-        # Get all exercises for this session
-        exercises = storage_service.get_session_exercises(session_id)
+        exercises = sorted(session.exercises, key=lambda ex: ex.id)
         
         # Calculate total volume
         total_volume = sum(ex.total_volume or 0 for ex in exercises)
         
-        return WorkoutSummaryResponse(
-            session_id=session.id,
-            start_time=session.start_time,
-            end_time=session.end_time,
-            total_volume=total_volume,
-            exercises=[ExerciseResponse(**ex.to_dict()) for ex in exercises]
-        )
+        # Rows come straight from our own tables, so skip re-validating every exercise
+        return trusted_response({
+            "session_id": session.id,
+            "start_time": session.start_time,
+            "end_time": session.end_time,
+            "total_volume": total_volume,
+            "exercises": [ex.to_dict() for ex in exercises]
+        })
     except Exception as e:
         logger.error(f"Error getting workout summary: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -14,6 +14,9 @@ class MuscleTrackingResponse(BaseModel):
     monthly_volume: float
     coverage_rating: str
     recovery_status: float
+    acute_load: float = 0.0
+    chronic_load: float = 0.0
+    acute_chronic_ratio: Optional[float] = None
     week_start: datetime
 
     class Config:
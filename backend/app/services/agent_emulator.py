@@ -0,0 +1,199 @@
+"""
+Offline stand-in for the bedrock-agent-runtime invoke_agent API.
+
+Answers from the local exercise catalog (EXERCISE_PATTERNS) in the JSON format
+the agent is prompted for, streamed as completion chunks after a sampled
+latency. Throttling and malformed output can be injected at configurable
+rates. Select it with BEDROCK_BACKEND=emulator; no AWS credentials or network
+are needed.
+"""
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+from .agent_sessions import estimate_tokens
+from .exercise_matcher import ExerciseMatcher
+import asyncio
+import json
+import logging
+import math
+import random
+import re
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+SETS_PATTERN = re.compile(r"(\d+)\s*[x×]\s*(\d+)", re.IGNORECASE)
+WEIGHT_PATTERN = re.compile(r"(?:@|at)?\s*(\d+(?:\.\d+)?)\s*(lbs?|pounds?|kg|kilos?)\b", re.IGNORECASE)
+RPE_PATTERN = re.compile(r"rpe\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+TEMPO_PATTERN = re.compile(r"\b(\d-\d-\d(?:-\d)?)\b")
+# Newlines and semicolons always separate exercises; commas only when another sets x reps follows
+SEGMENT_SPLIT = re.compile(r"[\n;]+|,\s*(?=[a-z][^,\n;]*\d+\s*[x×]\s*\d+)", re.IGNORECASE)
+KG_TO_LBS = 2.20462
+
+@dataclass
+class EmulatorConfig:
+    latency_distribution: str = "lognormal"  # fixed, uniform or lognormal
+    latency_ms: float = 1200.0  # fixed value, uniform mean, or lognormal median
+    latency_spread: float = 0.5  # lognormal sigma, or uniform half-width as a fraction of latency_ms
+    first_chunk_fraction: float = 0.9  # share of the latency spent before the first chunk
+    chunk_count: int = 1  # answer bytes are split across this many chunks
+    throttle_rate: float = 0.0  # probability of a ThrottlingException
+    malformed_rate: float = 0.0  # probability of truncated or non-JSON output
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_settings(cls, settings) -> "EmulatorConfig":
+        return cls(
+            latency_distribution=settings.emulator_latency_distribution,
+            latency_ms=settings.emulator_latency_ms,
+            latency_spread=settings.emulator_latency_spread,
+            chunk_count=settings.emulator_chunk_count,
+            throttle_rate=settings.emulator_throttle_rate,
+            malformed_rate=settings.emulator_malformed_rate,
+            seed=settings.emulator_seed,
+        )
+
+def throttling_error():
+    """A botocore ClientError as Bedrock raises it when shedding load"""
+    from botocore.exceptions import ClientError
+
+    return ClientError(
+        {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"},
+         "ResponseMetadata": {"HTTPStatusCode": 429}},
+        "InvokeAgent"
+    )
+
+class BedrockAgentEmulator:
+    """Emulates invoke_agent; pass .client as BedrockAgentService's client_factory"""
+
+    def __init__(self, config: Optional[EmulatorConfig] = None, matcher: Optional[ExerciseMatcher] = None):
+        self.config = config or EmulatorConfig()
+        if self.config.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Emulator latency distribution must be one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+        self.matcher = matcher or ExerciseMatcher.from_catalog()
+        self.rng = random.Random(self.config.seed)
+        self.calls = 0
+
+    async def client(self) -> "BedrockAgentEmulator":
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def sample_latency(self) -> float:
+        """One response latency in seconds from the configured distribution"""
+        config = self.config
+        if config.latency_distribution == "fixed":
+            ms = config.latency_ms
+        elif config.latency_distribution == "uniform":
+            half_width = config.latency_ms * config.latency_spread
+            ms = self.rng.uniform(config.latency_ms - half_width, config.latency_ms + half_width)
+        else:
+            ms = self.rng.lognormvariate(math.log(config.latency_ms), config.latency_spread)
+        return max(0.0, ms) / 1000
+
+    async def invoke_agent(self, **params) -> Dict[str, Any]:
+        for name in ("agentId", "agentAliasId", "sessionId", "inputText"):
+            if name not in params:
+                raise ValueError(f"Missing required parameter: {name}")
+        self.calls += 1
+
+        if self.rng.random() < self.config.throttle_rate:
+            # Throttles come back quickly, before any model work
+            await asyncio.sleep(self.sample_latency() * 0.05)
+            raise throttling_error()
+
+        reply = self.build_reply(extract_workout(params["inputText"]))
+        body = json.dumps(reply).encode()
+        if self.rng.random() < self.config.malformed_rate:
+            body = self._malform(body)
+
+        return {
+            "completion": self._stream(params, body, self.sample_latency()),
+            "contentType": "application/json",
+            "sessionId": params["sessionId"],
+        }
+
+    async def _stream(self, params: Dict[str, Any], body: bytes, latency: float) -> AsyncIterator[Dict[str, Any]]:
+        count = max(1, self.config.chunk_count)
+        await asyncio.sleep(latency * self.config.first_chunk_fraction)
+        if params.get("enableTrace"):
+            yield self._usage_trace(params["inputText"], body)
+        size = math.ceil(len(body) / count) or 1
+        pieces = [body[i:i + size] for i in range(0, len(body), size)] or [b""]
+        gap = latency * (1 - self.config.first_chunk_fraction) / max(1, len(pieces) - 1)
+        for i, piece in enumerate(pieces):
+            if i:
+                await asyncio.sleep(gap)
+            yield {"chunk": {"bytes": piece}}
+
+    def _usage_trace(self, input_text: str, body: bytes) -> Dict[str, Any]:
+        return {"trace": {"trace": {"orchestrationTrace": {"modelInvocationOutput": {"metadata": {"usage": {
+            "inputTokens": estimate_tokens(input_text),
+            "outputTokens": estimate_tokens(body.decode(errors="ignore")),
+        }}}}}}}
+
+    def _malform(self, body: bytes) -> bytes:
+        if self.rng.random() < 0.5:
+            return body[: max(1, len(body) // 2)]
+        return b"I'm sorry, I couldn't analyze that workout."
+
+    def build_reply(self, workout_text: str) -> Dict[str, Any]:
+        """The agent's JSON answer for a workout, per the service's response schema"""
+        exercises = [
+            exercise for exercise in (self.parse_exercise(segment) for segment in SEGMENT_SPLIT.split(workout_text))
+            if exercise is not None
+        ]
+        lines = [
+            f"{e['name']}: {e['num_sets']} sets, {e['total_volume']:.0f} lbs total volume"
+            for e in exercises
+        ]
+        return {
+            "display_message": "\n".join(lines) or "I couldn't find any exercises in that workout.",
+            "structured_data": {"exercises": exercises},
+        }
+
+    def parse_exercise(self, segment: str) -> Optional[Dict[str, Any]]:
+        sets = SETS_PATTERN.search(segment)
+        if not sets:
+            return None
+        num_sets, reps = int(sets.group(1)), int(sets.group(2))
+
+        weight = 0.0
+        weight_match = WEIGHT_PATTERN.search(segment, sets.end())
+        if weight_match:
+            weight = float(weight_match.group(1))
+            if weight_match.group(2).lower().startswith("k"):
+                weight = round(weight * KG_TO_LBS, 1)
+
+        name_text = segment[:sets.start()].strip(" -:.") or segment
+        match = self.matcher.best_match(name_text)
+        entry = self.matcher.entries[match.key] if match else None
+        rpe = RPE_PATTERN.search(segment)
+        tempo = TEMPO_PATTERN.search(segment)
+
+        return {
+            "name": entry.key.replace("_", " ").title() if entry else name_text.title(),
+            "movement_pattern": entry.movement_pattern.title() if entry else "Unknown",
+            "num_sets": num_sets,
+            "reps": [reps] * num_sets,
+            "weight": [weight] * num_sets,
+            "rpe": float(rpe.group(1)) if rpe else None,
+            "tempo": tempo.group(1) if tempo else None,
+            "total_volume": num_sets * reps * weight,
+            "notes": None,
+            "equipment": entry.equipment_needed[0].title() if entry and entry.equipment_needed else None,
+            "difficulty": "Intermediate",
+            "estimated_duration": num_sets * 3,
+            "rest_period": 120 if reps <= 6 else 90,
+            "muscle_activations": [dict(activation) for activation in entry.muscle_activations] if entry else [],
+        }
+
+def extract_workout(input_text: str) -> str:
+    """The user's workout out of an inputText built by BedrockAgentService.build_input"""
+    marker = input_text.rfind("User workout:")
+    text = input_text[marker + len("User workout:"):] if marker >= 0 else input_text
+    return text.split("\n\nResponse:")[0].strip()
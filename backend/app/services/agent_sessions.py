@@ -0,0 +1,86 @@
+"""
+Token-lean agent invocation: prompt modes, per-user session reuse and token accounting.
+
+Prompt modes (BEDROCK_PROMPT_MODE):
+- inline:  the whitespace-compacted response schema is sent with every message
+- session: the schema is sent on the first turn of a per-user agent session,
+           later turns rely on the session's conversation history
+- agent:   the schema lives in the agent's own instructions; only the workout is sent
+"""
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional
+import math
+import re
+import time
+import uuid
+
+PROMPT_MODES = ("inline", "session", "agent")
+
+# Rough characters-per-token for English/JSON with Claude's tokenizer
+CHARS_PER_TOKEN = 4
+
+def compact_prompt(prompt: str) -> str:
+    """Collapse indentation and line breaks; the schema reads the same in far fewer tokens"""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+@dataclass
+class TokenUsage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    # True when counted from text length because no trace usage was reported
+    estimated: bool = True
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+def usage_from_trace(events: Iterable[Dict[str, Any]]) -> Optional[TokenUsage]:
+    """Sum model usage from agent trace events; None if no event reported any"""
+    usage = None
+    for event in events:
+        trace = event.get("trace", {}).get("trace", {})
+        for step in trace.values():
+            metadata = step.get("modelInvocationOutput", {}).get("metadata", {}) if isinstance(step, dict) else {}
+            counts = metadata.get("usage")
+            if counts:
+                usage = usage or TokenUsage(estimated=False)
+                usage.input_tokens += counts.get("inputTokens", 0)
+                usage.output_tokens += counts.get("outputTokens", 0)
+    return usage
+
+@dataclass
+class AgentSession:
+    session_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    turns: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+    @property
+    def primed(self) -> bool:
+        """Whether an earlier turn already carried the schema"""
+        return self.turns > 0
+
+class AgentSessionRegistry:
+    """Per-user agent sessions, rotated before Bedrock's idle timeout and once history gets long"""
+
+    def __init__(self, idle_seconds: float = 540, max_turns: int = 20):
+        self.idle_seconds = idle_seconds
+        self.max_turns = max_turns
+        self._sessions: Dict[Any, AgentSession] = {}
+        self._lock = Lock()
+
+    def get(self, user_id: Any) -> AgentSession:
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None or now - session.last_used > self.idle_seconds or session.turns >= self.max_turns:
+                session = self._sessions[user_id] = AgentSession()
+            return session
+
+    def complete_turn(self, session: AgentSession):
+        with self._lock:
+            session.turns += 1
+            session.last_used = time.monotonic()
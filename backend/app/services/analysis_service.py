@@ -1,10 +1,11 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, case
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from ..models.progress import ProgressMetric, PerformanceAggregate, MetricType
-from ..models.exercise import WorkoutSession, Exercise, MuscleActivation, MuscleActivationLevel
-import numpy as np
+from ..models.exercise import WorkoutSession, Exercise, MuscleActivation, MuscleActivationLevel, CanonicalExercise
+from .muscle_dictionary_service import MuscleDictionaryService
+import statistics
 from dataclasses import dataclass
 import logging
 
@@ -61,8 +62,10 @@ class AnalysisService:
         if not first_half or not second_half:
             return None
             
-        prev_avg = np.mean(first_half)
-        current_avg = np.mean(second_half)
+        return self._build_progression(statistics.fmean(first_half), statistics.fmean(second_half))
+
+    def _build_progression(self, prev_avg: float, current_avg: float) -> ProgressionMetrics:
+        """Build progression metrics from the averages of two consecutive periods"""
         percent_change = ((current_avg - prev_avg) / prev_avg) * 100
         
         trend = "stable"
@@ -80,21 +83,44 @@ class AnalysisService:
     
     def analyze_volume_progression(self, user_id: int, 
                                  timeframe_days: int = 90) -> Dict[str, ProgressionMetrics]:
-        """Analyze volume progression for all exercises"""
-        # Get all exercises for the user
-        exercises = (
-            self.db.query(Exercise.name)
-            .join(WorkoutSession)
-            .filter(WorkoutSession.user_id == user_id)
-            .distinct()
+        """Analyze volume progression for all exercises.
+
+        Exercises are grouped on their canonical id, so different spellings of
+        the same movement share one history. Both period averages come from a
+        single grouped query.
+        """
+        now = datetime.utcnow()
+        period_start = now - timedelta(days=timeframe_days)
+        mid_point = now - timedelta(days=timeframe_days // 2)
+        
+        rows = (
+            self.db.query(
+                CanonicalExercise.name,
+                func.avg(case(
+                    (WorkoutSession.start_time < mid_point, Exercise.total_volume),
+                    else_=None
+                )).label("previous_value"),
+                func.avg(case(
+                    (WorkoutSession.start_time >= mid_point, Exercise.total_volume),
+                    else_=None
+                )).label("current_value")
+            )
+            .select_from(Exercise)
+            .join(WorkoutSession, Exercise.session_id == WorkoutSession.id)
+            .join(CanonicalExercise, Exercise.canonical_exercise_id == CanonicalExercise.id)
+            .filter(
+                WorkoutSession.user_id == user_id,
+                WorkoutSession.start_time >= period_start,
+                Exercise.total_volume.isnot(None)
+            )
+            .group_by(Exercise.canonical_exercise_id, CanonicalExercise.name)
             .all()
         )
         
         results = {}
-        for (exercise_name,) in exercises:
-            metrics = self.calculate_progressive_overload(user_id, exercise_name, timeframe_days)
-            if metrics:
-                results[exercise_name] = metrics
+        for exercise_name, previous_value, current_value in rows:
+            if previous_value and current_value is not None:
+                results[exercise_name] = self._build_progression(float(previous_value), float(current_value))
                 
         return results
     
@@ -172,7 +198,7 @@ class AnalysisService:
         # Get all muscle activations in the period
         activations = (
             self.db.query(
-                MuscleActivation.muscle_name,
+                MuscleActivation.muscle_id,
                 func.sum(MuscleActivation.estimated_volume).label("total_volume"),
                 func.count(MuscleActivation.id).label("frequency"),
                 func.max(WorkoutSession.end_time).label("last_trained")
@@ -183,7 +209,7 @@ class AnalysisService:
                 WorkoutSession.user_id == user_id,
                 WorkoutSession.start_time >= period_start
             )
-            .group_by(MuscleActivation.muscle_name)
+            .group_by(MuscleActivation.muscle_id)
             .all()
         )
         
@@ -193,15 +219,17 @@ class AnalysisService:
         # Calculate total volume across all muscles
         total_volume = sum(activation[1] for activation in activations)
         
+        muscle_names = MuscleDictionaryService(self.db).names_for(a.muscle_id for a in activations)
+        
         return [
             MuscleBalance(
-                muscle_name=muscle_name,
+                muscle_name=muscle_names[muscle_id],
                 total_volume=volume,
                 relative_emphasis=(volume / total_volume) * 100 if total_volume > 0 else 0,
                 frequency=freq,
                 last_trained=last_trained
             )
-            for muscle_name, volume, freq, last_trained in activations
+            for muscle_id, volume, freq, last_trained in activations
         ]
         
     def analyze_workout_frequency(self, user_id: int, days: int = 30) -> Dict[str, Any]:
@@ -239,8 +267,8 @@ class AnalysisService:
             intervals.append(interval)
             
         if intervals:
-            std_dev = np.std(intervals)
-            mean_interval = np.mean(intervals)
+            std_dev = statistics.pstdev(intervals)
+            mean_interval = statistics.fmean(intervals)
             # Lower coefficient of variation = more consistent
             cv = (std_dev / mean_interval) if mean_interval > 0 else float('inf')
             consistency_score = max(0, min(100, 100 * (1 - cv)))
@@ -1,51 +1,176 @@
 import os
 import json
 import time
-import boto3
-import aioboto3
-from typing import Generator, Optional, Dict, Any, Union, List, Tuple, AsyncGenerator
+from typing import Generator, Optional, Dict, Any, Union, List, Tuple, AsyncGenerator, Awaitable, Callable
 from dotenv import load_dotenv
-from botocore.exceptions import ClientError
-from botocore.eventstream import EventStream
 import logging
 import uuid
 from datetime import datetime, timedelta
 import random
 import asyncio
-from ..core.settings import Settings
+from ..core.settings import get_settings
+from ..core.resilience import (
+    AIMDLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    ConcurrencyLimitError,
+    Deadline,
+    DeadlineExceededError,
+    backoff_delay,
+)
+from .request_coalescer import RequestCoalescer, build_coalescer, coalescing_key
+from .llm_telemetry_service import LLMCallRecord, LLMTelemetryService, get_llm_telemetry
+from .agent_sessions import (
+    PROMPT_MODES,
+    AgentSession,
+    AgentSessionRegistry,
+    TokenUsage,
+    compact_prompt,
+    estimate_tokens,
+    usage_from_trace,
+)
+from functools import lru_cache
 import traceback
 
 logger = logging.getLogger(__name__)
 
+# Error codes meaning Bedrock is shedding load rather than rejecting the request
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+    "ServiceUnavailableException",
+}
+
+# Error codes for failures on Bedrock's side, which a later attempt may not hit
+SERVER_ERROR_CODES = {
+    "InternalServerException",
+    "InternalFailure",
+    "DependencyFailedException",
+    "BadGatewayException",
+    "ModelNotReadyException",
+}
+
+def _error_response(error: Exception) -> Tuple[Optional[str], Optional[int]]:
+    """(error code, HTTP status) of a botocore ClientError-shaped exception"""
+    response = getattr(error, "response", None)
+    if not isinstance(response, dict):
+        return None, None
+    return response.get("Error", {}).get("Code"), response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+
+def is_overload_error(error: Exception) -> bool:
+    """True for timeouts and throttling responses, which should shrink the concurrency limit"""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    code, _ = _error_response(error)
+    return code in THROTTLING_ERROR_CODES
+
+def is_transient_error(error: Exception) -> bool:
+    """True for timeouts, throttling and 5xx responses, the only failures worth retrying.
+
+    Anything else (validation or access errors, unparseable replies) fails the
+    same way every time, and says nothing about Bedrock's health.
+    """
+    if is_overload_error(error):
+        return True
+    code, status = _error_response(error)
+    return code in SERVER_ERROR_CODES or (isinstance(status, int) and status >= 500)
+
+def classify_outcome(error: BaseException, call: LLMCallRecord) -> str:
+    """Telemetry outcome label for an invocation that raised"""
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, ConcurrencyLimitError):
+        return "concurrency_limited"
+    if isinstance(error, DeadlineExceededError):
+        return "deadline_exceeded"
+    if isinstance(error, asyncio.CancelledError):
+        return "cancelled"
+    if isinstance(error, Exception) and is_overload_error(error):
+        return "timeout" if isinstance(error, asyncio.TimeoutError) else "throttled"
+    if isinstance(error, ValueError) and call.parse_failures:
+        return "parse_error"
+    return "error"
+
 class BedrockAgentService:
-    def __init__(self):
+    def __init__(
+        self,
+        client_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[AIMDLimiter] = None,
+        coalescer: Optional[RequestCoalescer] = None,
+        telemetry: Optional[LLMTelemetryService] = None
+    ):
         load_dotenv()
         
         # Load settings
-        self.settings = Settings()
+        self.settings = get_settings()
         
         # Validate AWS credentials
         self.aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
         self.aws_secret_key = os.getenv('AWS_SECRET_ACCESS_KEY')
         self.aws_region = os.getenv('AWS_REGION', 'us-west-2')
-        
-        if not self.aws_access_key or not self.aws_secret_key:
-            raise ValueError("AWS credentials (AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY) are required")
-            
-        self.session = aioboto3.Session(
-            aws_access_key_id=self.aws_access_key,
-            aws_secret_access_key=self.aws_secret_key,
-            region_name=self.aws_region
-        )
-        logger.info("Successfully initialized Bedrock client")
+
+        if client_factory is None and self.settings.bedrock_backend == "emulator":
+            from .agent_emulator import BedrockAgentEmulator, EmulatorConfig
+
+            client_factory = BedrockAgentEmulator(EmulatorConfig.from_settings(self.settings)).client
+            logger.info("Using the offline Bedrock agent emulator")
+
+        # An injected factory (emulator, test fake) needs no AWS setup
+        self.client_factory = client_factory or self._get_bedrock_client
+        if client_factory is None:
+            if not self.aws_access_key or not self.aws_secret_key:
+                raise ValueError("AWS credentials (AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY) are required")
+                
+            # aioboto3 pulls in botocore and aiohttp; import it only once a client is needed
+            import aioboto3
+
+            self.session = aioboto3.Session(
+                aws_access_key_id=self.aws_access_key,
+                aws_secret_access_key=self.aws_secret_key,
+                region_name=self.aws_region
+            )
+            logger.info("Successfully initialized Bedrock client")
             
-        self.max_retries = 3
-        self.retry_delay = 1  # seconds
         self.agent_id = self.settings.agent_id
         self.agent_alias_id = self.settings.agent_alias_id
 
+        # Shared by every request in this process (the service is a singleton)
+        self.breaker = breaker or CircuitBreaker(
+            "bedrock",
+            failure_threshold=self.settings.bedrock_breaker_failure_threshold,
+            recovery_timeout=self.settings.bedrock_breaker_recovery_seconds
+        )
+        self.limiter = limiter or AIMDLimiter(
+            initial_limit=self.settings.bedrock_concurrency_initial,
+            min_limit=self.settings.bedrock_concurrency_min,
+            max_limit=self.settings.bedrock_concurrency_max,
+            latency_target=self.settings.bedrock_latency_target_seconds
+        )
+        self.coalescer = coalescer or build_coalescer(self.settings)
+
+        # Token-lean invocation; see agent_sessions for the prompt modes
+        if self.settings.bedrock_prompt_mode not in PROMPT_MODES:
+            raise ValueError(f"BEDROCK_PROMPT_MODE must be one of {', '.join(PROMPT_MODES)}")
+        self.prompt_mode = self.settings.bedrock_prompt_mode
+        self.enable_trace = self.settings.bedrock_enable_trace
+        self.compact_system_prompt = compact_prompt(self._get_system_prompt())
+        self.sessions = AgentSessionRegistry(
+            idle_seconds=self.settings.bedrock_session_idle_seconds,
+            max_turns=self.settings.bedrock_session_max_turns
+        )
+        self.usage_totals = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+
+        # Per-call latency/outcome records for the telemetry endpoint
+        self.telemetry = telemetry
+        if telemetry is None and self.settings.llm_telemetry_enabled:
+            self.telemetry = get_llm_telemetry()
+
     async def _get_bedrock_client(self):
         """Get an async Bedrock client with proper credentials"""
+        import aioboto3
+
         return aioboto3.Session().client(
             'bedrock-agent-runtime',  # Use bedrock-agent-runtime for Agent API
             aws_access_key_id=self.aws_access_key,
@@ -53,96 +178,241 @@ class BedrockAgentService:
             region_name=self.aws_region
         )
 
-    async def invoke_agent(self, message: str, max_retries: int = 3) -> Dict[str, Any]:
-        """Invoke the Bedrock agent with retry logic"""
-        retry_count = 0
+    async def invoke_agent(
+        self,
+        message: str,
+        max_retries: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Invoke the Bedrock agent; identical in-flight messages share one call.
+
+        Pass user_id to reuse that user's agent session in session prompt mode.
+        """
+        if self.coalescer is None:
+            return await self._invoke_with_retries(message, max_retries, user_id)
+        return await self.coalescer.run(
+            coalescing_key(message, self._coalescing_scope(user_id)),
+            lambda: self._invoke_with_retries(message, max_retries, user_id)
+        )
+
+    def _coalescing_scope(self, user_id: Optional[int]) -> str:
+        """Replies in a user's agent session depend on that session, so only that user shares them"""
+        if self.prompt_mode == "session" and user_id is not None:
+            return f"{self.prompt_mode}:user:{user_id}"
+        return self.prompt_mode
+
+    def build_input(self, message: str, include_schema: bool) -> str:
+        """inputText for one call, with or without the compacted response schema"""
+        if include_schema:
+            return f"{self.compact_system_prompt}\n\nUser workout: {message}\n\nResponse:"
+        return f"User workout: {message}"
+
+    def _select_session(self, user_id: Optional[int]) -> Tuple[Optional[AgentSession], str, bool]:
+        """(reused session or None, session id, whether the schema must be sent)"""
+        if self.prompt_mode == "session" and user_id is not None:
+            session = self.sessions.get(user_id)
+            return session, session.session_id, not session.primed
+        return None, str(uuid.uuid4()), self.prompt_mode != "agent"
+
+    async def _invoke_with_retries(
+        self,
+        message: str,
+        max_retries: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Run the attempts for one invocation and record its telemetry"""
+        call = LLMCallRecord(prompt_mode=self.prompt_mode)
+        try:
+            response = await self._attempt_with_retries(message, max_retries, user_id, call)
+            call.outcome = "success"
+            return response
+        except BaseException as e:
+            call.outcome = classify_outcome(e, call)
+            call.error_type = type(e).__name__
+            raise
+        finally:
+            call.finish()
+            if self.telemetry is not None:
+                self.telemetry.record(call)
+
+    async def _attempt_with_retries(
+        self,
+        message: str,
+        max_retries: Optional[int],
+        user_id: Optional[int],
+        call: LLMCallRecord
+    ) -> Dict[str, Any]:
+        """Invoke the Bedrock agent with retries bounded by one overall deadline.
+
+        Fails fast with CircuitOpenError while Bedrock is unhealthy and with
+        ConcurrencyLimitError if no slot frees up in time; raises
+        DeadlineExceededError once the request's time budget is spent. Only
+        transient errors are retried and counted by the breaker; others are
+        raised from the first attempt.
+        """
+        max_attempts = max_retries or self.settings.bedrock_max_attempts
+        deadline = Deadline(self.settings.bedrock_request_deadline_seconds)
+        # Same session ID across retries
+        agent_session, session_id, include_schema = self._select_session(user_id)
+        input_text = self.build_input(message, include_schema)
         last_exception = None
-        session_id = str(uuid.uuid4())
-        
-        while retry_count < max_retries:
+
+        for attempt in range(max_attempts):
+            if deadline.expired:
+                break
+            wait_started = time.monotonic()
             try:
-                logger.debug(f"Attempting to invoke Bedrock agent (attempt {retry_count + 1}/{max_retries})")
-                
-                async with await self._get_bedrock_client() as bedrock_runtime:
-                    logger.debug("Created Bedrock runtime client")
-                    
-                    # Get system prompt and format input
-                    system_prompt = self._get_system_prompt()
-                    formatted_input = f"{system_prompt}\n\nUser workout: {message}\n\nResponse:"
-                    
-                    # Prepare request parameters
-                    params = {
-                        "agentId": self.agent_id,
-                        "agentAliasId": self.agent_alias_id,
-                        "sessionId": session_id,  # Keep same session ID across retries
-                        "inputText": formatted_input,
-                        "enableTrace": True
-                    }
-                    
-                    logger.debug(f"Request params: {json.dumps(params, indent=2)}")
-                    
-                    try:
-                        # Invoke agent with timeout
-                        response = await asyncio.wait_for(
-                            bedrock_runtime.invoke_agent(**params),
-                            timeout=30.0  # 30 second timeout
-                        )
-                        
-                        # Parse response from event stream
-                        logger.debug(f"Raw response type: {type(response)}")
-                        logger.debug(f"Raw response: {response}")
-                        
-                        # Read from event stream
-                        response_text = None
-                        if "completion" in response:
-                            try:
-                                async for event in response["completion"]:
-                                    logger.debug(f"Event: {event}")
-                                    if "chunk" in event and "bytes" in event["chunk"]:
-                                        chunk_data = json.loads(event["chunk"]["bytes"].decode())
-                                        logger.debug(f"Chunk data: {chunk_data}")
-                                        
-                                        if isinstance(chunk_data, dict):
-                                            # Extract the actual response from the chunk data
-                                            if "display_message" in chunk_data and "structured_data" in chunk_data:
-                                                response_text = chunk_data
-                                                break
-                                            
-                                            # If the response is nested in a content field
-                                            if "content" in chunk_data:
-                                                content = chunk_data["content"]
-                                                if isinstance(content, str):
-                                                    # Try to parse the content as JSON
-                                                    try:
-                                                        content_json = json.loads(content)
-                                                        if isinstance(content_json, dict) and "display_message" in content_json and "structured_data" in content_json:
-                                                            response_text = content_json
-                                                            break
-                                                    except json.JSONDecodeError:
-                                                        pass
-                            except Exception as e:
-                                logger.error(f"Error processing event stream: {str(e)}")
-                                logger.error(f"Traceback: {traceback.format_exc()}")
-                                raise
-                        
-                        if not response_text:
-                            raise ValueError("Failed to extract valid response from event stream")
-                        
-                        return response_text
-                        
-                    except asyncio.TimeoutError:
-                        logger.error("Timeout waiting for Bedrock response")
-                        raise
-                        
+                await self.limiter.acquire(timeout=deadline.remaining())
+            finally:
+                call.queue_wait_ms += (time.monotonic() - wait_started) * 1000
+            started = time.monotonic()
+            try:
+                self.breaker.before_call()
+                call.attempts += 1
+                logger.debug(f"Attempting to invoke Bedrock agent (attempt {attempt + 1}/{max_attempts})")
+                response = await asyncio.wait_for(
+                    self._invoke_once(input_text, session_id, call),
+                    timeout=min(self.settings.bedrock_attempt_timeout_seconds, deadline.remaining())
+                )
+            except CircuitOpenError:
+                raise
+            except asyncio.CancelledError:
+                self.breaker.abandon_call()
+                raise
             except Exception as e:
-                logger.error(f"Error invoking Bedrock agent: {str(e)}")
-                logger.error(f"Traceback: {traceback.format_exc()}")
+                logger.error(f"Error invoking Bedrock agent: {str(e) or type(e).__name__}")
+                self.limiter.record(time.monotonic() - started, overloaded=is_overload_error(e))
+                if not is_transient_error(e):
+                    self.breaker.abandon_call()
+                    raise
+                self.breaker.record_failure()
                 last_exception = e
-                retry_count += 1
-                if retry_count < max_retries:
-                    await asyncio.sleep(self.retry_delay * retry_count)  # Exponential backoff
-                else:
-                    raise last_exception
+            else:
+                self.limiter.record(time.monotonic() - started)
+                self.breaker.record_success()
+                if agent_session is not None:
+                    self.sessions.complete_turn(agent_session)
+                return response
+            finally:
+                self.limiter.release()
+
+            if attempt + 1 < max_attempts:
+                delay = backoff_delay(
+                    attempt, self.settings.bedrock_backoff_base_seconds, self.settings.bedrock_backoff_max_seconds
+                )
+                if delay >= deadline.remaining():
+                    break
+                await asyncio.sleep(delay)
+
+        if last_exception is None or deadline.expired:
+            raise DeadlineExceededError(
+                f"Bedrock request exceeded its {self.settings.bedrock_request_deadline_seconds}s deadline"
+            ) from last_exception
+        raise last_exception
+
+    async def _invoke_once(self, input_text: str, session_id: str, call: Optional[LLMCallRecord] = None) -> Dict[str, Any]:
+        """Single agent call: send the prompt and read the answer off the event stream"""
+        call = call or LLMCallRecord()
+        started = time.monotonic()
+        call.first_chunk_ms = None
+        async with await self.client_factory() as bedrock_runtime:
+            logger.debug("Created Bedrock runtime client")
+            
+            # Prepare request parameters; trace events are only worth their cost when debugging
+            params = {
+                "agentId": self.agent_id,
+                "agentAliasId": self.agent_alias_id,
+                "sessionId": session_id,
+                "inputText": input_text,
+                "enableTrace": self.enable_trace
+            }
+            
+            logger.debug(f"Request params: {json.dumps(params, indent=2)}")
+            
+            response = await bedrock_runtime.invoke_agent(**params)
+            
+            # Parse response from event stream
+            logger.debug(f"Raw response type: {type(response)}")
+            logger.debug(f"Raw response: {response}")
+            
+            # Read from event stream
+            response_text = None
+            trace_events = []
+            streamed = bytearray()
+            if "completion" in response:
+                try:
+                    async for event in response["completion"]:
+                        logger.debug(f"Event: {event}")
+                        if "trace" in event:
+                            trace_events.append(event)
+                        if "chunk" in event and "bytes" in event["chunk"]:
+                            chunk_bytes = event["chunk"]["bytes"]
+                            if call.first_chunk_ms is None:
+                                call.first_chunk_ms = (time.monotonic() - started) * 1000
+                            call.chunk_count += 1
+                            call.response_bytes += len(chunk_bytes)
+                            streamed += chunk_bytes
+                            try:
+                                chunk_data = json.loads(chunk_bytes.decode())
+                            except (json.JSONDecodeError, UnicodeDecodeError):
+                                # A streamed answer can be split across chunks; parsed whole below
+                                continue
+                            logger.debug(f"Chunk data: {chunk_data}")
+                            
+                            response_text = self._extract_reply(chunk_data)
+                            if response_text:
+                                break
+                except Exception as e:
+                    logger.error(f"Error processing event stream: {str(e)}")
+                    logger.error(f"Traceback: {traceback.format_exc()}")
+                    raise
+
+            if not response_text and call.chunk_count > 1:
+                try:
+                    response_text = self._extract_reply(json.loads(streamed.decode()))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    pass
+            
+            if not response_text:
+                call.parse_failures += 1
+                raise ValueError("Failed to extract valid response from event stream")
+
+            usage = usage_from_trace(trace_events) or TokenUsage(
+                input_tokens=estimate_tokens(input_text),
+                output_tokens=estimate_tokens(json.dumps(response_text))
+            )
+            self._record_usage(usage, session_id)
+            call.input_tokens = usage.input_tokens
+            call.output_tokens = usage.output_tokens
+            call.tokens_estimated = usage.estimated
+            
+            return response_text
+
+    def _extract_reply(self, chunk_data: Any) -> Optional[Dict[str, Any]]:
+        """The agent's answer from parsed chunk JSON, directly or nested in a content field"""
+        if not isinstance(chunk_data, dict):
+            return None
+        if "display_message" in chunk_data and "structured_data" in chunk_data:
+            return chunk_data
+        content = chunk_data.get("content")
+        if isinstance(content, str):
+            # Try to parse the content as JSON
+            try:
+                content_json = json.loads(content)
+            except json.JSONDecodeError:
+                return None
+            if isinstance(content_json, dict) and "display_message" in content_json and "structured_data" in content_json:
+                return content_json
+        return None
+
+    def _record_usage(self, usage: TokenUsage, session_id: str):
+        self.usage_totals["calls"] += 1
+        self.usage_totals["input_tokens"] += usage.input_tokens
+        self.usage_totals["output_tokens"] += usage.output_tokens
+        logger.info(
+            f"Bedrock tokens: {usage.input_tokens} in, {usage.output_tokens} out"
+            f"{' (estimated)' if usage.estimated else ''}, mode={self.prompt_mode}, session={session_id[:8]}"
+        )
 
     def _get_system_prompt(self) -> str:
         """Get the system prompt for workout analysis"""
@@ -174,6 +444,15 @@ class BedrockAgentService:
 }
 """
 
+@lru_cache()
+def get_bedrock_agent_service() -> BedrockAgentService:
+    """Shared BedrockAgentService, created on first use instead of at import.
+
+    Raises ValueError if AWS credentials are missing; the failure is not cached,
+    so the next call retries once credentials are configured.
+    """
+    return BedrockAgentService()
+
 async def test_model():
     """Test the Bedrock model with sample inputs"""
     print("\nTesting Bedrock Model Responses with Streaming:")
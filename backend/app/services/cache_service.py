@@ -1,24 +1,30 @@
 from typing import Any, Optional, Dict
-import redis
 import json
 from datetime import timedelta
 import logging
 import os
-from functools import wraps
+from functools import lru_cache, wraps
 
 logger = logging.getLogger(__name__)
 
+@lru_cache()
+def get_redis_client(host: str, port: int):
+    """Redis client for a host/port, created (and redis imported) on first use"""
+    import redis
+
+    return redis.Redis(host=host, port=port, decode_responses=True)
+
 class CacheService:
     """Service for handling caching of expensive computations"""
     
     def __init__(self):
         self.redis_host = os.getenv("REDIS_HOST", "localhost")
         self.redis_port = int(os.getenv("REDIS_PORT", "6379"))
-        self.redis_client = redis.Redis(
-            host=self.redis_host,
-            port=self.redis_port,
-            decode_responses=True
-        )
+
+    @property
+    def redis_client(self):
+        """Process-wide Redis client, so every service instance shares one connection pool"""
+        return get_redis_client(self.redis_host, self.redis_port)
         
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
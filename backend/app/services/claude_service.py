@@ -3,7 +3,7 @@ import json
 import re
 from datetime import datetime
 from typing import Dict, Any, Optional, List, AsyncGenerator
-from .bedrock_agent_service import BedrockAgentService
+from .bedrock_agent_service import BedrockAgentService, get_bedrock_agent_service
 from .workout_storage_service import WorkoutStorageService
 from ..models.exercise import WorkoutSession, Exercise, MuscleActivation
 from sqlalchemy.orm import Session
@@ -13,11 +13,18 @@ logger = logging.getLogger(__name__)
 class ClaudeService:
     """Service for interacting with Claude AI assistant"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, bedrock_service: Optional[BedrockAgentService] = None):
         self.db = db
-        self.bedrock_service = BedrockAgentService()
+        self._bedrock_service = bedrock_service
         self.storage_service = WorkoutStorageService(db)
-        
+
+    @property
+    def bedrock_service(self) -> BedrockAgentService:
+        """Bedrock client, resolved only when a workout actually needs the LLM"""
+        if self._bedrock_service is None:
+            self._bedrock_service = get_bedrock_agent_service()
+        return self._bedrock_service
+
     async def process_workout(self, user_id: int, workout_text: str) -> Dict[str, Any]:
         """Process a workout through Claude with streaming response"""
         try:
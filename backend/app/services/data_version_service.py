@@ -0,0 +1,73 @@
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from typing import Iterable, Set
+from ..models.user import User
+from ..models.exercise import WorkoutSession, Exercise, MuscleActivation
+import logging
+
+logger = logging.getLogger(__name__)
+
+class DataVersionService:
+    """Per-user counter of workout data changes, used to validate cached analytics"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_version(self, user_id: int) -> int:
+        """Get the user's current data version (0 for unknown users)"""
+        try:
+            version = self.db.execute(
+                select(User.data_version).where(User.id == user_id)
+            ).scalar()
+            return version or 0
+        except Exception as e:
+            logger.error(f"Error getting data version for user {user_id}: {str(e)}")
+            raise
+
+    def bump(self, user_ids: Iterable[int]):
+        """Increment the data version of each user in the current transaction"""
+        user_ids = sorted({user_id for user_id in user_ids if user_id is not None})
+        if not user_ids:
+            return
+        self.db.execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(data_version=User.data_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+def _affected_users(session: Session) -> Set[int]:
+    """User ids whose workout data is touched by the objects in this flush"""
+    user_ids: Set[int] = set()
+    session_ids: Set[int] = set()
+    exercise_ids: Set[int] = set()
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, WorkoutSession):
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, Exercise):
+            session_ids.add(obj.session_id)
+        elif isinstance(obj, MuscleActivation):
+            exercise_ids.add(obj.exercise_id)
+
+    exercise_ids.discard(None)
+    if exercise_ids:
+        session_ids.update(session.execute(
+            select(Exercise.session_id).where(Exercise.id.in_(exercise_ids))
+        ).scalars())
+
+    session_ids.discard(None)
+    if session_ids:
+        user_ids.update(session.execute(
+            select(WorkoutSession.user_id).where(WorkoutSession.id.in_(session_ids))
+        ).scalars())
+
+    user_ids.discard(None)
+    return user_ids
+
+@event.listens_for(Session, "after_flush")
+def _bump_versions_on_workout_writes(session, flush_context):
+    # Runs inside the flushing transaction, so a rollback also reverts the bump
+    user_ids = _affected_users(session)
+    if user_ids:
+        DataVersionService(session).bump(user_ids)
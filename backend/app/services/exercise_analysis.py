@@ -1,5 +1,31 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..models.exercise import ExerciseTemplate
+from .exercise_matcher import ExerciseMatcher
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever a commit touches exercise_templates; matchers built at an older generation are stale
+_templates_generation = 0
+
+@event.listens_for(ExerciseTemplate, "after_insert")
+@event.listens_for(ExerciseTemplate, "after_update")
+@event.listens_for(ExerciseTemplate, "after_delete")
+def _note_template_change(mapper, connection, target):
+    Session.object_session(target).info["exercise_templates_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _bump_templates_generation(session):
+    global _templates_generation
+    if session.info.pop("exercise_templates_changed", False):
+        _templates_generation += 1
+
+@event.listens_for(Session, "after_rollback")
+def _forget_template_change(session):
+    session.info.pop("exercise_templates_changed", None)
 
 class MuscleActivation(BaseModel):
     muscle_name: str
@@ -15,57 +41,50 @@ class ExerciseAnalysis(BaseModel):
 
 class MockClaudeService:
     """
-    Mock service for local development before AWS Bedrock integration
-    Contains pre-defined exercise patterns for testing
+    Local exercise analysis without AWS Bedrock.
+    Matches descriptions against EXERCISE_PATTERNS and exercise templates
+    through an n-gram index, tolerating misspellings and variations.
     """
-    def __init__(self):
-        self.exercise_patterns = {
-            "squat": {
-                "movement_pattern": "squat",
-                "muscle_activations": [
-                    MuscleActivation(
-                        muscle_name="quadriceps",
-                        activation_level="PRIMARY",
-                        estimated_volume=1.0
-                    ),
-                    MuscleActivation(
-                        muscle_name="gluteus_maximus",
-                        activation_level="PRIMARY",
-                        estimated_volume=0.9
-                    ),
-                    MuscleActivation(
-                        muscle_name="hamstrings",
-                        activation_level="SECONDARY",
-                        estimated_volume=0.6
-                    ),
-                    MuscleActivation(
-                        muscle_name="core",
-                        activation_level="TERTIARY",
-                        estimated_volume=0.3
-                    )
-                ],
-                "equipment_needed": ["barbell", "rack"],
-            }
-        }
+    def __init__(self, templates: Optional[List[Any]] = None):
+        self.matcher = ExerciseMatcher.from_catalog(templates)
+        self._templates_generation = None
+
+    def load_templates(self, db: Session):
+        """Rebuild the matcher from the current exercise templates (run at warm-up)"""
+        generation = _templates_generation
+        self.matcher = ExerciseMatcher.from_catalog(db.query(ExerciseTemplate).all())
+        self._templates_generation = generation
+        logger.debug(f"Rebuilt exercise matcher with {len(self.matcher.entries)} entries")
+
+    def ensure_templates(self, db: Session):
+        """Load templates if they haven't been, or a committed change made the matcher stale.
+
+        No database access while the matcher is current.
+        """
+        if self._templates_generation != _templates_generation:
+            self.load_templates(db)
 
     async def analyze_exercise(self, exercise_description: str) -> ExerciseAnalysis:
         """
-        Mock exercise analysis for local development
+        Analyze an exercise description using the closest catalog entry
         """
-        # Simple keyword matching for testing
-        exercise_type = next(
-            (name for name in self.exercise_patterns.keys() 
-             if name in exercise_description.lower()),
-            "unknown"
-        )
+        match = self.matcher.best_match(exercise_description)
         
-        if exercise_type in self.exercise_patterns:
-            pattern = self.exercise_patterns[exercise_type]
+        if match:
+            entry = self.matcher.entries[match.key]
             return ExerciseAnalysis(
-                exercise_name=exercise_type,
-                muscle_activations=pattern["muscle_activations"],
-                movement_pattern=pattern["movement_pattern"],
-                equipment_needed=pattern["equipment_needed"]
+                exercise_name=entry.key,
+                muscle_activations=[
+                    MuscleActivation(
+                        muscle_name=activation["muscle_name"],
+                        activation_level=activation.get("activation_level", "PRIMARY"),
+                        estimated_volume=float(activation.get("estimated_volume") or 1.0)
+                    )
+                    for activation in entry.muscle_activations
+                ],
+                movement_pattern=entry.movement_pattern,
+                equipment_needed=entry.equipment_needed,
+                notes=f"Matched '{match.alias}' (score {match.score:.2f})"
             )
         
         # Default response for unknown exercises
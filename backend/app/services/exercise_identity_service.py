@@ -0,0 +1,172 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, Tuple
+from ..models.exercise import CanonicalExercise, ExerciseAlias, ExerciseTemplate
+from ..data.exercise_patterns import EXERCISE_PATTERNS
+from .lookup_cache import CommittedLookupCache
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Alias -> canonical id and canonical id -> name, shared by every session.
+# Aliases never change their target once written, so entries never go stale.
+alias_cache = CommittedLookupCache("exercise_aliases")
+
+# Whether this process has seeded (and committed) the catalog from the pattern data
+_catalog_seeded = False
+
+def reset_cache():
+    """Forget all cached aliases (e.g. after switching databases in tests)"""
+    global _catalog_seeded
+    alias_cache.clear()
+    _catalog_seeded = False
+
+def normalize_exercise_key(name: Optional[str]) -> str:
+    """Normalize a free-text exercise name into an alias key.
+
+    Lowercases, turns separators into spaces, drops punctuation and
+    singularizes words so "Pull-Ups" and "pull up" share a key.
+    """
+    text = re.sub(r"[_\-/]+", " ", (name or "").lower())
+    text = re.sub(r"[^a-z0-9 ]+", "", text)
+    words = []
+    for word in text.split():
+        if len(word) > 2 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+class ExerciseIdentityService:
+    """Service for mapping free-text exercise names to canonical exercise ids"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def resolve_id(self, name: Optional[str], movement_pattern: Optional[str] = None) -> Optional[int]:
+        """Get the canonical exercise id for a name, registering it if it is new.
+
+        New canonical exercises are written in the caller's transaction and
+        only become visible to other sessions once it commits.
+        """
+        key = normalize_exercise_key(name)
+        if not key:
+            return None
+
+        self.ensure_catalog()
+        self._load_aliases()
+        found = self._find(key)
+        if found is not None:
+            return found[0]
+
+        return self._register(key, key, movement_pattern)
+
+    def lookup_id(self, name: Optional[str]) -> Optional[int]:
+        """Get the canonical exercise id for a name without registering it.
+
+        Read-only: the catalog is seeded at ingest and startup, never here.
+        """
+        key = normalize_exercise_key(name)
+        if not key:
+            return None
+        self._load_aliases()
+        found = self._find(key)
+        return found[0] if found is not None else None
+
+    def name_for_id(self, canonical_id: int) -> str:
+        """Get the canonical name for a canonical exercise id"""
+        name = alias_cache.get_name(self.db, canonical_id)
+        if name is not None:
+            return name
+        canonical = self.db.get(CanonicalExercise, canonical_id)
+        return canonical.name if canonical else ""
+
+    def seed_catalog(self, include_templates: bool = True):
+        """Register canonical exercises and aliases from the pattern data and templates"""
+        for pattern_name, pattern in EXERCISE_PATTERNS.items():
+            canonical_key = normalize_exercise_key(pattern_name)
+            found = self._find(canonical_key)
+            canonical_id = found[0] if found else self._register(
+                canonical_key, canonical_key, pattern.get("movement_pattern")
+            )
+            for variation in pattern.get("variations", []):
+                variation_key = normalize_exercise_key(variation)
+                if variation_key and self._find(variation_key) is None:
+                    self._add_alias(variation_key, canonical_id, canonical_key)
+
+        if not include_templates:
+            return
+        for template in self.db.query(ExerciseTemplate).all():
+            key = normalize_exercise_key(template.name)
+            if key and self._find(key) is None:
+                self._register(key, key, template.movement_pattern)
+
+    def ensure_catalog(self):
+        """Seed the catalog once per process, in the caller's transaction.
+
+        For ingest and startup only; until the seeded rows commit, the next
+        call seeds again.
+        """
+        global _catalog_seeded
+        if _catalog_seeded:
+            return
+        self.seed_catalog()
+        _catalog_seeded = not alias_cache.has_pending(self.db)
+
+    def _load_aliases(self):
+        """Load every committed alias once per process"""
+        if alias_cache.loaded:
+            return
+        rows = (
+            self.db.query(ExerciseAlias.alias, CanonicalExercise.id, CanonicalExercise.name)
+            .join(CanonicalExercise, ExerciseAlias.canonical_exercise_id == CanonicalExercise.id)
+            .all()
+        )
+        for alias, canonical_id, canonical_name in rows:
+            alias_cache.add_committed(alias, canonical_id, canonical_name)
+        alias_cache.loaded = True
+        logger.debug(f"Loaded {len(rows)} exercise aliases")
+
+    def _find(self, key: str) -> Optional[Tuple[int, str]]:
+        """Find an alias in the cache, this transaction or the database"""
+        canonical_id = alias_cache.get_id(self.db, key)
+        if canonical_id is not None:
+            return canonical_id, alias_cache.get_name(self.db, canonical_id) or ""
+        row = (
+            self.db.query(ExerciseAlias.canonical_exercise_id, CanonicalExercise.name)
+            .join(CanonicalExercise, ExerciseAlias.canonical_exercise_id == CanonicalExercise.id)
+            .filter(ExerciseAlias.alias == key)
+            .first()
+        )
+        if row is None:
+            return None
+        # Committed by another transaction, so safe to share process-wide
+        alias_cache.add_committed(key, row[0], row[1])
+        return row[0], row[1]
+
+    def _register(self, key: str, canonical_name: str, movement_pattern: Optional[str]) -> int:
+        """Create a canonical exercise and its first alias inside a savepoint"""
+        try:
+            with self.db.begin_nested():
+                canonical = self.db.query(CanonicalExercise).filter(CanonicalExercise.name == canonical_name).first()
+                if not canonical:
+                    canonical = CanonicalExercise(name=canonical_name, movement_pattern=movement_pattern)
+                    self.db.add(canonical)
+                    self.db.flush()
+                self.db.add(ExerciseAlias(alias=key, canonical_exercise_id=canonical.id))
+        except IntegrityError:
+            # Lost a race with a concurrent insert; use the winner's row
+            found = self._find(key)
+            if found is None:
+                raise
+            return found[0]
+        alias_cache.add_pending(self.db, key, canonical.id, canonical.name)
+        return canonical.id
+
+    def _add_alias(self, key: str, canonical_id: int, canonical_name: str):
+        try:
+            with self.db.begin_nested():
+                self.db.add(ExerciseAlias(alias=key, canonical_exercise_id=canonical_id))
+        except IntegrityError:
+            return
+        alias_cache.add_pending(self.db, key, canonical_id, canonical_name)
@@ -0,0 +1,214 @@
+"""
+Character n-gram index for matching free-text exercise descriptions to the
+exercise catalog (EXERCISE_PATTERNS plus any ExerciseTemplate rows)
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+from ..data.exercise_patterns import EXERCISE_PATTERNS
+from .exercise_identity_service import normalize_exercise_key
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Words that describe the sets rather than the exercise
+STOPWORDS = {
+    "set", "rep", "x", "lb", "kg", "pound", "kilo", "of", "at", "for", "with",
+    "and", "the", "a", "an", "did", "i", "my", "today", "then", "on", "to", "each",
+}
+
+# Longest run of words tried as a candidate exercise name
+MAX_WINDOW_WORDS = 4
+
+# A window word stands in for an alias word (allowing typos and plurals) at this trigram similarity
+WORD_MATCH_SCORE = 0.5
+
+def allowed_typos(length: int) -> int:
+    """Edits tolerated against an alias of length letters (spaces removed); short names must be exact"""
+    return 0 if length < 4 else 1 if length < 8 else 2
+
+@dataclass
+class CatalogEntry:
+    key: str
+    movement_pattern: str
+    muscle_activations: List[Dict[str, Any]]
+    equipment_needed: List[str]
+    aliases: Set[str] = field(default_factory=set)
+
+@dataclass
+class MatchCandidate:
+    key: str
+    alias: str
+    score: float  # Trigram Dice coefficient times the share of alias words covered, 1.0 for an exact alias
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a normalized string, padded at word boundaries"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def dice(a: Set[str], b: Set[str]) -> float:
+    return 2.0 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (a transposition is one edit); limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+class ExerciseMatcher:
+    """Scores free text against every catalog alias through an inverted trigram index.
+
+    Only aliases sharing at least one trigram with the query are scored, so
+    lookup cost depends on the query length and overlap, not catalog size.
+    A window's score is scaled by how many of the alias's words it covers, so
+    "barbell curl" doesn't match "barbell row" on the shared word alone.
+    Windows are also compared with spaces removed by edit distance, which
+    catches transposed letters ("sqaut") and run-together words
+    ("benchpress") that trigrams score too low.
+    """
+
+    def __init__(self, entries: Iterable[CatalogEntry], min_score: float = 0.6):
+        self.min_score = min_score
+        self.entries: Dict[str, CatalogEntry] = {}
+        self._alias_keys: List[str] = []
+        self._alias_names: List[str] = []
+        self._alias_sizes: List[int] = []
+        self._alias_words: List[List[Set[str]]] = []
+        self._alias_compact: List[str] = []
+        self._exact: Dict[str, int] = {}
+        self._exact_compact: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        for entry in entries:
+            self.entries[entry.key] = entry
+            for alias in entry.aliases:
+                self._add_alias(alias, entry.key)
+
+    @classmethod
+    def from_catalog(cls, templates: Optional[Iterable[Any]] = None, **kwargs) -> "ExerciseMatcher":
+        """Build a matcher over EXERCISE_PATTERNS and optional ExerciseTemplate rows"""
+        entries = []
+        for key, pattern in EXERCISE_PATTERNS.items():
+            entries.append(CatalogEntry(
+                key=key,
+                movement_pattern=pattern["movement_pattern"],
+                muscle_activations=pattern["muscle_activations"],
+                equipment_needed=pattern.get("equipment_needed", []),
+                aliases={key, *pattern.get("variations", [])}
+            ))
+        for template in templates or []:
+            entries.append(CatalogEntry(
+                key=template.name,
+                movement_pattern=template.movement_pattern or "unknown",
+                muscle_activations=_template_activations(template.muscle_involvement),
+                equipment_needed=[template.equipment] if template.equipment else [],
+                aliases={template.name}
+            ))
+        return cls(entries, **kwargs)
+
+    def _add_alias(self, alias: str, key: str):
+        normalized = normalize_exercise_key(alias)
+        if not normalized or normalized in self._exact:
+            return
+        alias_id = len(self._alias_keys)
+        self._alias_keys.append(key)
+        self._alias_names.append(normalized)
+        grams = trigrams(normalized)
+        self._alias_sizes.append(len(grams))
+        self._alias_words.append([trigrams(word) for word in normalized.split()])
+        self._alias_compact.append(normalized.replace(" ", ""))
+        self._exact[normalized] = alias_id
+        self._exact_compact.setdefault(self._alias_compact[alias_id], alias_id)
+        for gram in grams:
+            self._postings[gram].append(alias_id)
+
+    def match(self, description: str, limit: int = 5) -> List[MatchCandidate]:
+        """Return the best-scoring catalog entries for a description, best first"""
+        words = [
+            word for word in normalize_exercise_key(description).split()
+            if word not in STOPWORDS and not any(ch.isdigit() for ch in word)
+        ]
+
+        best: Dict[str, MatchCandidate] = {}
+        for start in range(len(words)):
+            for end in range(start + 1, min(start + MAX_WINDOW_WORDS, len(words)) + 1):
+                self._score_window(" ".join(words[start:end]), best)
+
+        candidates = sorted(best.values(), key=lambda c: c.score, reverse=True)
+        return [c for c in candidates if c.score >= self.min_score][:limit]
+
+    def best_match(self, description: str) -> Optional[MatchCandidate]:
+        """Return the single best catalog entry for a description, if any clears the threshold"""
+        candidates = self.match(description, limit=1)
+        return candidates[0] if candidates else None
+
+    def _score_window(self, window: str, best: Dict[str, MatchCandidate]):
+        compact = window.replace(" ", "")
+        alias_id = self._exact.get(window, self._exact_compact.get(compact))
+        if alias_id is not None:
+            self._offer(best, alias_id, 1.0)
+            return
+
+        grams = trigrams(window)
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for candidate_id in self._postings.get(gram, ()):
+                overlap[candidate_id] += 1
+
+        window_words = [trigrams(word) for word in window.split()]
+        for candidate_id, shared in overlap.items():
+            alias_compact = self._alias_compact[candidate_id]
+            limit = allowed_typos(len(alias_compact))
+            typos = edit_distance(compact, alias_compact, limit)
+            if typos <= limit:
+                self._offer(best, candidate_id, 1.0 - typos / len(alias_compact))
+
+            score = 2.0 * shared / (len(grams) + self._alias_sizes[candidate_id])
+            if score < self.min_score:
+                continue
+            alias_words = self._alias_words[candidate_id]
+            covered = sum(
+                1 for alias_word in alias_words
+                if max(dice(alias_word, word) for word in window_words) >= WORD_MATCH_SCORE
+            )
+            self._offer(best, candidate_id, score * covered / len(alias_words))
+
+    def _offer(self, best: Dict[str, MatchCandidate], alias_id: int, score: float):
+        key = self._alias_keys[alias_id]
+        current = best.get(key)
+        if current is None or score > current.score:
+            best[key] = MatchCandidate(key=key, alias=self._alias_names[alias_id], score=score)
+
+def _template_activations(muscle_involvement: Any) -> List[Dict[str, Any]]:
+    """Convert an ExerciseTemplate's muscle_involvement JSON to activation dicts"""
+    if isinstance(muscle_involvement, list):
+        return [m for m in muscle_involvement if isinstance(m, dict) and m.get("muscle_name")]
+    if isinstance(muscle_involvement, dict):
+        activations = []
+        for muscle_name, involvement in muscle_involvement.items():
+            if isinstance(involvement, dict):
+                activations.append({"muscle_name": muscle_name, **involvement})
+            elif isinstance(involvement, (int, float)):
+                activations.append({
+                    "muscle_name": muscle_name,
+                    "activation_level": "PRIMARY" if involvement >= 0.8 else "SECONDARY" if involvement >= 0.5 else "TERTIARY",
+                    "estimated_volume": float(involvement)
+                })
+            else:
+                activations.append({
+                    "muscle_name": muscle_name,
+                    "activation_level": str(involvement).upper(),
+                    "estimated_volume": 1.0
+                })
+        return activations
+    return []
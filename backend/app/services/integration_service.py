@@ -2,7 +2,7 @@ from sqlalchemy.orm import Session
 from typing import Dict, List, Any, Optional, AsyncGenerator
 from datetime import datetime, timedelta
 from .cache_service import CacheService, cached
-from .bedrock_agent_service import BedrockAgentService
+from .bedrock_agent_service import BedrockAgentService, get_bedrock_agent_service
 from .analysis_service import AnalysisService
 from .report_service import ReportService
 from .workout_storage_service import WorkoutStorageService
@@ -43,13 +43,20 @@ def error_handler(func):
 class IntegrationService:
     """Service for integrating various components and handling cross-cutting concerns"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, bedrock_service: Optional[BedrockAgentService] = None):
         self.db = db
         self.cache_service = CacheService()
-        self.bedrock_service = BedrockAgentService()
+        self._bedrock_service = bedrock_service
         self.analysis_service = AnalysisService(db)
         self.report_service = ReportService(db)
-        
+
+    @property
+    def bedrock_service(self) -> BedrockAgentService:
+        """Bedrock client, resolved only when a workout actually needs the LLM"""
+        if self._bedrock_service is None:
+            self._bedrock_service = get_bedrock_agent_service()
+        return self._bedrock_service
+
     @error_handler
     @cached("workout_analysis")
     async def process_workout(self, session_id: int, workout_text: str) -> Dict[str, Any]:
@@ -264,6 +271,8 @@ class IntegrationService:
                 logger.debug(f"Got tracking data: {tracking_data}")
                 
                 logger.debug("Getting muscle activations")
+                # Reload the committed exercises with their activations in one round trip
+                exercises = workout_storage.get_session_exercises(session.id)
                 activations = []
                 for exercise in exercises:
                     for muscle_activation in exercise.muscle_activations:
@@ -0,0 +1,371 @@
+"""
+Background job queue for slow LLM work.
+
+Endpoints enqueue a job and return 202 with its id; worker tasks consume jobs
+and store the result, which clients poll (optionally long-polling) by id.
+Backends: Redis for multi-process deployments, in-process for tests and
+single-worker development.
+
+With Redis, a popped job moves to a processing list and holds a lease the
+worker renews while it runs; it is acked off the list once finished. Jobs
+whose worker died (lease gone) are put back on the queue.
+"""
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from ..core.responses import dumps
+from ..core.settings import get_settings
+from collections import deque
+import asyncio
+import enum
+import json
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+# Async handlers by job kind; route modules register the work they offload
+handlers: Dict[str, JobHandler] = {}
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register an async function as the handler for a job kind"""
+    def decorator(fn: JobHandler) -> JobHandler:
+        handlers[kind] = fn
+        return fn
+    return decorator
+
+# Moves processing entries with no lease back to the queue. An entry is only requeued once
+# it has been seen without a lease for ARGV[2] ms, so a worker that has just popped a job
+# has time to take its lease
+REQUEUE_STALE_SCRIPT = """
+local now = redis.call("time")
+local now_ms = now[1] * 1000 + math.floor(now[2] / 1000)
+local requeued = 0
+for _, id in ipairs(redis.call("lrange", KEYS[1], 0, -1)) do
+    if redis.call("exists", ARGV[1] .. ":lease:" .. id) == 0 then
+        local suspect = ARGV[1] .. ":suspect:" .. id
+        local seen = tonumber(redis.call("get", suspect))
+        if seen == nil then
+            redis.call("set", suspect, now_ms, "PX", ARGV[3])
+        elseif now_ms - seen >= tonumber(ARGV[2]) then
+            redis.call("lrem", KEYS[1], 1, id)
+            redis.call("rpush", KEYS[2], id)
+            redis.call("del", suspect)
+            requeued = requeued + 1
+        end
+    end
+end
+return requeued
+"""
+STALE_GRACE_MS = 5000
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+FINISHED = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+@dataclass
+class Job:
+    kind: str
+    payload: Dict[str, Any]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def to_json(self) -> str:
+        return dumps(asdict(self)).decode()
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Job":
+        data = json.loads(raw)
+        data["status"] = JobStatus(data["status"])
+        for key in ("created_at", "started_at", "finished_at"):
+            if data.get(key):
+                data[key] = datetime.fromisoformat(data[key])
+        return cls(**data)
+
+class LocalJobBackend:
+    """In-process queue; jobs are lost on restart and only this process's workers see them.
+
+    Finished jobs are kept for result_ttl seconds, like the Redis backend's
+    job keys, then evicted the next time the backend is used.
+    """
+
+    # Nothing outlives this process, so there are no leases to hold or stale jobs to requeue
+    lease_seconds: Optional[float] = None
+
+    def __init__(self, result_ttl: float = 3600):
+        self.result_ttl = result_ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._jobs: Dict[str, Job] = {}
+        self._done: Dict[str, asyncio.Event] = {}
+        # (evict at, job id) in finishing order, so expired entries are always at the left
+        self._expiry: deque = deque()
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    async def push(self, job: Job):
+        await self.save(job)
+        await self.queue.put(job.id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def save(self, job: Job):
+        self._evict_expired()
+        # Store a copy so callers can't mutate queued state in place
+        self._jobs[job.id] = Job.from_json(job.to_json())
+        event = self._done.setdefault(job.id, asyncio.Event())
+        if job.finished:
+            event.set()
+            self._expiry.append((time.monotonic() + self.result_ttl, job.id))
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        self._evict_expired()
+        job = self._jobs.get(job_id)
+        return Job.from_json(job.to_json()) if job else None
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        event = self._done.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return await self.get(job_id)
+
+    async def ack(self, job_id: str):
+        pass
+
+    async def renew_lease(self, job_id: str):
+        pass
+
+    async def requeue_stale(self) -> int:
+        return 0
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, job_id = self._expiry.popleft()
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished:
+                del self._jobs[job_id]
+                self._done.pop(job_id, None)
+
+class RedisJobBackend:
+    """Redis list as the queue, one key per job, pub/sub to wake long-pollers.
+
+    Popped ids move atomically to a processing list and stay there until acked,
+    so a job survives its worker dying mid-run.
+    """
+
+    def __init__(self, host: str, port: int, result_ttl: int, lease_seconds: float = 300, prefix: str = "jobs"):
+        # redis.asyncio is only needed once jobs are actually used
+        import redis.asyncio as redis
+
+        self.redis = redis.Redis(host=host, port=port, decode_responses=True)
+        self.result_ttl = result_ttl
+        self.lease_seconds = lease_seconds
+        self.queue_key = f"{prefix}:queue"
+        self.processing_key = f"{prefix}:processing"
+        self.prefix = prefix
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}:{job_id}"
+
+    def _lease_key(self, job_id: str) -> str:
+        return f"{self.prefix}:lease:{job_id}"
+
+    async def push(self, job: Job):
+        await self.save(job)
+        await self.redis.lpush(self.queue_key, job.id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        job_id = await self.redis.blmove(
+            self.queue_key, self.processing_key, max(1, int(timeout)), src="RIGHT", dest="LEFT"
+        )
+        if job_id is not None:
+            await self.renew_lease(job_id)
+        return job_id
+
+    async def renew_lease(self, job_id: str):
+        await self.redis.set(self._lease_key(job_id), "1", px=int(self.lease_seconds * 1000))
+
+    async def ack(self, job_id: str):
+        """Drop a finished (or vanished) job from the processing list"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, job_id)
+            pipe.delete(self._lease_key(job_id))
+            await pipe.execute()
+
+    async def requeue_stale(self) -> int:
+        """Put jobs whose worker stopped renewing their lease back on the queue"""
+        return await self.redis.eval(
+            REQUEUE_STALE_SCRIPT, 2, self.processing_key, self.queue_key,
+            self.prefix, STALE_GRACE_MS, int(self.lease_seconds * 1000)
+        )
+
+    async def save(self, job: Job):
+        # Only results expire; a job waiting in a long queue must still be there when it's popped
+        await self.redis.set(self._key(job.id), job.to_json(), ex=self.result_ttl if job.finished else None)
+        if job.finished:
+            await self.redis.publish(self._key(job.id), job.status.value)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        raw = await self.redis.get(self._key(job_id))
+        return Job.from_json(raw) if raw else None
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self._key(job_id))
+        try:
+            # Check after subscribing so a completion between the two can't be missed
+            job = await self.get(job_id)
+            if job is None or job.finished:
+                return job
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while loop.time() < deadline:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=deadline - loop.time())
+                if message is not None:
+                    break
+            return await self.get(job_id)
+        finally:
+            await pubsub.unsubscribe(self._key(job_id))
+            await pubsub.close()
+
+class JobQueue:
+    """Submits jobs to a backend and runs worker tasks that execute them"""
+
+    def __init__(self, backend, poll_timeout: float = 1.0):
+        self.backend = backend
+        self.poll_timeout = poll_timeout
+        self._workers: List[asyncio.Task] = []
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        """Queue a job for a registered handler"""
+        if kind not in handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        job = Job(kind=kind, payload=payload)
+        await self.backend.push(job)
+        logger.debug(f"Queued {kind} job {job.id}")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.backend.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Get a job, waiting up to timeout seconds for it to finish"""
+        return await self.backend.wait(job_id, timeout)
+
+    def start(self, workers: int):
+        """Start worker tasks on the running event loop"""
+        for i in range(workers):
+            self._workers.append(asyncio.create_task(self._work(i)))
+        if workers and self.backend.lease_seconds:
+            self._workers.append(asyncio.create_task(self._requeue_stale()))
+        logger.info(f"Started {workers} job workers")
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    async def run_one(self, job_id: str):
+        """Execute a single queued job and store its outcome"""
+        job = await self.backend.get(job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} expired before it ran")
+            await self.backend.ack(job_id)
+            return
+        if job.finished:
+            # Requeued after its worker stored the result but died before acking
+            await self.backend.ack(job_id)
+            return
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        await self.backend.save(job)
+        lease = asyncio.create_task(self._hold_lease(job_id))
+        try:
+            result = await handlers[job.kind](job.payload)
+            # Normalize to plain JSON types so every backend returns the same shape
+            job.result = json.loads(dumps(result))
+            job.status = JobStatus.SUCCEEDED
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        finally:
+            lease.cancel()
+        job.finished_at = datetime.utcnow()
+        await self.backend.save(job)
+        await self.backend.ack(job_id)
+
+    async def _hold_lease(self, job_id: str):
+        """Renew the job's lease while its handler runs"""
+        if not self.backend.lease_seconds:
+            return
+        while True:
+            await asyncio.sleep(self.backend.lease_seconds / 3)
+            try:
+                await self.backend.renew_lease(job_id)
+            except Exception as e:
+                logger.warning(f"Failed to renew lease for job {job_id}: {str(e)}")
+
+    async def _requeue_stale(self):
+        while True:
+            await asyncio.sleep(self.backend.lease_seconds / 4)
+            try:
+                requeued = await self.backend.requeue_stale()
+                if requeued:
+                    logger.warning(f"Requeued {requeued} jobs abandoned by their workers")
+            except Exception as e:
+                logger.error(f"Stale job sweep failed: {str(e)}")
+
+    async def _work(self, worker_id: int):
+        while True:
+            try:
+                job_id = await self.backend.pop(self.poll_timeout)
+                if job_id is not None:
+                    await self.run_one(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep the worker alive through backend hiccups
+                logger.error(f"Job worker {worker_id} error: {str(e)}")
+                await asyncio.sleep(self.poll_timeout)
+
+@lru_cache()
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue for the configured backend"""
+    settings = get_settings()
+    if settings.job_backend == "redis":
+        backend = RedisJobBackend(
+            settings.redis_host, settings.redis_port, settings.job_result_ttl_seconds, settings.job_lease_seconds
+        )
+    else:
+        backend = LocalJobBackend(settings.job_result_ttl_seconds)
+    return JobQueue(backend)
@@ -0,0 +1,152 @@
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy.orm import sessionmaker
+from ..core.settings import get_settings
+from ..models.database import SessionLocal
+from ..models.telemetry import LLMCall
+import asyncio
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# Latency columns summarized by the percentile report
+LATENCY_FIELDS = ("queue_wait_ms", "first_chunk_ms", "total_ms")
+PERCENTILES = (50, 90, 95, 99)
+
+@dataclass
+class LLMCallRecord:
+    """Measurements for one agent invocation, filled in as it runs"""
+    operation: str = "invoke_agent"
+    prompt_mode: Optional[str] = None
+    outcome: str = "pending"
+    error_type: Optional[str] = None
+    attempts: int = 0
+    queue_wait_ms: float = 0.0
+    first_chunk_ms: Optional[float] = None
+    total_ms: float = 0.0
+    chunk_count: int = 0
+    response_bytes: int = 0
+    parse_failures: int = 0
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    tokens_estimated: Optional[bool] = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    _started: float = field(default_factory=time.monotonic, repr=False)
+
+    def finish(self):
+        self.total_ms = (time.monotonic() - self._started) * 1000
+
+    def row(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if not k.startswith("_")}
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Linearly interpolated percentile of already sorted values"""
+    if not values:
+        return None
+    rank = (len(values) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+class LLMTelemetryService:
+    """Buffers per-call records and writes them to llm_calls in batches.
+
+    record() is cheap and never raises, so it can sit on the Bedrock call path;
+    inserts happen once batch_size records are buffered (off the event loop
+    when one is running) and before every report.
+    """
+
+    def __init__(self, session_factory: sessionmaker, batch_size: int = 20):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = Lock()
+
+    def record(self, call: LLMCallRecord):
+        with self._lock:
+            self._buffer.append(call.row())
+            full = len(self._buffer) >= self.batch_size
+        if not full:
+            return
+        try:
+            asyncio.get_running_loop().run_in_executor(None, self.flush)
+        except RuntimeError:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write buffered records; returns how many were written"""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        try:
+            with self.session_factory() as db:
+                db.bulk_insert_mappings(LLMCall, rows)
+                db.commit()
+            return len(rows)
+        except Exception as e:
+            # Telemetry must never break the calls it measures; drop the batch
+            logger.error(f"Error writing LLM telemetry: {str(e)}")
+            return 0
+
+    def report(self, since: datetime, until: Optional[datetime] = None, operation: Optional[str] = None) -> Dict[str, Any]:
+        """Latency percentiles, outcome counts, retry and parse-failure rates for a time window"""
+        self.flush()
+        until = until or datetime.utcnow()
+        with self.session_factory() as db:
+            query = db.query(
+                LLMCall.outcome,
+                LLMCall.attempts,
+                LLMCall.parse_failures,
+                LLMCall.chunk_count,
+                LLMCall.response_bytes,
+                LLMCall.input_tokens,
+                LLMCall.output_tokens,
+                *(getattr(LLMCall, name) for name in LATENCY_FIELDS)
+            ).filter(LLMCall.started_at >= since, LLMCall.started_at < until)
+            if operation:
+                query = query.filter(LLMCall.operation == operation)
+            rows = query.all()
+
+        calls = len(rows)
+        outcomes: Dict[str, int] = {}
+        for row in rows:
+            outcomes[row.outcome] = outcomes.get(row.outcome, 0) + 1
+
+        latency = {}
+        for name in LATENCY_FIELDS:
+            values = sorted(getattr(row, name) for row in rows if getattr(row, name) is not None)
+            latency[name] = {
+                "count": len(values),
+                **{f"p{p}": percentile(values, p) for p in PERCENTILES},
+                "max": values[-1] if values else None,
+            }
+
+        sent = [row for row in rows if row.attempts]
+        return {
+            "since": since,
+            "until": until,
+            "calls": calls,
+            "outcomes": outcomes,
+            "success_rate": outcomes.get("success", 0) / calls if calls else None,
+            "retry_rate": sum(1 for row in sent if row.attempts > 1) / len(sent) if sent else None,
+            "mean_attempts": sum(row.attempts for row in sent) / len(sent) if sent else None,
+            "parse_failure_rate": sum(1 for row in rows if row.parse_failures) / calls if calls else None,
+            "latency_ms": latency,
+            "chunks": sum(row.chunk_count for row in rows),
+            "response_bytes": sum(row.response_bytes for row in rows),
+            "input_tokens": sum(row.input_tokens or 0 for row in rows),
+            "output_tokens": sum(row.output_tokens or 0 for row in rows),
+        }
+
+    def report_last(self, hours: float, operation: Optional[str] = None) -> Dict[str, Any]:
+        return self.report(datetime.utcnow() - timedelta(hours=hours), operation=operation)
+
+@lru_cache()
+def get_llm_telemetry() -> LLMTelemetryService:
+    """Process-wide telemetry sink backed by the application database"""
+    return LLMTelemetryService(SessionLocal, batch_size=get_settings().llm_telemetry_batch_size)
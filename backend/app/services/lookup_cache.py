@@ -0,0 +1,78 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_caches: List["CommittedLookupCache"] = []
+
+class CommittedLookupCache:
+    """Process-wide bidirectional cache for small dimension tables.
+
+    Maps normalized keys to row ids and ids back to names. Rows inserted by a
+    session are held per transaction and only published once it commits, so a
+    rolled-back insert can never leak a dangling id into the shared cache.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._pending_key = f"pending_{name}"
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self.loaded = False
+        _caches.append(self)
+
+    def get_id(self, session: Session, key: str) -> Optional[int]:
+        """Get the id for a key from committed or this transaction's rows"""
+        if key in self._ids:
+            return self._ids[key]
+        pending = self._pending(session).get(key)
+        return pending[0] if pending else None
+
+    def get_name(self, session: Session, row_id: int) -> Optional[str]:
+        """Get the name for an id from committed or this transaction's rows"""
+        if row_id in self._names:
+            return self._names[row_id]
+        for pending_id, pending_name in self._pending(session).values():
+            if pending_id == row_id:
+                return pending_name
+        return None
+
+    def add_committed(self, key: str, row_id: int, name: str):
+        """Cache a row that is known to be committed"""
+        self._ids[key] = row_id
+        self._names[row_id] = name
+
+    def add_pending(self, session: Session, key: str, row_id: int, name: str):
+        """Track a row inserted in the session's current transaction"""
+        self._pending(session)[key] = (row_id, name)
+
+    def has_pending(self, session: Session) -> bool:
+        return bool(session.info.get(self._pending_key))
+
+    def clear(self):
+        """Forget every cached row (e.g. after switching databases in tests)"""
+        self._ids.clear()
+        self._names.clear()
+        self.loaded = False
+
+    def _pending(self, session: Session) -> Dict[str, Tuple[int, str]]:
+        return session.info.setdefault(self._pending_key, {})
+
+    def _publish(self, session: Session):
+        for key, (row_id, name) in session.info.pop(self._pending_key, {}).items():
+            self.add_committed(key, row_id, name)
+
+    def _discard(self, session: Session):
+        session.info.pop(self._pending_key, None)
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_rows(session):
+    for cache in _caches:
+        cache._publish(session)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_rows(session):
+    for cache in _caches:
+        cache._discard(session)
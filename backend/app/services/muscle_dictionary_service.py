@@ -0,0 +1,136 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, Iterable, Optional
+from ..models.exercise import Muscle
+from ..data.exercise_patterns import EXERCISE_PATTERNS
+from .lookup_cache import CommittedLookupCache
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Muscle name <-> id, shared by every session in the process
+muscle_cache = CommittedLookupCache("muscles")
+
+# Whether this process has seeded (and committed) the muscles named in EXERCISE_PATTERNS
+_dictionary_seeded = False
+
+def reset_cache():
+    """Forget all cached muscles (e.g. after switching databases in tests)"""
+    global _dictionary_seeded
+    muscle_cache.clear()
+    _dictionary_seeded = False
+
+def normalize_muscle_name(name: Optional[str]) -> str:
+    """Normalize a muscle name to the snake_case form used by EXERCISE_PATTERNS"""
+    text = re.sub(r"[\s\-/]+", "_", (name or "").strip().lower())
+    return re.sub(r"[^a-z0-9_]+", "", text).strip("_")
+
+class MuscleDictionaryService:
+    """Service for encoding muscle names as small integer ids and back"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def id_for(self, name: Optional[str]) -> Optional[int]:
+        """Get the id for a muscle name, registering the muscle if it is new"""
+        key = normalize_muscle_name(name)
+        if not key:
+            return None
+
+        self.ensure_dictionary()
+        self._load_dictionary()
+        muscle_id = self._find(key)
+        if muscle_id is not None:
+            return muscle_id
+
+        try:
+            with self.db.begin_nested():
+                muscle = Muscle(name=key)
+                self.db.add(muscle)
+                self.db.flush()
+        except IntegrityError:
+            # Registered concurrently by another transaction
+            muscle_id = self._find(key)
+            if muscle_id is None:
+                raise
+            return muscle_id
+        muscle_cache.add_pending(self.db, key, muscle.id, key)
+        return muscle.id
+
+    def lookup_id(self, name: Optional[str]) -> Optional[int]:
+        """Get the id for a muscle name without registering it.
+
+        Read-only: the dictionary is seeded at ingest and startup, never here.
+        """
+        key = normalize_muscle_name(name)
+        if not key:
+            return None
+        self._load_dictionary()
+        return self._find(key)
+
+    def name_for(self, muscle_id: Optional[int]) -> Optional[str]:
+        """Get the muscle name for an id"""
+        if muscle_id is None:
+            return None
+        name = muscle_cache.get_name(self.db, muscle_id)
+        if name is None:
+            muscle = self.db.get(Muscle, muscle_id)
+            if muscle:
+                muscle_cache.add_committed(muscle.name, muscle.id, muscle.name)
+                name = muscle.name
+        return name
+
+    def names_for(self, muscle_ids: Iterable[int]) -> Dict[int, str]:
+        """Decode a batch of muscle ids"""
+        return {muscle_id: self.name_for(muscle_id) for muscle_id in set(muscle_ids)}
+
+    def _find(self, key: str) -> Optional[int]:
+        muscle_id = muscle_cache.get_id(self.db, key)
+        if muscle_id is not None:
+            return muscle_id
+        muscle = self.db.query(Muscle).filter(Muscle.name == key).first()
+        if muscle is None:
+            return None
+        muscle_cache.add_committed(key, muscle.id, muscle.name)
+        return muscle.id
+
+    def ensure_dictionary(self):
+        """Seed the muscles named in the pattern catalog once per process, in the caller's transaction.
+
+        For ingest and startup only; until the seeded rows commit, the next
+        call seeds again.
+        """
+        global _dictionary_seeded
+        if _dictionary_seeded:
+            return
+        known = sorted({
+            activation["muscle_name"]
+            for pattern in EXERCISE_PATTERNS.values()
+            for activation in pattern["muscle_activations"]
+        })
+        existing = {name for (name,) in self.db.query(Muscle.name).filter(Muscle.name.in_(known))}
+        missing = [name for name in known if name not in existing]
+        if missing:
+            try:
+                with self.db.begin_nested():
+                    for name in missing:
+                        self.db.add(Muscle(name=name))
+                    self.db.flush()
+            except IntegrityError:
+                # Seeded concurrently; check again on the next call
+                return
+            for muscle in self.db.query(Muscle).filter(Muscle.name.in_(missing)):
+                muscle_cache.add_pending(self.db, muscle.name, muscle.id, muscle.name)
+            return
+        _dictionary_seeded = True
+
+    def _load_dictionary(self):
+        """Load every committed muscle once per process"""
+        if muscle_cache.loaded:
+            return
+        muscles = self.db.query(Muscle.name, Muscle.id).all()
+        for name, muscle_id in muscles:
+            muscle_cache.add_committed(name, muscle_id, name)
+        muscle_cache.loaded = True
+        logger.debug(f"Loaded {len(muscles)} muscles")
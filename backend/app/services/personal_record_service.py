@@ -0,0 +1,299 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+from ..models.exercise import CanonicalExercise, Exercise, WorkoutSession
+from ..models.progress import PersonalRecord, RecordType, ProgressMetric, MetricType
+from ..core.settings import get_settings
+from .exercise_identity_service import ExerciseIdentityService, normalize_exercise_key
+import logging
+import json
+
+logger = logging.getLogger(__name__)
+
+# Highest rep count that gets its own rep-max record
+MAX_REP_RECORD = 20
+
+def epley_1rm(weight: float, reps: int) -> float:
+    """Estimate a one-rep max with the Epley formula"""
+    if reps <= 1:
+        return float(weight)
+    return weight * (1 + reps / 30.0)
+
+def brzycki_1rm(weight: float, reps: int) -> Optional[float]:
+    """Estimate a one-rep max with the Brzycki formula (undefined from 37 reps)"""
+    if reps <= 1:
+        return float(weight)
+    if reps >= 37:
+        return None
+    return weight * 36.0 / (37 - reps)
+
+def estimate_1rm(weight: float, reps: int, formula: Optional[str] = None) -> Optional[float]:
+    """Estimate a one-rep max with the configured formula"""
+    formula = (formula or get_settings().e1rm_formula).lower()
+    if formula == "brzycki":
+        return brzycki_1rm(weight, reps)
+    return epley_1rm(weight, reps)
+
+def parse_sets(exercise: Exercise) -> List[Tuple[float, int]]:
+    """Decode an exercise's stored reps/weight arrays into (weight, reps) pairs"""
+    try:
+        reps = json.loads(exercise.reps) if exercise.reps else []
+        weight = json.loads(exercise.weight) if exercise.weight else []
+    except (json.JSONDecodeError, TypeError):
+        logger.error(f"Error parsing arrays for exercise {exercise.id}")
+        return []
+
+    if not isinstance(reps, list):
+        reps = [reps]
+    if not isinstance(weight, list):
+        weight = [weight]
+    if not reps or not weight:
+        return []
+
+    # A single value applies to every set (e.g. "3x5 @ 225")
+    count = max(len(reps), len(weight))
+    if len(reps) == 1:
+        reps = reps * count
+    if len(weight) == 1:
+        weight = weight * count
+
+    sets = []
+    for w, r in zip(weight, reps):
+        try:
+            w, r = float(w), int(r)
+        except (TypeError, ValueError):
+            continue
+        if w > 0 and r > 0:
+            sets.append((w, r))
+    return sets
+
+RecordCandidates = Dict[Tuple[RecordType, int], Tuple[float, Optional[float], Optional[int]]]
+
+def record_candidates(sets: List[Tuple[float, int]], day_volume: float) -> Tuple[RecordCandidates, Optional[float]]:
+    """Best (value, weight, set reps) per (record type, reps) for one exercise, and its best e1RM"""
+    candidates: RecordCandidates = {}
+
+    def offer(record_type: RecordType, reps: int, value: float, weight: Optional[float], set_reps: Optional[int]):
+        key = (record_type, reps)
+        if key not in candidates or value > candidates[key][0]:
+            candidates[key] = (value, weight, set_reps)
+
+    best_e1rm = None
+    for weight, reps in sets:
+        offer(RecordType.HEAVIEST_SET, 0, weight, weight, reps)
+        e1rm = estimate_1rm(weight, reps)
+        if e1rm is not None:
+            offer(RecordType.ESTIMATED_1RM, 0, e1rm, weight, reps)
+            best_e1rm = e1rm if best_e1rm is None else max(best_e1rm, e1rm)
+        if reps <= MAX_REP_RECORD:
+            offer(RecordType.REP_MAX, reps, weight, weight, reps)
+
+    if day_volume > 0:
+        offer(RecordType.BEST_VOLUME_DAY, 0, day_volume, None, None)
+    return candidates, best_e1rm
+
+class PersonalRecordService:
+    """Service for maintaining and querying the personal-record index"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.identity_service = ExerciseIdentityService(db)
+
+    def _exercise_key(self, name: Optional[str]) -> str:
+        """Records are keyed on the canonical name so spellings share one record"""
+        canonical_id = self.identity_service.lookup_id(name)
+        if canonical_id is None:
+            return normalize_exercise_key(name)
+        return self.identity_service.name_for_id(canonical_id)
+
+    def update_for_exercise(self, exercise: Exercise) -> List[PersonalRecord]:
+        """Fold a newly stored exercise into the record index.
+
+        Runs inside the caller's transaction and never commits, so records and
+        the exercise they come from are persisted (or rolled back) together.
+        Returns the records that were created or improved.
+        """
+        if exercise.canonical_exercise_id is None:
+            return []
+        session = self.db.get(WorkoutSession, exercise.session_id) if exercise.session_id else None
+        if not session or session.user_id is None:
+            return []
+
+        user_id = session.user_id
+        performed_at = session.start_time or datetime.utcnow()
+        exercise_key = self.identity_service.name_for_id(exercise.canonical_exercise_id)
+
+        sets = parse_sets(exercise)
+        candidates, best_e1rm = record_candidates(sets, self._day_volume(user_id, exercise, performed_at, sets))
+
+        if best_e1rm is not None:
+            # One row per logged exercise makes the e1RM history a single index range scan
+            self.db.add(ProgressMetric(
+                user_id=user_id,
+                exercise_name=exercise_key,
+                metric_type=MetricType.ESTIMATED_1RM,
+                value=best_e1rm,
+                timestamp=performed_at
+            ))
+
+        if not candidates:
+            return []
+
+        current = {
+            (record.record_type, record.reps): record
+            for record in self.db.query(PersonalRecord).filter(
+                PersonalRecord.user_id == user_id,
+                PersonalRecord.exercise_name == exercise_key
+            )
+        }
+
+        updated = []
+        for (record_type, reps), (value, weight, set_reps) in candidates.items():
+            record = current.get((record_type, reps))
+            if record is None:
+                record = PersonalRecord(
+                    user_id=user_id,
+                    exercise_name=exercise_key,
+                    record_type=record_type,
+                    reps=reps
+                )
+                self.db.add(record)
+            elif value <= record.value:
+                continue
+            record.value = value
+            record.weight = weight
+            record.set_reps = set_reps
+            record.exercise_id = exercise.id
+            record.achieved_at = performed_at
+            updated.append(record)
+
+        if updated:
+            logger.debug(f"Updated {len(updated)} personal records for user {user_id} on {exercise_key}")
+        return updated
+
+    def rebuild(self, user_id: Optional[int] = None, batch_size: int = 5000) -> int:
+        """Recompute records and the e1RM history from the full history, e.g. after a bulk load.
+
+        Replays exercises in the order they were stored, with the same rules as
+        update_for_exercise, and replaces the existing rows with bulk inserts.
+        Never commits; returns the number of records written.
+        """
+        history = (
+            self.db.query(
+                Exercise.id,
+                Exercise.canonical_exercise_id,
+                Exercise.total_volume,
+                Exercise.reps,
+                Exercise.weight,
+                CanonicalExercise.name.label("exercise_key"),
+                WorkoutSession.user_id,
+                WorkoutSession.start_time
+            )
+            .join(CanonicalExercise, Exercise.canonical_exercise_id == CanonicalExercise.id)
+            .join(WorkoutSession, Exercise.session_id == WorkoutSession.id)
+            .filter(WorkoutSession.user_id.isnot(None))
+        )
+        stale_records = self.db.query(PersonalRecord)
+        stale_metrics = self.db.query(ProgressMetric).filter(ProgressMetric.metric_type == MetricType.ESTIMATED_1RM)
+        if user_id is not None:
+            history = history.filter(WorkoutSession.user_id == user_id)
+            stale_records = stale_records.filter(PersonalRecord.user_id == user_id)
+            stale_metrics = stale_metrics.filter(ProgressMetric.user_id == user_id)
+        stale_records.delete(synchronize_session=False)
+        stale_metrics.delete(synchronize_session=False)
+
+        records: Dict[Tuple[int, str, RecordType, int], dict] = {}
+        # Recorded total volume per (user, exercise, day), as _day_volume sums it at ingest
+        day_totals: Dict[Tuple[int, int, datetime], float] = {}
+        metrics: List[dict] = []
+        for entry in history.order_by(Exercise.id).yield_per(batch_size):
+            performed_at = entry.start_time or datetime.utcnow()
+            day = datetime(performed_at.year, performed_at.month, performed_at.day)
+            day_key = (entry.user_id, entry.canonical_exercise_id, day)
+            # History rows carry the id, reps and weight parse_sets reads
+            sets = parse_sets(entry)
+            volume = entry.total_volume if entry.total_volume is not None else sum(w * r for w, r in sets)
+            candidates, best_e1rm = record_candidates(sets, float(volume or 0.0) + day_totals.get(day_key, 0.0))
+            if entry.start_time is not None:
+                day_totals[day_key] = day_totals.get(day_key, 0.0) + float(entry.total_volume or 0.0)
+
+            if best_e1rm is not None:
+                metrics.append({
+                    "user_id": entry.user_id, "exercise_name": entry.exercise_key,
+                    "metric_type": MetricType.ESTIMATED_1RM, "value": best_e1rm, "timestamp": performed_at,
+                })
+                if len(metrics) >= batch_size:
+                    self.db.execute(insert(ProgressMetric), metrics)
+                    metrics = []
+            for (record_type, reps), (value, weight, set_reps) in candidates.items():
+                key = (entry.user_id, entry.exercise_key, record_type, reps)
+                if key in records and value <= records[key]["value"]:
+                    continue
+                records[key] = {
+                    "user_id": entry.user_id, "exercise_name": entry.exercise_key, "record_type": record_type,
+                    "reps": reps, "value": value, "weight": weight, "set_reps": set_reps,
+                    "exercise_id": entry.id, "achieved_at": performed_at,
+                }
+        if metrics:
+            self.db.execute(insert(ProgressMetric), metrics)
+        rows = list(records.values())
+        for start in range(0, len(rows), batch_size):
+            self.db.execute(insert(PersonalRecord), rows[start:start + batch_size])
+        logger.info(f"Rebuilt {len(rows)} personal records")
+        return len(rows)
+
+    def _day_volume(self, user_id: int, exercise: Exercise, performed_at: datetime,
+                    sets: List[Tuple[float, int]]) -> float:
+        """Total volume for this exercise on the day it was performed"""
+        volume = exercise.total_volume
+        if volume is None:
+            volume = sum(weight * reps for weight, reps in sets)
+
+        day_start = datetime(performed_at.year, performed_at.month, performed_at.day)
+        earlier = (
+            self.db.query(func.coalesce(func.sum(Exercise.total_volume), 0.0))
+            .join(WorkoutSession, Exercise.session_id == WorkoutSession.id)
+            .filter(
+                WorkoutSession.user_id == user_id,
+                WorkoutSession.start_time >= day_start,
+                WorkoutSession.start_time < day_start + timedelta(days=1),
+                Exercise.canonical_exercise_id == exercise.canonical_exercise_id,
+                Exercise.id != exercise.id
+            )
+            .scalar()
+        )
+        return float(volume or 0.0) + float(earlier or 0.0)
+
+    def get_records(self, user_id: int, exercise_name: Optional[str] = None) -> List[PersonalRecord]:
+        """Get all personal records for a user, optionally for one exercise"""
+        query = self.db.query(PersonalRecord).filter(PersonalRecord.user_id == user_id)
+        if exercise_name:
+            query = query.filter(PersonalRecord.exercise_name == self._exercise_key(exercise_name))
+        return query.order_by(PersonalRecord.exercise_name, PersonalRecord.record_type, PersonalRecord.reps).all()
+
+    def get_record(self, user_id: int, exercise_name: str, record_type: RecordType,
+                   reps: int = 0) -> Optional[PersonalRecord]:
+        """Look up a single personal record by its unique key"""
+        return (
+            self.db.query(PersonalRecord)
+            .filter(
+                PersonalRecord.user_id == user_id,
+                PersonalRecord.exercise_name == self._exercise_key(exercise_name),
+                PersonalRecord.record_type == record_type,
+                PersonalRecord.reps == (reps if record_type == RecordType.REP_MAX else 0)
+            )
+            .first()
+        )
+
+    def get_e1rm_series(self, user_id: int, exercise_name: str,
+                        days: Optional[int] = None) -> List[ProgressMetric]:
+        """Get the estimated 1RM history for an exercise, oldest first"""
+        query = self.db.query(ProgressMetric).filter(
+            ProgressMetric.user_id == user_id,
+            ProgressMetric.exercise_name == self._exercise_key(exercise_name),
+            ProgressMetric.metric_type == MetricType.ESTIMATED_1RM
+        )
+        if days is not None:
+            query = query.filter(ProgressMetric.timestamp >= datetime.utcnow() - timedelta(days=days))
+        return query.order_by(ProgressMetric.timestamp.asc()).all()
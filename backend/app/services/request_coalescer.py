@@ -0,0 +1,148 @@
+"""
+Request coalescing for duplicate agent invocations.
+
+Concurrent calls with the same key share one in-flight call instead of each
+starting their own. Within a process they await the same task; with Redis
+enabled, workers also elect a leader through a short-lived lock and the others
+pick up its result from a result key.
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+from ..core.responses import dumps
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Deletes the lock only if we still own it (it may have expired and been re-taken)
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+def normalize_workout_text(text: str) -> str:
+    """Canonical form of workout text: NFKC, case-folded, whitespace collapsed"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return re.sub(r"\s+", " ", text).strip()
+
+def coalescing_key(text: str, scope: str = "") -> str:
+    """Key for text; calls whose replies can differ (e.g. per-user sessions) need distinct scopes"""
+    return hashlib.sha256(f"{scope}\n{normalize_workout_text(text)}".encode()).hexdigest()
+
+class _RedisUnavailable(Exception):
+    pass
+
+class RequestCoalescer:
+    """Deduplicates identical in-flight calls; optionally across workers via Redis"""
+
+    def __init__(
+        self,
+        redis=None,
+        prefix: str = "coalesce",
+        lock_ttl: float = 60.0,
+        result_ttl: float = 30.0,
+        poll_interval: float = 0.1
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.stats = {"calls": 0, "coalesced": 0, "remote_hits": 0}
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Return call()'s result, sharing it with concurrent runs for the same key"""
+        self.stats["calls"] += 1
+        shared = self._in_flight.get(key)
+        if shared is None:
+            shared = asyncio.ensure_future(self._run_shared(key, call))
+            self._in_flight[key] = shared
+            shared.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+            logger.debug(f"Coalesced duplicate request {key[:12]}")
+        # Shielded so a caller that disconnects doesn't cancel the call for the others
+        result = await asyncio.shield(shared)
+        # Every caller gets its own copy to mutate
+        return copy.deepcopy(result)
+
+    async def _run_shared(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        if self.redis is None:
+            return await call()
+        try:
+            return await self._run_across_workers(key, call)
+        except _RedisUnavailable as e:
+            logger.warning(f"Cross-worker coalescing unavailable, calling directly: {str(e)}")
+            return await call()
+
+    async def _run_across_workers(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        result_key = f"{self.prefix}:result:{key}"
+        lock_key = f"{self.prefix}:lock:{key}"
+        token = uuid.uuid4().hex
+
+        cached = await self._redis("get", result_key)
+        if cached is not None:
+            self.stats["remote_hits"] += 1
+            return json.loads(cached)
+
+        if await self._redis("set", lock_key, token, nx=True, px=int(self.lock_ttl * 1000)):
+            try:
+                result = await call()
+                try:
+                    await self.redis.set(result_key, dumps(result), px=int(self.result_ttl * 1000))
+                except Exception as e:
+                    logger.warning(f"Failed to publish coalesced result: {str(e)}")
+                return result
+            finally:
+                await self._release(lock_key, token)
+
+        # Another worker holds the lock: wait for its result while it keeps the lock
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl
+        while loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            cached = await self._redis("get", result_key)
+            if cached is not None:
+                self.stats["remote_hits"] += 1
+                return json.loads(cached)
+            if not await self._redis("exists", lock_key):
+                break
+        # The leader failed or gave up; make the call ourselves
+        return await call()
+
+    async def _redis(self, command: str, *args, **kwargs):
+        try:
+            return await getattr(self.redis, command)(*args, **kwargs)
+        except Exception as e:
+            raise _RedisUnavailable(str(e)) from e
+
+    async def _release(self, lock_key: str, token: str):
+        try:
+            await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            # The lock expires on its own
+            logger.warning(f"Failed to release coalescing lock: {str(e)}")
+
+def build_coalescer(settings) -> Optional[RequestCoalescer]:
+    """Coalescer configured from settings; None when coalescing is disabled"""
+    if not settings.coalesce_enabled:
+        return None
+    redis = None
+    if settings.coalesce_redis:
+        # redis.asyncio is only needed when cross-worker coalescing is on
+        import redis.asyncio as aioredis
+
+        redis = aioredis.Redis(host=settings.redis_host, port=settings.redis_port)
+    return RequestCoalescer(
+        redis=redis,
+        lock_ttl=settings.bedrock_request_deadline_seconds,
+        result_ttl=settings.coalesce_result_ttl_seconds
+    )
@@ -0,0 +1,182 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from ..core.settings import Settings
+from ..models.exercise import WorkoutSession
+from .workout_storage_service import WorkoutStorageService
+from .personal_record_service import PersonalRecordService
+from .data_version_service import DataVersionService
+from .exercise_identity_service import ExerciseIdentityService
+from .muscle_dictionary_service import MuscleDictionaryService
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class WarmupStep:
+    name: str
+    ok: bool
+    duration_ms: float
+    detail: Optional[str] = None
+
+@dataclass
+class WarmupReport:
+    steps: List[WarmupStep] = field(default_factory=list)
+    completed_at: Optional[datetime] = None
+    # Startup stopped waiting and began serving before every step had finished
+    timed_out: bool = False
+
+    @property
+    def ready(self) -> bool:
+        return self.completed_at is not None
+
+    def summary(self) -> dict:
+        return {
+            "ready": self.ready,
+            "timed_out": self.timed_out,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "steps": {step.name: {"ok": step.ok, "ms": round(step.duration_ms, 1), "detail": step.detail} for step in self.steps},
+        }
+
+class WarmupService:
+    """Pays first-request costs (pool, Redis, Bedrock client, caches, query plans) at startup.
+
+    Every step is best-effort: failures are logged and recorded in the report,
+    never raised, so a missing optional backend can't keep the app from starting.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        session_factory: sessionmaker,
+        settings: Settings,
+        cache_warmers: Sequence[Callable[[Session], None]] = ()
+    ):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.settings = settings
+        self.cache_warmers = cache_warmers
+        self.report = WarmupReport()
+
+    def run(self) -> WarmupReport:
+        """Run every enabled warm-up step and return the report"""
+        global last_report
+        last_report = self.report
+        started = time.perf_counter()
+        self._step("db_pool", self.warm_db_pool)
+        if self.settings.warmup_redis:
+            self._step("redis", self.ping_redis)
+        if self.settings.warmup_bedrock:
+            self._step("bedrock", self.build_bedrock_client)
+        self._step("lookup_caches", self.warm_lookup_caches)
+        self._step("analytics_queries", self.run_analytics_queries)
+        if not self.report.timed_out:
+            self.report.completed_at = datetime.utcnow()
+        logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return self.report
+
+    async def run_with_timeout(self, timeout: float) -> WarmupReport:
+        """Run warm-up in a worker thread, giving up waiting after timeout seconds.
+
+        On timeout the report is marked finished (and timed out) so readiness
+        follows the decision to serve; the remaining steps still run in the background.
+        """
+        try:
+            await asyncio.wait_for(run_in_threadpool(self.run), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Warm-up did not finish within {timeout}s; serving anyway")
+            self.report.timed_out = True
+            self.report.completed_at = datetime.utcnow()
+        return self.report
+
+    def _step(self, name: str, fn: Callable[[], Optional[str]]):
+        started = time.perf_counter()
+        try:
+            detail = fn()
+            ok = True
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {str(e)}")
+            detail, ok = str(e), False
+        self.report.steps.append(WarmupStep(name, ok, (time.perf_counter() - started) * 1000, detail))
+
+    def warm_db_pool(self) -> str:
+        """Open N connections at once so the pool holds them for the first requests"""
+        connections = []
+        try:
+            for _ in range(max(0, self.settings.warmup_db_connections)):
+                connection = self.engine.connect()
+                connections.append(connection)
+                connection.execute(text("SELECT 1"))
+        finally:
+            for connection in connections:
+                connection.close()
+        return f"{len(connections)} connections"
+
+    def ping_redis(self) -> str:
+        from .cache_service import CacheService
+
+        CacheService().redis_client.ping()
+        return "pong"
+
+    def build_bedrock_client(self) -> str:
+        from .bedrock_agent_service import get_bedrock_agent_service
+
+        get_bedrock_agent_service()
+        return "ready"
+
+    def warm_lookup_caches(self) -> str:
+        """Load the exercise alias and muscle caches, then any caches registered by routes"""
+        with self.session_factory() as db:
+            # Seed the exercise catalog and muscles here so request paths only ever read them
+            ExerciseIdentityService(db).ensure_catalog()
+            MuscleDictionaryService(db).ensure_dictionary()
+            db.commit()
+            ExerciseIdentityService(db).lookup_id("bench press")
+            MuscleDictionaryService(db).lookup_id("chest")
+
+            for warm in self.cache_warmers:
+                warm(db)
+        return "loaded"
+
+    def run_analytics_queries(self) -> str:
+        """Run the dashboard's queries once for a representative user"""
+        with self.session_factory() as db:
+            user_id = self.settings.warmup_user_id or self._most_recent_user(db)
+            if user_id is None:
+                return "no users yet"
+
+            storage = WorkoutStorageService(db)
+            queries = [
+                lambda: DataVersionService(db).get_version(user_id),
+                lambda: storage.list_user_sessions(user_id, limit=20),
+                lambda: storage.get_muscle_tracking(user_id=user_id),
+                lambda: storage.get_muscle_volume_data("weekly", user_id=user_id),
+                lambda: PersonalRecordService(db).get_records(user_id),
+            ]
+            failed = 0
+            for query in queries:
+                try:
+                    query()
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"Warm-up analytics query failed: {str(e)}")
+                    db.rollback()
+            return f"user {user_id}, {len(queries) - failed}/{len(queries)} queries"
+
+    def _most_recent_user(self, db: Session) -> Optional[int]:
+        return (
+            db.query(WorkoutSession.user_id)
+            .filter(WorkoutSession.user_id.isnot(None))
+            .order_by(WorkoutSession.start_time.desc())
+            .limit(1)
+            .scalar()
+        )
+
+# Report of the last warm-up in this process; None until one has started
+last_report: Optional[WarmupReport] = None
@@ -0,0 +1,193 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+from ..models.exercise import Exercise, MuscleActivation, MuscleTracking, WorkoutSession
+from .personal_record_service import parse_sets
+import logging
+
+logger = logging.getLogger(__name__)
+
+# EWMA spans in days; a span of N weights each day by 2 / (N + 1)
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+ACUTE_RATE = 2.0 / (ACUTE_DAYS + 1)
+CHRONIC_RATE = 2.0 / (CHRONIC_DAYS + 1)
+
+# Acute:chronic ratio bands; below the first is detraining, above the last is a load spike
+UNDERTRAINED_RATIO = 0.8
+OVERREACHING_RATIO = 1.3
+OVERTRAINED_RATIO = 1.5
+
+def _days_between(later: datetime, earlier: datetime) -> float:
+    return (later - earlier).total_seconds() / 86400.0
+
+@dataclass(frozen=True)
+class WorkloadState:
+    """Acute and chronic load as of a point in time"""
+    acute: float
+    chronic: float
+    as_of: Optional[datetime]
+
+    def at(self, moment: datetime) -> "WorkloadState":
+        """The state decayed forward to moment (unchanged if moment is not later)"""
+        if self.as_of is None or moment <= self.as_of:
+            return self
+        days = _days_between(moment, self.as_of)
+        return WorkloadState(
+            self.acute * (1 - ACUTE_RATE) ** days,
+            self.chronic * (1 - CHRONIC_RATE) ** days,
+            moment,
+        )
+
+    def add(self, load: float, performed_at: datetime) -> "WorkloadState":
+        """Fold in one workout's load.
+
+        A back-dated workout is decayed forward to the current state instead,
+        which gives the same result as replaying history in order.
+        """
+        if self.as_of is None or performed_at >= self.as_of:
+            state = self.at(performed_at) if self.as_of else WorkloadState(0.0, 0.0, performed_at)
+            return WorkloadState(state.acute + ACUTE_RATE * load, state.chronic + CHRONIC_RATE * load, performed_at)
+        days = _days_between(self.as_of, performed_at)
+        return WorkloadState(
+            self.acute + ACUTE_RATE * load * (1 - ACUTE_RATE) ** days,
+            self.chronic + CHRONIC_RATE * load * (1 - CHRONIC_RATE) ** days,
+            self.as_of,
+        )
+
+def assess_workload(acute: float, chronic: float, load_started_at: Optional[datetime],
+                    now: datetime) -> Tuple[str, float, Optional[float]]:
+    """(status, recovery_status, acute:chronic ratio) for loads already decayed to now.
+
+    Until a muscle has CHRONIC_DAYS of history the chronic average is still
+    filling in and the ratio would overstate every session, so it reports
+    "Building". Recovery is 1.0 while acute load is at or under chronic load
+    and falls as the ratio climbs above 1.
+    """
+    if chronic <= 0 or load_started_at is None:
+        return "Undertrained", 1.0, None
+    ratio = acute / chronic
+    recovery = min(1.0, 1.0 / ratio) if ratio > 0 else 1.0
+    if _days_between(now, load_started_at) < CHRONIC_DAYS:
+        status = "Building"
+    elif ratio < UNDERTRAINED_RATIO:
+        status = "Undertrained"
+    elif ratio <= OVERREACHING_RATIO:
+        status = "Optimal"
+    elif ratio <= OVERTRAINED_RATIO:
+        status = "Overreaching"
+    else:
+        status = "Overtrained"
+    return status, recovery, ratio
+
+def exercise_volume(exercise: Exercise) -> float:
+    """Volume of an exercise, from its sets when the total wasn't recorded"""
+    if exercise.total_volume is not None:
+        return float(exercise.total_volume)
+    return sum(weight * reps for weight, reps in parse_sets(exercise))
+
+class WorkloadService:
+    """Service maintaining per-muscle acute and chronic training load"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def update_for_exercise(self, exercise: Exercise, activations: Iterable[MuscleActivation]) -> List[MuscleTracking]:
+        """Fold a newly stored exercise into its muscles' workload state.
+
+        O(1) per muscle: the stored state is decayed to the workout and the
+        workout's load added. The rows are locked for the rest of the caller's
+        transaction, which this never commits. Returns the updated rows.
+        """
+        session = self.db.get(WorkoutSession, exercise.session_id) if exercise.session_id else None
+        if not session or session.user_id is None:
+            return []
+        performed_at = session.start_time or datetime.utcnow()
+
+        volume = exercise_volume(exercise)
+        loads: Dict[int, float] = {}
+        for activation in activations:
+            if activation.muscle_id is not None:
+                loads[activation.muscle_id] = loads.get(activation.muscle_id, 0.0) + volume * (activation.estimated_volume or 0.0)
+        if not loads:
+            return []
+
+        # Create missing rows without racing a concurrent first workout for the same muscle,
+        # then lock them so concurrent ingests fold in one after another
+        insert = postgresql.insert if self.db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        self.db.execute(
+            insert(MuscleTracking)
+            .values([
+                {"user_id": session.user_id, "muscle_id": muscle_id, "acute_load": 0.0, "chronic_load": 0.0}
+                for muscle_id in sorted(loads)
+            ])
+            .on_conflict_do_nothing(index_elements=["user_id", "muscle_id"])
+        )
+        rows = (
+            self.db.query(MuscleTracking)
+            .filter(MuscleTracking.user_id == session.user_id, MuscleTracking.muscle_id.in_(loads))
+            .order_by(MuscleTracking.muscle_id)
+            .with_for_update()
+            .populate_existing()
+            .all()
+        )
+        for row in rows:
+            self._apply(row, loads[row.muscle_id], performed_at)
+        return rows
+
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """Recompute workload state from the full history, e.g. after a bulk load.
+
+        Replaces the state of every (user, muscle) pair with logged activations
+        in one pass over history ordered by time. Never commits; returns the
+        number of rows written.
+        """
+        history = (
+            self.db.query(
+                WorkoutSession.user_id,
+                MuscleActivation.muscle_id,
+                WorkoutSession.start_time,
+                Exercise.id,
+                Exercise.total_volume,
+                Exercise.reps,
+                Exercise.weight,
+                MuscleActivation.estimated_volume
+            )
+            .select_from(MuscleActivation)
+            .join(Exercise, MuscleActivation.exercise_id == Exercise.id)
+            .join(WorkoutSession, Exercise.session_id == WorkoutSession.id)
+            .filter(WorkoutSession.user_id.isnot(None), MuscleActivation.muscle_id.isnot(None))
+        )
+        existing = self.db.query(MuscleTracking).filter(MuscleTracking.muscle_id.isnot(None))
+        if user_id is not None:
+            history = history.filter(WorkoutSession.user_id == user_id)
+            existing = existing.filter(MuscleTracking.user_id == user_id)
+        rows = {(row.user_id, row.muscle_id): row for row in existing}
+
+        written = 0
+        key, row = None, None
+        for entry in history.order_by(WorkoutSession.user_id, MuscleActivation.muscle_id, WorkoutSession.start_time).yield_per(5000):
+            if (entry.user_id, entry.muscle_id) != key:
+                key = (entry.user_id, entry.muscle_id)
+                row = rows.get(key)
+                if row is None:
+                    row = MuscleTracking(user_id=entry.user_id, muscle_id=entry.muscle_id)
+                    self.db.add(row)
+                row.acute_load, row.chronic_load = 0.0, 0.0
+                row.load_updated_at = row.load_started_at = row.last_trained = None
+                written += 1
+            # History rows carry the id, total_volume, reps and weight exercise_volume reads
+            volume = exercise_volume(entry)
+            self._apply(row, volume * (entry.estimated_volume or 0.0), entry.start_time)
+        logger.info(f"Rebuilt workload state for {written} muscles")
+        return written
+
+    def _apply(self, row: MuscleTracking, load: float, performed_at: datetime):
+        state = WorkloadState(row.acute_load or 0.0, row.chronic_load or 0.0, row.load_updated_at).add(load, performed_at)
+        row.acute_load, row.chronic_load, row.load_updated_at = state.acute, state.chronic, state.as_of
+        if row.load_started_at is None or performed_at < row.load_started_at:
+            row.load_started_at = performed_at
+        if row.last_trained is None or performed_at > row.last_trained:
+            row.last_trained = performed_at
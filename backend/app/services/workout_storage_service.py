@@ -1,13 +1,21 @@
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import func, cast, Date, case
+from sqlalchemy import func, cast, Date, case, and_, or_, select, true
 from ..models.exercise import (
     Exercise,
     WorkoutSession,
     MuscleActivation,
-    MuscleActivationLevel
+    MuscleActivationLevel,
+    MuscleTracking
 )
+from ..core.time_buckets import MAX_BUCKETS, BucketSpec, as_utc_naive, bucket_series
+from .personal_record_service import PersonalRecordService
+from .workload_service import WorkloadState, WorkloadService, assess_workload
+from .exercise_identity_service import ExerciseIdentityService
+from .muscle_dictionary_service import MuscleDictionaryService
+import base64
+import binascii
 import logging
 import json
 import traceback
@@ -15,6 +23,30 @@ from sqlalchemy.exc import SQLAlchemyError
 
 logger = logging.getLogger(__name__)
 
+# Hard cap on sessions returned by one page of list_user_sessions
+MAX_SESSION_PAGE_SIZE = 200
+
+# Load an exercise's activations in one IN query per batch of exercises; each
+# activation's muscle is joined in the same statement (MuscleActivation.muscle is lazy="joined")
+EXERCISE_GRAPH = selectinload(Exercise.muscle_activations)
+
+# Session -> exercises -> activations -> muscles in three statements regardless of size
+SESSION_GRAPH = selectinload(WorkoutSession.exercises).selectinload(Exercise.muscle_activations)
+
+def encode_session_cursor(start_time: datetime, session_id: int) -> str:
+    """Encode the (start_time, id) position of the last row on a page as an opaque cursor"""
+    raw = f"{start_time.isoformat()}|{session_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_session_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_session_cursor; raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        start_time, session_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(start_time), int(session_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid session cursor: {cursor}") from e
+
 class WorkoutStorageService:
     """Service for storing workout data in the database"""
     
@@ -46,14 +78,89 @@ class WorkoutStorageService:
             logger.error(f"Error getting workout session: {str(e)}")
             return None
 
+    def get_session_graph(self, session_id: int) -> Optional[WorkoutSession]:
+        """Get a workout session with its exercises, activations and muscles loaded"""
+        try:
+            return (
+                self.db.query(WorkoutSession)
+                .options(SESSION_GRAPH)
+                .filter(WorkoutSession.id == session_id)
+                .first()
+            )
+        except Exception as e:
+            logger.error(f"Error loading workout session graph: {str(e)}")
+            return None
+
+    def list_user_sessions(
+        self,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of a user's sessions, newest first, and the cursor for the next page"""
+        try:
+            limit = max(1, min(limit, MAX_SESSION_PAGE_SIZE))
+            # Project only the listed columns; no ORM identity map or relationship loading
+            query = self.db.query(
+                WorkoutSession.id,
+                WorkoutSession.start_time,
+                WorkoutSession.end_time,
+                WorkoutSession.total_volume
+            ).filter(
+                WorkoutSession.user_id == user_id,
+                WorkoutSession.start_time.isnot(None)
+            )
+
+            if start_date:
+                query = query.filter(WorkoutSession.start_time >= start_date)
+            if end_date:
+                query = query.filter(WorkoutSession.start_time < end_date)
+            if cursor:
+                after_time, after_id = decode_session_cursor(cursor)
+                query = query.filter(or_(
+                    WorkoutSession.start_time < after_time,
+                    and_(WorkoutSession.start_time == after_time, WorkoutSession.id < after_id)
+                ))
+
+            # Fetch one extra row to learn whether another page exists
+            rows = query.order_by(
+                WorkoutSession.start_time.desc(),
+                WorkoutSession.id.desc()
+            ).limit(limit + 1).all()
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_session_cursor(rows[-1].start_time, rows[-1].id)
+
+            sessions = [
+                {
+                    "id": row.id,
+                    "start_time": row.start_time,
+                    "end_time": row.end_time,
+                    "total_volume": row.total_volume
+                }
+                for row in rows
+            ]
+            return sessions, next_cursor
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Error listing sessions for user {user_id}: {str(e)}")
+            raise
+
     def get_session_exercises(self, session_id: int) -> List[Exercise]:
         """Get all exercises for a workout session"""
         try:
-            exercises = self.db.query(Exercise).filter(Exercise.session_id == session_id).all()
-            # Load relationships
-            for exercise in exercises:
-                _ = exercise.muscle_activations
-            return exercises
+            return (
+                self.db.query(Exercise)
+                .options(EXERCISE_GRAPH)
+                .filter(Exercise.session_id == session_id)
+                .order_by(Exercise.id)
+                .all()
+            )
         except Exception as e:
             logger.error(f"Error getting session exercises: {str(e)}")
             return []
@@ -106,6 +213,7 @@ class WorkoutStorageService:
             exercise = Exercise(
                 session_id=session_id,
                 name=name,
+                canonical_exercise_id=ExerciseIdentityService(self.db).resolve_id(name, movement_pattern),
                 movement_pattern=movement_pattern,
                 notes=notes,
                 num_sets=num_sets,
@@ -124,15 +232,22 @@ class WorkoutStorageService:
             self.db.flush()  # Get the exercise ID
             
             # Add muscle activations if provided
+            activations = []
             if muscle_activations:
+                muscles = MuscleDictionaryService(self.db)
                 for activation in muscle_activations:
                     muscle_activation = MuscleActivation(
                         exercise_id=exercise.id,
-                        muscle_name=activation.get("muscle_name"),
+                        muscle_id=muscles.id_for(activation.get("muscle_name")),
                         activation_level=MuscleActivationLevel[activation.get("activation_level", "PRIMARY")],
                         estimated_volume=activation.get("estimated_volume")
                     )
                     self.db.add(muscle_activation)
+                    activations.append(muscle_activation)
+            
+            # Keep the personal-record index and workload state current in the same transaction
+            PersonalRecordService(self.db).update_for_exercise(exercise)
+            WorkloadService(self.db).update_for_exercise(exercise, activations)
             
             self.db.commit()
             self.db.refresh(exercise)
@@ -146,11 +261,12 @@ class WorkoutStorageService:
     def get_exercise(self, exercise_id: int) -> Optional[Exercise]:
         """Get exercise by ID with proper array handling"""
         try:
-            exercise = self.db.query(Exercise).filter(Exercise.id == exercise_id).first()
-            if exercise:
-                # Load relationships
-                _ = exercise.muscle_activations
-            return exercise
+            return (
+                self.db.query(Exercise)
+                .options(EXERCISE_GRAPH)
+                .filter(Exercise.id == exercise_id)
+                .first()
+            )
         except Exception as e:
             logger.error(f"Error getting exercise: {str(e)}")
             return None
@@ -165,6 +281,7 @@ class WorkoutStorageService:
         exercise = Exercise(
             session_id=session_id,
             name=name,
+            canonical_exercise_id=ExerciseIdentityService(self.db).resolve_id(name, movement_pattern),
             movement_pattern=movement_pattern,
             num_sets=sets,
             reps=reps,
@@ -196,7 +313,7 @@ class WorkoutStorageService:
             
             muscle_activation = MuscleActivation(
                 exercise_id=exercise_id,
-                muscle_name=muscle_name.lower(),
+                muscle_id=MuscleDictionaryService(self.db).id_for(muscle_name),
                 activation_level=enum_member,
                 estimated_volume=estimated_volume
             )
@@ -215,11 +332,10 @@ class WorkoutStorageService:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         week_start = datetime.utcnow() - timedelta(days=datetime.utcnow().weekday())
         
-        # Base query
+        # Base query, grouped on the integer muscle id
         query = (
             self.db.query(
-                MuscleActivation.id,
-                MuscleActivation.muscle_name,
+                MuscleActivation.muscle_id,
                 func.sum(MuscleActivation.estimated_volume).label("total_volume"),
                 func.count(MuscleActivation.id).label("exercise_count"),
                 func.max(WorkoutSession.start_time).label("last_trained"),
@@ -233,11 +349,20 @@ class WorkoutStorageService:
                     (WorkoutSession.start_time >= cutoff_date, MuscleActivation.estimated_volume),
                     else_=0
                 )).label("monthly_volume"),
-                WorkoutSession.user_id
+                WorkoutSession.user_id,
+                # Workload state is one row per (user, muscle), read in the same statement
+                func.max(MuscleTracking.acute_load).label("acute_load"),
+                func.max(MuscleTracking.chronic_load).label("chronic_load"),
+                func.max(MuscleTracking.load_updated_at).label("load_updated_at"),
+                func.max(MuscleTracking.load_started_at).label("load_started_at")
             )
             .select_from(MuscleActivation)
             .join(Exercise)
             .join(WorkoutSession)
+            .outerjoin(MuscleTracking, and_(
+                MuscleTracking.user_id == WorkoutSession.user_id,
+                MuscleTracking.muscle_id == MuscleActivation.muscle_id
+            ))
             .filter(WorkoutSession.start_time >= cutoff_date)
             .filter(WorkoutSession.end_time.isnot(None))  # Only include completed sessions
         )
@@ -249,12 +374,12 @@ class WorkoutStorageService:
         # Execute query with grouping
         activations = (
             query.group_by(
-                MuscleActivation.id,
-                MuscleActivation.muscle_name,
+                MuscleActivation.muscle_id,
                 WorkoutSession.user_id
             )
             .all()
         )
+        muscle_names = MuscleDictionaryService(self.db).names_for(a.muscle_id for a in activations)
         
         # Debug logging
         if not activations:
@@ -268,24 +393,29 @@ class WorkoutStorageService:
             )
             logger.info(f"Found {len(sessions)} completed workout sessions")
         
+        now = datetime.utcnow()
         tracking_data = []
         for activation in activations:
-            status = self._calculate_muscle_status(
-                activation.total_volume,
-                activation.exercise_count,
-                activation.last_trained
+            load = WorkloadState(
+                activation.acute_load or 0.0, activation.chronic_load or 0.0, activation.load_updated_at
+            ).at(now)
+            status, recovery_status, ratio = assess_workload(
+                load.acute, load.chronic, activation.load_started_at, now
             )
             tracking = {
-                "id": activation.id,
+                "id": activation.muscle_id,
                 "user_id": activation.user_id,
-                "muscle_name": activation.muscle_name,
+                "muscle_name": muscle_names[activation.muscle_id],
                 "total_volume": activation.total_volume,
                 "exercise_count": activation.exercise_count,
                 "last_trained": activation.last_trained,
                 "weekly_volume": activation.weekly_volume or 0.0,
                 "monthly_volume": activation.monthly_volume or 0.0,
                 "coverage_rating": "Optimal" if activation.exercise_count >= 2 else "Needs Work",
-                "recovery_status": 1.0,  # Default to fully recovered
+                "recovery_status": recovery_status,
+                "acute_load": load.acute,
+                "chronic_load": load.chronic,
+                "acute_chronic_ratio": ratio,
                 "status": status,
                 "week_start": week_start
             }
@@ -293,82 +423,86 @@ class WorkoutStorageService:
         
         return tracking_data
 
-    def get_muscle_volume_data(self, timeframe: str = "weekly", user_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get volume data for all muscles in the specified timeframe"""
-        if timeframe == "weekly":
-            cutoff_date = datetime.utcnow() - timedelta(days=7)
-        else:  # monthly
-            cutoff_date = datetime.utcnow() - timedelta(days=30)
+    def get_muscle_volume_data(self, timeframe: str = "weekly", user_id: Optional[int] = None,
+                               bucket: Optional[str] = None, start: Optional[datetime] = None,
+                               end: Optional[datetime] = None, mesocycle_weeks: int = 4) -> List[Dict[str, Any]]:
+        """Volume per muscle per time bucket, oldest bucket first.
+
+        Without an explicit range, timeframe picks the last 7 ("weekly") or 30
+        ("monthly") days, bucketed by day or week unless bucket says otherwise.
+        Every muscle trained in the range gets a row for every bucket, with
+        zero volume where it wasn't trained, so series line up across muscles.
+        Raises ValueError for an empty range or one with too many buckets.
+        """
+        end = as_utc_naive(end) if end else datetime.utcnow()
+        if start is None:
+            start = end - timedelta(days=7 if timeframe == "weekly" else 30)
+        start = as_utc_naive(start)
+        spec = BucketSpec(bucket or ("day" if timeframe == "weekly" else "week"), mesocycle_weeks)
+        if start >= end:
+            raise ValueError("Range start must be before its end")
+        if spec.count(start, end) > MAX_BUCKETS:
+            raise ValueError(f"Range spans more than {MAX_BUCKETS} {spec.unit} buckets")
         
-        logger.debug(f"Getting volume data since {cutoff_date}")
+        logger.debug(f"Getting {spec.unit} volume data from {start} to {end}")
         
         try:
-            # First check if we have any workout sessions
-            sessions = (
-                self.db.query(WorkoutSession)
-                .filter(WorkoutSession.start_time >= cutoff_date)
-                .filter(WorkoutSession.end_time.isnot(None))
-            )
+            buckets = bucket_series(spec, start, end, self.db.get_bind().dialect.name)
             
-            if user_id is not None:
-                sessions = sessions.filter(WorkoutSession.user_id == user_id)
-            
-            sessions = sessions.all()
-            logger.info(f"Found {len(sessions)} completed workout sessions")
-            
-            if not sessions:
-                logger.info("No workout sessions found in the timeframe")
-                return []
-            
-            # Get all exercises for these sessions
-            session_ids = [s.id for s in sessions]
-            logger.info(f"Found {len(session_ids)} exercises")
-            
-            # Query muscle activations with volume data
-            volume_data = (
-                self.db.query(
-                    MuscleActivation.muscle_name,
+            # Sessions are matched to buckets by range, which the (user_id, start_time) index serves
+            volume = (
+                select(
+                    buckets.c.bucket_start,
+                    MuscleActivation.muscle_id,
                     func.sum(Exercise.total_volume * MuscleActivation.estimated_volume).label("total_volume"),
-                    func.count(MuscleActivation.id).label("exercise_count"),
-                    WorkoutSession.start_time.label("date"),
-                    func.date_trunc('week', WorkoutSession.start_time).label("week_start")
-                )
-                .select_from(MuscleActivation)
-                .join(Exercise, MuscleActivation.exercise_id == Exercise.id)
-                .join(WorkoutSession, Exercise.session_id == WorkoutSession.id)
-                .filter(WorkoutSession.id.in_(session_ids))
-                .group_by(
-                    MuscleActivation.muscle_name,
-                    WorkoutSession.start_time,
-                    func.date_trunc('week', WorkoutSession.start_time)
+                    func.count(MuscleActivation.id).label("exercise_count")
                 )
-                .order_by(WorkoutSession.start_time.desc())
-                .all()
+                .select_from(buckets)
+                .join(WorkoutSession, and_(
+                    WorkoutSession.start_time >= buckets.c.bucket_start,
+                    WorkoutSession.start_time < buckets.c.bucket_end
+                ))
+                .join(Exercise, Exercise.session_id == WorkoutSession.id)
+                .join(MuscleActivation, MuscleActivation.exercise_id == Exercise.id)
+                .where(WorkoutSession.start_time >= start, WorkoutSession.start_time < end)
+                .where(WorkoutSession.end_time.isnot(None))
             )
+            if user_id is not None:
+                volume = volume.where(WorkoutSession.user_id == user_id)
+            volume = volume.group_by(buckets.c.bucket_start, MuscleActivation.muscle_id).cte("bucket_volume")
+            trained = select(volume.c.muscle_id).distinct().cte("trained_muscles")
+            
+            # Every (bucket, trained muscle) pair, zero where nothing was logged
+            rows = self.db.execute(
+                select(
+                    buckets.c.bucket_start,
+                    trained.c.muscle_id,
+                    func.coalesce(volume.c.total_volume, 0.0).label("total_volume"),
+                    func.coalesce(volume.c.exercise_count, 0).label("exercise_count")
+                )
+                .select_from(buckets)
+                .join(trained, true())
+                .outerjoin(volume, and_(
+                    volume.c.bucket_start == buckets.c.bucket_start,
+                    volume.c.muscle_id == trained.c.muscle_id
+                ))
+                .order_by(buckets.c.bucket_start, trained.c.muscle_id)
+            ).all()
+            logger.info(f"Found {len(rows)} muscle volume buckets")
             
+            muscle_names = MuscleDictionaryService(self.db).names_for(row.muscle_id for row in rows)
             return [
                 {
-                    "muscle_name": data.muscle_name,
-                    "total_volume": float(data.total_volume) if data.total_volume else 0.0,
-                    "exercise_count": data.exercise_count,
-                    "date": data.date,
-                    "week_start": data.week_start
+                    "muscle_name": muscle_names[row.muscle_id],
+                    "total_volume": float(row.total_volume),
+                    "exercise_count": row.exercise_count,
+                    "date": row.bucket_start,
+                    "week_start": row.bucket_start - timedelta(days=row.bucket_start.weekday())
                 }
-                for data in volume_data
+                for row in rows
             ]
             
         except Exception as e:
             logger.error(f"Error getting volume data: {str(e)}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise
-
-    def _calculate_muscle_status(self, volume: float, count: int, last_trained: datetime) -> str:
-        """Calculate the training status of a muscle based on volume and frequency"""
-        days_since_trained = (datetime.utcnow() - last_trained).days
-        
-        if days_since_trained > 14:
-            return "Undertrained"
-        elif volume < 1000:  # Example threshold
-            return "Maintenance"
-        else:
-            return "Optimal"
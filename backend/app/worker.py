@@ -0,0 +1,30 @@
+"""
+Standalone job worker: python -m app.worker
+
+Consumes the Redis job queue so LLM calls run outside the API processes.
+Run the API with JOB_BACKEND=redis and JOB_WORKERS=0 to hand all jobs over.
+"""
+from .core.settings import get_settings
+from .services.job_queue import get_job_queue, handlers
+# Importing the routes registers their job handlers
+from .routes import chat, workout  # noqa: F401
+import asyncio
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def main():
+    settings = get_settings()
+    if settings.job_backend != "redis":
+        logger.warning("JOB_BACKEND is not redis; this worker will only see jobs queued in its own process")
+    queue = get_job_queue()
+    queue.start(max(1, settings.job_workers))
+    logger.info(f"Worker consuming job kinds: {', '.join(sorted(handlers))}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await queue.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
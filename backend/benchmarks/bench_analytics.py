@@ -0,0 +1,283 @@
+"""
+Latency and query counts of the analytics services and routes at several
+history sizes, checked against budgets.
+
+Each scale (weeks of history x number of users) is generated once with
+benchmarks.synthetic_history and kept as a SQLite file in --data-dir, or
+loaded into --scratch-database-url, which is dropped and recreated for every
+scale. Targets are timed for a spread of users. Results are written as JSON,
+and the run exits non-zero when a target errors or exceeds its p95 latency or
+query-count budget.
+
+Run from backend/:  python -m benchmarks.bench_analytics [--scales month,year,5y] [--users 10,100,1000,10000]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from app.models.database import Base, get_db
+from app.services import exercise_identity_service, muscle_dictionary_service
+from app.services.analysis_service import AnalysisService
+from app.services.llm_telemetry_service import percentile
+from app.services.report_service import ReportService
+from app.services.workout_storage_service import WorkoutStorageService
+from benchmarks.synthetic_history import HistoryConfig, load_history
+
+SCALES = {"month": 5, "year": 52, "5y": 260}  # weeks of history
+DEFAULT_BUDGETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytics_budgets.json")
+
+SERVICE_TARGETS: Dict[str, Callable[[Session, int], Any]] = {
+    "get_muscle_tracking": lambda db, user_id: WorkoutStorageService(db).get_muscle_tracking(user_id=user_id),
+    "get_muscle_volume_data": lambda db, user_id: WorkoutStorageService(db).get_muscle_volume_data("weekly", user_id=user_id),
+    "analyze_volume_progression": lambda db, user_id: AnalysisService(db).analyze_volume_progression(user_id),
+    "analyze_muscle_balance": lambda db, user_id: AnalysisService(db).analyze_muscle_balance(user_id),
+    "generate_progress_report": lambda db, user_id: ReportService(db).generate_progress_report(user_id),
+}
+
+# The analysis routes still read user 1 regardless of the caller
+HTTP_TARGETS: Dict[str, str] = {
+    "GET /api/analytics/muscle-tracking": "/api/analytics/muscle-tracking?user_id={user_id}",
+    "GET /api/analytics/muscle-volume": "/api/analytics/muscle-volume?user_id={user_id}&timeframe=weekly",
+    "GET /api/analytics/volume-progression": "/api/analytics/volume-progression?user_id={user_id}",
+    "GET /api/analysis/muscle-balance": "/api/analysis/muscle-balance",
+    "GET /api/analysis/progression": "/api/analysis/progression",
+}
+
+class QueryCounter:
+    """Counts statements executed on an engine"""
+
+    def __init__(self, engine: Engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+@dataclass
+class Scenario:
+    scale: str
+    weeks: int
+    users: int
+    engine: Engine
+    rows: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.scale}/{self.users}u"
+
+def sample_users(users: int, count: int) -> List[int]:
+    """Up to count user ids spread evenly over 1..users"""
+    return sorted({1 + i * users // count for i in range(min(count, users))})
+
+def prepare_scenario(scale: str, users: int, seed: int, end: date, data_dir: str,
+                     scratch_url: Optional[str] = None) -> Scenario:
+    weeks = SCALES[scale]
+    config = HistoryConfig(users=users, weeks=weeks, seed=seed, end=end)
+    if scratch_url:
+        engine = create_engine(scratch_url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        return Scenario(scale, weeks, users, engine, sum(load_history(engine, config).values()))
+
+    path = os.path.join(data_dir, f"analytics-{users}u-{weeks}w-seed{seed}-{end.isoformat()}.db")
+    if not os.path.exists(path):
+        # Build under a temporary name so an interrupted load is never reused
+        partial = path + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        engine = create_engine(f"sqlite:///{partial}")
+        Base.metadata.create_all(engine)
+        load_history(engine, config)
+        engine.dispose()
+        os.replace(partial, path)
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    with engine.connect() as conn:
+        rows = sum(conn.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar()
+                   for table in ("workout_sessions", "exercises", "muscle_activations"))
+    return Scenario(scale, weeks, users, engine, rows)
+
+def measure(call: Callable[[int], Any], user_ids: Sequence[int], repeat: int, counter: QueryCounter) -> Dict[str, Any]:
+    """Latency percentiles and the most queries any single call issued"""
+    call(user_ids[0])  # warm per-process lookup caches, as a running server would be
+    samples, queries = [], []
+    for _ in range(repeat):
+        for user_id in user_ids:
+            counter.count = 0
+            started = time.perf_counter()
+            call(user_id)
+            samples.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count)
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "max_ms": round(samples[-1], 3),
+        "queries": max(queries),
+    }
+
+def run_scenario(scenario: Scenario, targets: Sequence[str], user_ids: Sequence[int], repeat: int) -> List[Dict[str, Any]]:
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    # Lookup caches are per process and each scenario is a different database
+    exercise_identity_service.reset_cache()
+    muscle_dictionary_service.reset_cache()
+    Session = sessionmaker(bind=scenario.engine, autocommit=False, autoflush=False)
+    with Session() as db:
+        # Loaded as startup warm-up does, so no timed call pays for it
+        exercise_identity_service.ExerciseIdentityService(db).lookup_id("bench press")
+        muscle_dictionary_service.MuscleDictionaryService(db).lookup_id("chest")
+    counter = QueryCounter(scenario.engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def service_call(fn):
+        def call(user_id):
+            with Session() as db:
+                return fn(db, user_id)
+        return call
+
+    def http_call(client, path):
+        def call(user_id):
+            response = client.get(path.format(user_id=user_id))
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return call
+
+    previous_override = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    results = []
+    try:
+        for target in targets:
+            if target in SERVICE_TARGETS:
+                call = service_call(SERVICE_TARGETS[target])
+            else:
+                call = http_call(client, HTTP_TARGETS[target])
+            result = {"target": target, "scale": scenario.scale, "weeks": scenario.weeks,
+                      "users": scenario.users, "rows": scenario.rows, "error": None}
+            try:
+                result.update(measure(call, user_ids, repeat, counter))
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"[:160]
+            results.append(result)
+    finally:
+        if previous_override is None:
+            del app.dependency_overrides[get_db]
+        else:
+            app.dependency_overrides[get_db] = previous_override
+        event.remove(scenario.engine, "before_cursor_execute", counter._count)
+    return results
+
+def budget_for(budgets: Dict[str, Any], target: str, scale: str, users: int) -> Dict[str, Optional[float]]:
+    """A target's budget; values are a number or a mapping keyed by "5y/1000u" or "5y" """
+    merged = {**budgets.get("default", {}), **budgets.get("targets", {}).get(target, {})}
+    resolved = {}
+    for key, value in merged.items():
+        if isinstance(value, dict):
+            value = value.get(f"{scale}/{users}u", value.get(scale))
+        resolved[key] = value
+    return resolved
+
+def check_budgets(results: Sequence[Dict[str, Any]], budgets: Dict[str, Any], latency_factor: float = 1.0) -> List[str]:
+    """Failure messages for results that errored or exceeded their budget"""
+    failures = []
+    for result in results:
+        where = f"{result['target']} @ {result['scale']}/{result['users']}u"
+        if result["error"]:
+            failures.append(f"{where}: {result['error']}")
+            continue
+        budget = budget_for(budgets, result["target"], result["scale"], result["users"])
+        p95_budget = budget.get("p95_ms")
+        if p95_budget is not None and result["p95_ms"] > p95_budget * latency_factor:
+            failures.append(f"{where}: p95 {result['p95_ms']:.1f} ms > budget {p95_budget * latency_factor:.1f} ms")
+        query_budget = budget.get("queries")
+        if query_budget is not None and result["queries"] > query_budget:
+            failures.append(f"{where}: {result['queries']} queries > budget {query_budget}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="month,year", help=f"Comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--users", default="10,100", help="Comma-separated user counts, e.g. 10,100,1000,10000")
+    parser.add_argument("--targets", default=None, help="Comma-separated subset of targets (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-users", type=int, default=5, help="Users timed per target")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "bench_analytics"))
+    parser.add_argument("--scratch-database-url", default=None,
+                        help="Load into this database instead of SQLite files; ALL TABLES ARE DROPPED")
+    parser.add_argument("--budgets", default=DEFAULT_BUDGETS)
+    parser.add_argument("--latency-factor", type=float, default=1.0, help="Scale latency budgets for slower machines")
+    parser.add_argument("--output", default="bench_analytics.json")
+    args = parser.parse_args()
+
+    targets = args.targets.split(",") if args.targets else [*SERVICE_TARGETS, *HTTP_TARGETS]
+    unknown = [t for t in targets if t not in SERVICE_TARGETS and t not in HTTP_TARGETS]
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(unknown)}")
+    with open(args.budgets) as f:
+        budgets = json.load(f)
+
+    # Services log every call; keep the timings about the queries
+    logging.disable(logging.ERROR)
+    os.makedirs(args.data_dir, exist_ok=True)
+    end = date.today()  # analytics windows are relative to now
+    results = []
+    for scale in args.scales.split(","):
+        for users in (int(u) for u in args.users.split(",")):
+            scenario = prepare_scenario(scale, users, args.seed, end, args.data_dir, args.scratch_database_url)
+            print(f"{scenario.label}: {scenario.rows:,d} rows")
+            for result in run_scenario(scenario, targets, sample_users(users, args.sample_users), args.repeat):
+                results.append(result)
+                if result["error"]:
+                    print(f"  {result['target']:<40} ERROR {result['error']}")
+                else:
+                    print(f"  {result['target']:<40} p50 {result['p50_ms']:8.2f} ms  "
+                          f"p95 {result['p95_ms']:8.2f} ms  {result['queries']:3d} queries")
+            scenario.engine.dispose()
+
+    failures = check_budgets(results, budgets, args.latency_factor)
+    report = {
+        "meta": {
+            "run_at": datetime.utcnow().isoformat(),
+            "database": make_url(args.scratch_database_url).get_backend_name() if args.scratch_database_url else "sqlite",
+            "python": platform.python_version(),
+            "seed": args.seed,
+            "history_end": end.isoformat(),
+            "sample_users": args.sample_users,
+            "repeat": args.repeat,
+            "latency_factor": args.latency_factor,
+        },
+        "results": results,
+        "failures": failures,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if failures:
+        print(f"{len(failures)} budget failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Estimated input tokens per agent call for each prompt mode, over a user's
+sequence of logged workouts. Uses the same character-based estimate the
+service logs when trace usage isn't available.
+
+Run from backend/:  python -m benchmarks.bench_prompt_tokens [--messages 10]
+"""
+import argparse
+from app.services.agent_sessions import compact_prompt, estimate_tokens
+from app.services.bedrock_agent_service import BedrockAgentService
+
+WORKOUTS = [
+    "Bench press 3x8 @ 135lbs",
+    "Squats 4x6 @ 225lbs, RPE 8",
+    "Lat pulldowns 3x10 @ 120lbs",
+    "Romanian deadlift 3x8 @ 185lbs, 3-1-1 tempo",
+    "Overhead press 5x5 @ 95lbs",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10)
+    args = parser.parse_args()
+
+    prompt = BedrockAgentService._get_system_prompt(None)
+    compact = compact_prompt(prompt)
+    messages = [WORKOUTS[i % len(WORKOUTS)] for i in range(args.messages)]
+
+    def total(build):
+        return sum(estimate_tokens(build(i, message)) for i, message in enumerate(messages))
+
+    modes = {
+        "original (full schema)": total(lambda i, m: f"{prompt}\n\nUser workout: {m}\n\nResponse:"),
+        "inline (compacted)": total(lambda i, m: f"{compact}\n\nUser workout: {m}\n\nResponse:"),
+        "session (schema on first turn)": total(
+            lambda i, m: f"{compact}\n\nUser workout: {m}\n\nResponse:" if i == 0 else f"User workout: {m}"
+        ),
+        "agent (schema in agent config)": total(lambda i, m: f"User workout: {m}"),
+    }
+
+    baseline = modes["original (full schema)"]
+    print(f"Estimated inputText tokens for {args.messages} messages:")
+    for name, tokens in modes.items():
+        print(f"  {name:32s} {tokens:6d}  ({tokens / baseline:.0%} of original)")
+    print("Session mode also carries the agent's conversation history, which these figures exclude.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Serialization cost of a workout summary: pydantic response_model path vs the
+trusted orjson path used by the routes.
+
+Run from backend/:  python -m benchmarks.bench_serialization [--exercises 1000]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from app.core.responses import dumps
+from app.models.exercise import Exercise, Muscle, MuscleActivation, MuscleActivationLevel
+from app.routes.workout import WorkoutSummaryResponse
+
+MUSCLES = [Muscle(id=i, name=name) for i, name in enumerate(["chest", "triceps", "front_delts"], start=1)]
+
+def build_exercises(count: int):
+    """Transient Exercise rows shaped like a real session, no database needed"""
+    start = datetime(2025, 1, 6, 9, 0)
+    exercises = []
+    for i in range(count):
+        exercise = Exercise(
+            id=i + 1,
+            session_id=1,
+            name="Bench Press",
+            canonical_exercise_id=1,
+            movement_pattern="push",
+            num_sets=3,
+            reps=[10, 8, 6],
+            weight=[60.0, 70.0, 80.0],
+            rpe=8.0,
+            total_volume=1640.0,
+            equipment="barbell",
+        )
+        exercise.muscle_activations = [
+            MuscleActivation(
+                id=i * 3 + j,
+                exercise_id=i + 1,
+                muscle=muscle,
+                activation_level=MuscleActivationLevel.PRIMARY if j == 0 else MuscleActivationLevel.SECONDARY,
+                estimated_volume=1.0 if j == 0 else 0.5,
+            )
+            for j, muscle in enumerate(MUSCLES)
+        ]
+        exercises.append(exercise)
+    return start, start + timedelta(hours=1), exercises
+
+def summary_payload(start, end, exercises):
+    return {
+        "session_id": 1,
+        "start_time": start,
+        "end_time": end,
+        "total_volume": sum(ex.total_volume or 0 for ex in exercises),
+        "exercises": [ex.to_dict() for ex in exercises],
+    }
+
+def pydantic_path(start, end, exercises) -> bytes:
+    # What FastAPI does for a response_model: validate, dump, jsonable_encoder, json.dumps
+    model = WorkoutSummaryResponse(**summary_payload(start, end, exercises))
+    content = jsonable_encoder(model.model_dump(mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+def trusted_path(start, end, exercises) -> bytes:
+    return dumps(summary_payload(start, end, exercises))
+
+def measure(fn, args, repeat: int) -> float:
+    """Best wall time of `repeat` runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--exercises", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    data = build_exercises(args.exercises)
+    per_thousand = 1000 / args.exercises
+    results = {name: measure(fn, data, args.repeat) for name, fn in [
+        ("pydantic", pydantic_path),
+        ("trusted", trusted_path),
+    ]}
+
+    print(f"Summary serialization, {args.exercises} exercises (best of {args.repeat}):")
+    for name, ms in results.items():
+        print(f"  {name:<9} {ms:8.2f} ms  ({ms * per_thousand:.2f} ms per 1,000 exercises)")
+    print(f"  speedup   {results['pydantic'] / results['trusted']:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Worker cold-start time: importing app.main and serving the first request, each
+measured in a fresh interpreter. AWS credentials are removed from the child
+environment, since startup must not depend on them.
+
+Run from backend/:  python -m benchmarks.bench_startup [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/health")
+served = time.perf_counter()
+print(json.dumps({"import": imported - started, "first_request": served - started}))
+"""
+
+def run_once(env) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--keep-aws", action="store_true", help="Keep AWS credentials in the child environment")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not args.keep_aws:
+        for key in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"):
+            env.pop(key, None)
+
+    samples = [run_once(env) for _ in range(args.runs)]
+    print(f"Cold start over {args.runs} fresh interpreters:")
+    for phase in ("import", "first_request"):
+        values = [s[phase] * 1000 for s in samples]
+        print(f"  {phase:<14} median {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms")
+
+if __name__ == "__main__":
+    main()
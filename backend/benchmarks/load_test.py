@@ -0,0 +1,311 @@
+"""
+HTTP load test: a weighted mix of chat ingests, dashboard reads, analytics
+polling and report exports, swept over concurrency levels.
+
+By default it starts one uvicorn worker against a SQLite history seeded by
+benchmarks.synthetic_history, with BEDROCK_BACKEND=emulator standing in for
+the agent, serving harness_app(): the API plus the report routes, which
+production doesn't mount. Pass --base-url to load an app that is already
+running instead (exports need the report routes there too).
+Each level runs closed-loop virtual users for --duration seconds after a
+warm-up. Output is throughput, per-route latency percentiles and error
+rates. The saturation point is the lowest concurrency whose throughput is
+within --knee of the sweep's peak.
+
+Run from backend/:  python -m benchmarks.load_test [--concurrency 1,2,4,8,16,32] [--mix chat=1,dashboard=4,analytics=4,export=1]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import httpx
+from app.services.llm_telemetry_service import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKOUTS = [
+    "Bench press 3x8 @ 135lbs",
+    "Squats 4x6 @ 225lbs, RPE 8",
+    "Barbell row 3x10 @ 115lbs",
+    "Deadlift 1x5 @ 315lbs",
+    "Overhead press 5x5 @ 95lbs",
+    "Pull ups 3x8",
+]
+
+SCENARIOS = ("chat", "dashboard", "analytics", "export")
+DEFAULT_MIX = "chat=1,dashboard=4,analytics=4,export=1"
+
+@dataclass
+class RouteStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+class LoadStats:
+    """Requests that started and finished inside the measurement window"""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteStats] = {}
+        self.window_start: Optional[float] = None
+        self.window_end: Optional[float] = None
+
+    def record(self, route: str, started: float, finished: float, status: Optional[int], error: bool):
+        if self.window_start is None or started < self.window_start or finished > self.window_end:
+            return
+        stats = self.routes.setdefault(route, RouteStats())
+        stats.latencies_ms.append((finished - started) * 1000)
+        key = str(status) if status is not None else "exception"
+        stats.statuses[key] = stats.statuses.get(key, 0) + 1
+        stats.errors += error
+
+    def summary(self, concurrency: int) -> Dict[str, Any]:
+        seconds = self.window_end - self.window_start
+        routes, all_latencies, requests, errors = {}, [], 0, 0
+        for route, stats in sorted(self.routes.items()):
+            latencies = sorted(stats.latencies_ms)
+            all_latencies.extend(latencies)
+            requests += len(latencies)
+            errors += stats.errors
+            routes[route] = {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / seconds, 2),
+                "error_rate": round(stats.errors / len(latencies), 4),
+                **{f"p{p}_ms": round(percentile(latencies, p), 2) for p in (50, 95, 99)},
+                "statuses": stats.statuses,
+            }
+        all_latencies.sort()
+        return {
+            "concurrency": concurrency,
+            "seconds": round(seconds, 2),
+            "requests": requests,
+            "throughput_rps": round(requests / seconds, 2),
+            "error_rate": round(errors / requests, 4) if requests else None,
+            "p50_ms": round(percentile(all_latencies, 50), 2) if all_latencies else None,
+            "p95_ms": round(percentile(all_latencies, 95), 2) if all_latencies else None,
+            "routes": routes,
+        }
+
+class VirtualUser:
+    """One client session; polls revalidate with the ETag from their previous response"""
+
+    def __init__(self, client: httpx.AsyncClient, stats: LoadStats, user_ids: Sequence[int], rng: random.Random):
+        self.client = client
+        self.stats = stats
+        self.user_ids = user_ids
+        self.rng = rng
+        self.etags: Dict[str, str] = {}
+
+    async def request(self, route: str, method: str, url: str, conditional: bool = False, **kwargs):
+        headers = {}
+        if conditional and url in self.etags:
+            headers["If-None-Match"] = self.etags[url]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            await response.aread()
+        except httpx.HTTPError:
+            self.stats.record(route, started, loop.time(), None, True)
+            return
+        self.stats.record(route, started, loop.time(), response.status_code, response.status_code >= 400)
+        if conditional and "etag" in response.headers:
+            self.etags[url] = response.headers["etag"]
+
+    async def chat(self):
+        await self.request("POST /api/chat/", "POST", "/api/chat/", json={"message": self.rng.choice(WORKOUTS)})
+
+    async def dashboard(self):
+        user_id = self.rng.choice(self.user_ids)
+        await self.request("GET /api/workout/user-sessions/{user_id}", "GET", f"/api/workout/user-sessions/{user_id}?limit=20")
+        await self.request("GET /api/analytics/muscle-tracking", "GET", f"/api/analytics/muscle-tracking?user_id={user_id}", conditional=True)
+
+    async def analytics(self):
+        user_id = self.rng.choice(self.user_ids)
+        await self.request(
+            "GET /api/analytics/volume-progression", "GET",
+            f"/api/analytics/volume-progression?user_id={user_id}&timeframe=weekly", conditional=True
+        )
+
+    async def export(self):
+        await self.request("GET /api/reports/export", "GET", "/api/reports/export?format=csv")
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}; expected one of {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The traffic mix needs at least one positive weight")
+    return mix
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, mix: Dict[str, float], user_ids: Sequence[int],
+                    duration: float, warmup: float = 0.0, think_time: float = 0.0, seed: int = 0) -> Dict[str, Any]:
+    """Closed-loop load at one concurrency level"""
+    stats = LoadStats()
+    loop = asyncio.get_running_loop()
+    stats.window_start = loop.time() + warmup
+    stats.window_end = stats.window_start + duration
+    names, weights = list(mix), list(mix.values())
+
+    async def run_user(index: int):
+        rng = random.Random(f"{seed}:{concurrency}:{index}")
+        user = VirtualUser(client, stats, user_ids, rng)
+        while loop.time() < stats.window_end:
+            await getattr(user, rng.choices(names, weights)[0])()
+            if think_time:
+                await asyncio.sleep(rng.expovariate(1 / think_time))
+
+    await asyncio.gather(*(run_user(i) for i in range(concurrency)))
+    return stats.summary(concurrency)
+
+def find_saturation(levels: Sequence[Dict[str, Any]], knee: float = 0.05) -> Optional[Dict[str, Any]]:
+    """The lowest-concurrency level already within `knee` of the peak throughput"""
+    if not levels:
+        return None
+    peak = max(level["throughput_rps"] for level in levels)
+    return next(level for level in levels if level["throughput_rps"] >= peak * (1 - knee))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def harness_app():
+    """The API plus the report routes the export scenario hits, which production doesn't mount"""
+    from app.main import app
+    from app.routes.reports import router as reports_router
+
+    if not any(getattr(route, "path", "").startswith("/api/reports/") for route in app.routes):
+        app.include_router(reports_router, prefix="/api")
+    return app
+
+@contextlib.contextmanager
+def serve(database_url: str, agent_latency_ms: float, log_path: Optional[str], startup_timeout: float = 120) -> Iterator[str]:
+    """One uvicorn worker on a free port, backed by database_url and the agent emulator"""
+    port = free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "BEDROCK_BACKEND": "emulator",
+        "EMULATOR_LATENCY_MS": str(agent_latency_ms),
+    }
+    log = open(log_path, "w") if log_path else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.load_test:harness_app", "--factory", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "1", "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}; see --server-log")
+            try:
+                if httpx.get(f"{base_url}/health", timeout=2).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server not healthy after {startup_timeout:.0f}s")
+            time.sleep(0.5)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if log is not subprocess.DEVNULL:
+            log.close()
+
+async def sweep(base_url: str, levels: Sequence[int], mix: Dict[str, float], user_ids: Sequence[int],
+                duration: float, warmup: float, think_time: float, seed: int) -> List[Dict[str, Any]]:
+    results = []
+    for concurrency in levels:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            level = await run_level(client, concurrency, mix, user_ids, duration, warmup, think_time, seed)
+        results.append(level)
+        print(f"  c={concurrency:<4d} {level['throughput_rps']:8.1f} req/s  p50 {level['p50_ms'] or 0:8.1f} ms  "
+              f"p95 {level['p95_ms'] or 0:8.1f} ms  errors {level['error_rate'] or 0:6.1%}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default=None, help="Load a running app instead of starting one (data must be seeded)")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="Comma-separated levels to sweep")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights from {', '.join(SCENARIOS)}")
+    parser.add_argument("--duration", type=float, default=15.0, help="Measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before each level")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's scenarios, seconds")
+    parser.add_argument("--knee", type=float, default=0.05, help="Throughput tolerance below peak for saturation")
+    parser.add_argument("--users", type=int, default=100, help="Seeded users; dashboard and analytics pick from them")
+    parser.add_argument("--scale", default="year", help="History per user when seeding: month, year or 5y")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "bench_analytics"))
+    parser.add_argument("--agent-latency-ms", type=float, default=1200.0, help="Emulated agent median latency")
+    parser.add_argument("--server-log", default=None)
+    parser.add_argument("--output", default="load_test.json")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    levels = [int(c) for c in args.concurrency.split(",")]
+    user_ids = list(range(1, args.users + 1))
+
+    def run(base_url: str) -> List[Dict[str, Any]]:
+        print(f"Sweeping {base_url} with mix {args.mix}:")
+        return asyncio.run(sweep(base_url, levels, mix, user_ids, args.duration, args.warmup, args.think_time, args.seed))
+
+    if args.base_url:
+        results = run(args.base_url)
+    else:
+        from benchmarks.bench_analytics import prepare_scenario
+
+        os.makedirs(args.data_dir, exist_ok=True)
+        scenario = prepare_scenario(args.scale, args.users, args.seed, date.today(), args.data_dir)
+        database_url = str(scenario.engine.url)
+        scenario.engine.dispose()
+        print(f"Seeded {scenario.label}: {scenario.rows:,d} rows")
+        with serve(database_url, args.agent_latency_ms, args.server_log) as base_url:
+            results = run(base_url)
+
+    saturation = find_saturation(results, args.knee)
+    if saturation:
+        print(f"Saturation: c={saturation['concurrency']} at {saturation['throughput_rps']:.1f} req/s "
+              f"(p95 {saturation['p95_ms'] or 0:.1f} ms)")
+    report = {
+        "meta": {
+            "run_at": datetime.utcnow().isoformat(),
+            "base_url": args.base_url,
+            "mix": mix,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "think_time": args.think_time,
+            "users": args.users,
+            "scale": None if args.base_url else args.scale,
+            "agent_latency_ms": None if args.base_url else args.agent_latency_ms,
+        },
+        "levels": results,
+        "saturation": saturation and {"concurrency": saturation["concurrency"],
+                                      "throughput_rps": saturation["throughput_rps"],
+                                      "p95_ms": saturation["p95_ms"]},
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Synthetic multi-year training histories for benchmarking queries and indexes.
+
+Each user follows a program split with progressive loads, periodic deloads,
+skipped sessions, missed weeks and longer breaks (which cost some strength).
+Exercises and their muscle activations come from EXERCISE_PATTERNS. Output is
+deterministic for a given --seed and --end. Rows are appended after the
+existing ids and bulk loaded with COPY on PostgreSQL or with executemany in a
+single transaction on SQLite.
+
+Run from backend/:  python -m benchmarks.synthetic_history --users 1000 --years 5 [--seed 0]
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as clock_time, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import create_engine, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from app.data.exercise_patterns import EXERCISE_PATTERNS
+from app.models.database import Base
+from app.models.exercise import Exercise, MuscleActivation, WorkoutSession
+from app.models.user import User
+from app.services import exercise_identity_service, muscle_dictionary_service
+from app.services.exercise_identity_service import ExerciseIdentityService
+from app.services.muscle_dictionary_service import MuscleDictionaryService
+from app.services.personal_record_service import PersonalRecordService
+from app.services.workload_service import WorkloadService
+
+# Loaded in this order so foreign keys always point at rows already written
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "users": ("id", "username", "email", "data_version"),
+    "workout_sessions": ("id", "user_id", "start_time", "end_time", "total_volume"),
+    "exercises": (
+        "id", "session_id", "name", "canonical_exercise_id", "movement_pattern", "num_sets",
+        "reps", "weight", "rpe", "total_volume", "equipment", "rest_period",
+    ),
+    "muscle_activations": ("id", "exercise_id", "muscle_id", "activation_level", "estimated_volume"),
+}
+MODELS = {"users": User, "workout_sessions": WorkoutSession, "exercises": Exercise, "muscle_activations": MuscleActivation}
+
+@dataclass(frozen=True)
+class LiftPlan:
+    start_lbs: float  # typical first working weight (added load for pull-ups)
+    ceiling_lbs: float  # progression slows as the working weight approaches this
+    step_lbs: float  # weekly increment for a novice, and the plate rounding
+    sets: Tuple[int, int]
+    reps: Tuple[int, int]
+
+LIFTS: Dict[str, LiftPlan] = {
+    "squat": LiftPlan(135, 405, 5, (3, 5), (5, 8)),
+    "deadlift": LiftPlan(185, 500, 10, (1, 3), (3, 5)),
+    "bench_press": LiftPlan(115, 315, 5, (3, 5), (5, 8)),
+    "row": LiftPlan(95, 255, 5, (3, 4), (8, 10)),
+    "overhead_press": LiftPlan(65, 185, 2.5, (3, 5), (5, 8)),
+    "pull_up": LiftPlan(0, 90, 2.5, (3, 4), (6, 10)),
+}
+
+# Weekday -> lifts trained that day
+SPLITS: Dict[str, Tuple[Tuple[int, Tuple[str, ...]], ...]] = {
+    "full_body": (
+        (0, ("squat", "bench_press", "row")),
+        (2, ("deadlift", "overhead_press", "pull_up")),
+        (4, ("squat", "bench_press", "row")),
+    ),
+    "upper_lower": (
+        (0, ("bench_press", "row", "overhead_press")),
+        (1, ("squat", "deadlift")),
+        (3, ("overhead_press", "pull_up", "bench_press")),
+        (4, ("deadlift", "squat")),
+    ),
+    "push_pull_legs": (
+        (0, ("bench_press", "overhead_press")),
+        (1, ("row", "pull_up")),
+        (2, ("squat", "deadlift")),
+        (3, ("overhead_press", "bench_press")),
+        (4, ("pull_up", "row", "deadlift")),
+        (5, ("squat",)),
+    ),
+}
+SPLIT_WEIGHTS = (0.4, 0.35, 0.25)
+
+@dataclass
+class HistoryConfig:
+    users: int = 100
+    weeks: int = 52
+    seed: int = 0
+    end: date = field(default_factory=date.today)  # last day of history
+    session_skip_rate: float = 0.1  # single sessions skipped in a training week
+    missed_week_rate: float = 0.06  # whole weeks without training
+    break_rate: float = 0.015  # start of a 2-6 week layoff
+    variation_rate: float = 0.2  # logged under a variation name, e.g. "incline bench press"
+
+@dataclass
+class Catalog:
+    """Canonical exercise and muscle ids in the target database"""
+    canonical_ids: Dict[str, int]
+    muscle_ids: Dict[str, int]
+
+def resolve_catalog(engine: Engine) -> Catalog:
+    """Register the catalog's exercises and muscles through the app's services"""
+    # The services cache ids per process; the target may not be the app database
+    exercise_identity_service.reset_cache()
+    muscle_dictionary_service.reset_cache()
+    db = sessionmaker(bind=engine)()
+    try:
+        identities = ExerciseIdentityService(db)
+        muscles = MuscleDictionaryService(db)
+        canonical_ids = {key: identities.resolve_id(key, EXERCISE_PATTERNS[key]["movement_pattern"]) for key in LIFTS}
+        muscle_ids = {
+            activation["muscle_name"]: muscles.id_for(activation["muscle_name"])
+            for key in LIFTS for activation in EXERCISE_PATTERNS[key]["muscle_activations"]
+        }
+        db.commit()
+    finally:
+        db.close()
+        exercise_identity_service.reset_cache()
+        muscle_dictionary_service.reset_cache()
+    return Catalog(canonical_ids, muscle_ids)
+
+def next_ids(engine: Engine) -> Dict[str, int]:
+    """First free id per table, so generated rows never collide with existing ones"""
+    with engine.connect() as conn:
+        return {
+            table: (conn.execute(func.coalesce(func.max(model.id), 0).select()).scalar() or 0) + 1
+            for table, model in MODELS.items()
+        }
+
+def timestamp(value: datetime) -> str:
+    # The format SQLAlchemy writes on SQLite, so string range filters compare correctly
+    return value.isoformat(sep=" ", timespec="microseconds")
+
+def json_array(values: Sequence) -> str:
+    # Same encoding the ORM writes for Exercise.reps/weight: a JSON string holding the array
+    return json.dumps(json.dumps(list(values)))
+
+def round_to(value: float, step: float) -> float:
+    return float(round(value / step) * step)
+
+def generate_user(config: HistoryConfig, catalog: Catalog, user_id: int, ids: Dict[str, int]) -> Dict[str, List[tuple]]:
+    """All rows for one user; advances ids past the rows it allocates"""
+    rng = random.Random(f"{config.seed}:{user_id}")
+    rows: Dict[str, List[tuple]] = {table: [] for table in COLUMNS}
+    rows["users"].append((user_id, f"synthetic_{user_id}", f"synthetic_{user_id}@example.com", 1))
+
+    split = SPLITS[rng.choices(list(SPLITS), SPLIT_WEIGHTS)[0]]
+    strength = rng.uniform(0.6, 1.3)
+    session_hour = rng.randint(6, 19)
+    mesocycle_weeks = rng.randint(4, 6)
+    loads = {key: plan.start_lbs * strength for key, plan in LIFTS.items()}
+    first_monday = config.end - timedelta(days=config.end.weekday(), weeks=config.weeks - 1)
+
+    layoff_weeks = 0
+    for week in range(config.weeks):
+        if layoff_weeks or rng.random() < config.break_rate:
+            layoff_weeks = layoff_weeks - 1 if layoff_weeks else rng.randint(1, 5)
+            for key in loads:
+                loads[key] *= 0.97  # detraining
+            continue
+        if rng.random() < config.missed_week_rate:
+            continue
+
+        deload = (week + 1) % mesocycle_weeks == 0
+        trained = set()
+        for weekday, lifts in split:
+            day = first_monday + timedelta(weeks=week, days=weekday)
+            if day > config.end or rng.random() < config.session_skip_rate:
+                continue
+
+            session_id = ids["workout_sessions"]
+            ids["workout_sessions"] += 1
+            start = datetime.combine(day, clock_time(session_hour, rng.randrange(60)))
+            session_volume = 0.0
+            for key in lifts:
+                plan, pattern = LIFTS[key], EXERCISE_PATTERNS[key]
+                num_sets = rng.randint(*plan.sets) - (1 if deload else 0) or 1
+                reps = rng.randint(*plan.reps)
+                load = round_to(loads[key] * (0.85 if deload else 1.0), plan.step_lbs)
+                set_reps = [max(1, reps - (i == num_sets - 1 and rng.random() < 0.3)) for i in range(num_sets)]
+                volume = float(sum(set_reps) * load)
+                name = key.replace("_", " ")
+                if rng.random() < config.variation_rate:
+                    name = rng.choice(pattern["variations"])
+
+                exercise_id = ids["exercises"]
+                ids["exercises"] += 1
+                rows["exercises"].append((
+                    exercise_id, session_id, name.title(), catalog.canonical_ids[key],
+                    pattern["movement_pattern"].title(), num_sets, json_array(set_reps),
+                    json_array([load] * num_sets), rng.choice((None, 7.0, 7.5, 8.0, 8.5, 9.0)),
+                    volume, pattern["equipment_needed"][0].title(), 180 if reps <= 5 else 120,
+                ))
+                for activation in pattern["muscle_activations"]:
+                    rows["muscle_activations"].append((
+                        ids["muscle_activations"], exercise_id, catalog.muscle_ids[activation["muscle_name"]],
+                        activation["activation_level"], activation["estimated_volume"],
+                    ))
+                    ids["muscle_activations"] += 1
+                session_volume += volume
+                trained.add(key)
+
+            end = start + timedelta(minutes=15 * len(lifts) + rng.randint(10, 30))
+            rows["workout_sessions"].append((session_id, user_id, timestamp(start), timestamp(end), session_volume))
+
+        if not deload:
+            # Linear progression that flattens out towards each lift's ceiling
+            for key in trained:
+                plan = LIFTS[key]
+                headroom = max(0.05, 1 - loads[key] / (plan.ceiling_lbs * strength))
+                loads[key] += plan.step_lbs * headroom * rng.uniform(0.5, 1.5)
+    return rows
+
+def generate_history(config: HistoryConfig, catalog: Catalog, ids: Dict[str, int]) -> Iterator[Dict[str, List[tuple]]]:
+    """Rows per user, for config.users users starting at ids["users"]"""
+    for _ in range(config.users):
+        user_id = ids["users"]
+        ids["users"] += 1
+        yield generate_user(config, catalog, user_id, ids)
+
+class CopyLoader:
+    """PostgreSQL: COPY ... FROM STDIN in CSV, one transaction"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def write(self, table: str, rows: List[tuple]):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)  # None becomes an empty unquoted field, i.e. NULL
+        buffer.seek(0)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {table} ({', '.join(COLUMNS[table])}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+    def finish(self):
+        with self.connection.cursor() as cursor:
+            for table in COLUMNS:
+                # Explicit ids bypass the serial sequences; move them past the loaded rows
+                cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))")
+            self.connection.commit()
+            for table in COLUMNS:
+                cursor.execute(f"ANALYZE {table}")
+            self.connection.commit()
+
+class InsertLoader:
+    """SQLite: executemany inside a single transaction with syncs off"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.close()
+
+    def write(self, table: str, rows: List[tuple]):
+        columns = COLUMNS[table]
+        cursor = self.connection.cursor()
+        cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+        )
+        cursor.close()
+
+    def finish(self):
+        self.connection.commit()
+
+def load_history(engine: Engine, config: HistoryConfig, batch_rows: int = 200_000) -> Dict[str, int]:
+    """Generate and bulk load histories, then rebuild workload state; returns rows written per table"""
+    catalog = resolve_catalog(engine)
+    ids = next_ids(engine)
+    counts = {table: 0 for table in COLUMNS}
+    pending: Dict[str, List[tuple]] = {table: [] for table in COLUMNS}
+    connection = engine.raw_connection()
+    try:
+        loader = CopyLoader(connection) if engine.dialect.name == "postgresql" else InsertLoader(connection)
+
+        def flush():
+            for table, rows in pending.items():
+                if rows:
+                    loader.write(table, rows)
+                    counts[table] += len(rows)
+                    pending[table] = []
+
+        buffered = 0
+        for user_rows in generate_history(config, catalog, ids):
+            for table, rows in user_rows.items():
+                pending[table].extend(rows)
+                buffered += len(rows)
+            if buffered >= batch_rows:
+                flush()
+                buffered = 0
+        flush()
+        loader.finish()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    # Bulk rows skip store_exercise_data, so derive the state it maintains at ingest
+    with sessionmaker(bind=engine)() as db:
+        WorkloadService(db).rebuild()
+        PersonalRecordService(db).rebuild()
+        db.commit()
+    return counts
+
+def main():
+    from app.core.settings import get_settings
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="Last day of history (YYYY-MM-DD)")
+    parser.add_argument("--database-url", default=None, help="Defaults to the app's DATABASE_URL")
+    parser.add_argument("--create-tables", action="store_true", help="Create missing tables first (e.g. a fresh SQLite file)")
+    parser.add_argument("--batch-rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url or get_settings().database_url)
+    if args.create_tables:
+        Base.metadata.create_all(engine)
+    config = HistoryConfig(users=args.users, weeks=max(1, round(args.years * 52)), seed=args.seed, end=args.end)
+
+    started = time.perf_counter()
+    counts = load_history(engine, config, batch_rows=args.batch_rows)
+    elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    print(f"Loaded {config.users} users x {config.weeks} weeks (seed {config.seed}) into {engine.dialect.name}:")
+    for table, count in counts.items():
+        print(f"  {table:<19} {count:>12,d}")
+    print(f"  {total:,d} rows in {elapsed:.1f} s ({total / elapsed * 60:,.0f} rows/minute)")
+
+if __name__ == "__main__":
+    main()
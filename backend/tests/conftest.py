@@ -1,11 +1,12 @@
 import os
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from app.main import app
-from app.database import Base, get_db
+from app.models import Base, get_db
+from app.services import exercise_identity_service, muscle_dictionary_service
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
@@ -14,6 +15,15 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+# pysqlite defers BEGIN, which breaks SAVEPOINT; let SQLAlchemy emit it instead
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def override_get_db():
@@ -26,6 +36,8 @@ def override_get_db():
 @pytest.fixture
 def test_db():
     Base.metadata.create_all(bind=engine)
+    exercise_identity_service.reset_cache()
+    muscle_dictionary_service.reset_cache()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -0,0 +1,89 @@
+import pytest
+import statistics
+from app.core.settings import Settings
+from app.models.user import User
+from app.services.agent_emulator import BedrockAgentEmulator, EmulatorConfig, extract_workout
+from app.services.bedrock_agent_service import BedrockAgentService
+from app.services.integration_service import IntegrationService
+from app.services.workout_storage_service import WorkoutStorageService
+
+WORKOUT = "Bench press 3x8 @ 135lbs\nSquats 4x6 @ 100kg, RPE 8"
+
+@pytest.fixture
+def emulated_service(monkeypatch):
+    def build(**overrides):
+        values = dict(
+            bedrock_backend="emulator",
+            emulator_latency_distribution="fixed",
+            emulator_latency_ms=5,
+            emulator_seed=7,
+            bedrock_backoff_base_seconds=0.001,
+            bedrock_backoff_max_seconds=0.01,
+            llm_telemetry_enabled=False,
+            coalesce_enabled=False,
+        )
+        values.update(overrides)
+        settings = Settings(**values)
+        monkeypatch.setattr("app.services.bedrock_agent_service.get_settings", lambda: settings)
+        return BedrockAgentService()
+    return build
+
+def test_reply_follows_the_agent_schema():
+    reply = BedrockAgentEmulator().build_reply(WORKOUT)
+
+    bench, squat = reply["structured_data"]["exercises"]
+    assert bench["name"] == "Bench Press" and bench["movement_pattern"] == "Push"
+    assert bench["reps"] == [8, 8, 8] and bench["weight"] == [135.0] * 3
+    assert bench["total_volume"] == 3 * 8 * 135
+    assert {m["muscle_name"] for m in bench["muscle_activations"]} >= {"pectoralis_major", "triceps"}
+    assert squat["weight"] == [220.5] * 4 and squat["rpe"] == 8.0
+    assert "Bench Press" in reply["display_message"]
+
+def test_extracts_workout_from_any_prompt_mode():
+    assert extract_workout("{schema}\n\nUser workout: squat 5x5\n\nResponse:") == "squat 5x5"
+    assert extract_workout("User workout: squat 5x5") == "squat 5x5"
+
+def test_lognormal_latency_centres_on_median():
+    emulator = BedrockAgentEmulator(EmulatorConfig(latency_ms=800, latency_spread=0.6, seed=1))
+    samples = [emulator.sample_latency() for _ in range(2001)]
+    assert statistics.median(samples) == pytest.approx(0.8, rel=0.1)
+    assert max(samples) > 2 * 0.8  # long right tail
+
+@pytest.mark.asyncio
+async def test_selected_by_settings_without_aws(emulated_service):
+    service = emulated_service(emulator_chunk_count=5, bedrock_enable_trace=True)
+
+    reply = await service.invoke_agent(WORKOUT)
+
+    assert len(reply["structured_data"]["exercises"]) == 2
+    assert service.usage_totals["calls"] == 1 and service.usage_totals["input_tokens"] > 0
+
+@pytest.mark.asyncio
+async def test_throttling_injection_exhausts_retries(emulated_service):
+    service = emulated_service(emulator_throttle_rate=1.0)
+
+    with pytest.raises(Exception) as excinfo:
+        await service.invoke_agent(WORKOUT)
+
+    assert excinfo.value.response["Error"]["Code"] == "ThrottlingException"
+    assert service.client_factory.__self__.calls == 3
+    assert service.limiter.limit < service.settings.bedrock_concurrency_initial
+
+@pytest.mark.asyncio
+async def test_malformed_output_is_a_parse_failure(emulated_service):
+    service = emulated_service(emulator_malformed_rate=1.0, bedrock_max_attempts=1)
+    with pytest.raises(ValueError):
+        await service.invoke_agent(WORKOUT)
+
+@pytest.mark.asyncio
+async def test_process_workout_end_to_end(test_db, test_session, emulated_service):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    test_session.commit()
+    session = WorkoutStorageService(test_session).create_workout_session(1)
+
+    result = await IntegrationService(test_session, emulated_service()).process_workout(session.id, WORKOUT)
+
+    assert result["name"].lower() == "bench press"
+    stored = WorkoutStorageService(test_session).get_session_exercises(session.id)
+    assert [e.total_volume for e in stored] == [3240.0, 5292.0]
+    assert all(e.muscle_activations for e in stored)
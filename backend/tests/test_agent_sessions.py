@@ -0,0 +1,71 @@
+import pytest
+from app.services.agent_sessions import AgentSessionRegistry, compact_prompt, estimate_tokens, usage_from_trace
+from tests.test_bedrock_resilience import AGENT_REPLY, FakeAgent, make_service
+
+def usage_event(input_tokens, output_tokens):
+    return {"trace": {"trace": {"orchestrationTrace": {"modelInvocationOutput": {
+        "metadata": {"usage": {"inputTokens": input_tokens, "outputTokens": output_tokens}}
+    }}}}}
+
+@pytest.mark.asyncio
+async def test_session_mode_sends_schema_once_per_user_session():
+    agent = FakeAgent()
+    service = make_service(agent, bedrock_prompt_mode="session")
+
+    await service.invoke_agent("bench 3x5", user_id=1)
+    await service.invoke_agent("squat 5x5", user_id=1)
+    await service.invoke_agent("row 3x10", user_id=2)
+
+    first, second, other_user = agent.params
+    assert first["sessionId"] == second["sessionId"] != other_user["sessionId"]
+    assert service.compact_system_prompt in first["inputText"]
+    assert second["inputText"] == "User workout: squat 5x5"
+    assert service.compact_system_prompt in other_user["inputText"]
+    assert not any(params["enableTrace"] for params in agent.params)
+
+@pytest.mark.asyncio
+async def test_inline_and_agent_modes_use_fresh_sessions():
+    inline_agent, config_agent = FakeAgent(), FakeAgent()
+    inline = make_service(inline_agent, bedrock_prompt_mode="inline")
+    configured = make_service(config_agent, bedrock_prompt_mode="agent")
+
+    for service in (inline, configured):
+        await service.invoke_agent("bench 3x5", user_id=1)
+        await service.invoke_agent("squat 5x5", user_id=1)
+
+    assert inline_agent.params[0]["sessionId"] != inline_agent.params[1]["sessionId"]
+    assert all(inline.compact_system_prompt in p["inputText"] for p in inline_agent.params)
+    assert "\n    " not in inline.compact_system_prompt
+    assert [p["inputText"] for p in config_agent.params] == ["User workout: bench 3x5", "User workout: squat 5x5"]
+
+def test_invalid_prompt_mode_is_rejected():
+    with pytest.raises(ValueError):
+        make_service(FakeAgent(), bedrock_prompt_mode="verbose")
+
+@pytest.mark.asyncio
+async def test_token_usage_from_trace_or_estimate():
+    traced = make_service(
+        FakeAgent(trace_events=[usage_event(900, 150), usage_event(300, 50)]),
+        bedrock_enable_trace=True
+    )
+    assert await traced.invoke_agent("bench 3x5") == AGENT_REPLY
+    assert traced.usage_totals == {"calls": 1, "input_tokens": 1200, "output_tokens": 200}
+
+    untraced = make_service(FakeAgent(), bedrock_prompt_mode="agent")
+    await untraced.invoke_agent("bench 3x5")
+    assert untraced.usage_totals["input_tokens"] == estimate_tokens("User workout: bench 3x5")
+    assert untraced.usage_totals["output_tokens"] > 0
+
+def test_usage_from_trace_ignores_events_without_usage():
+    assert usage_from_trace([{"trace": {"trace": {"orchestrationTrace": {"rationale": {}}}}}]) is None
+
+def test_sessions_rotate_after_max_turns():
+    registry = AgentSessionRegistry(idle_seconds=600, max_turns=2)
+    session = registry.get(1)
+    registry.complete_turn(session)
+    assert registry.get(1) is session and session.primed
+    registry.complete_turn(session)
+    assert registry.get(1) is not session
+
+def test_compact_prompt_collapses_whitespace():
+    assert compact_prompt('{\n    "a": 1,\n\n    "b": 2\n}\n') == '{ "a": 1, "b": 2 }'
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import time
+import pytest
+from unittest.mock import patch
+from app.core.settings import Settings
+from app.core.resilience import (
+    AIMDLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    ConcurrencyLimitError,
+    DeadlineExceededError,
+    backoff_delay,
+)
+from app.main import app
+from app.routes.chat import get_agent_service
+from app.services.bedrock_agent_service import BedrockAgentService
+
+AGENT_REPLY = {"display_message": "Bench 3x5", "structured_data": {"exercises": []}}
+
+class ThrottlingError(Exception):
+    """Shaped like botocore's ClientError"""
+    response = {"Error": {"Code": "ThrottlingException"}}
+
+class ServerError(Exception):
+    response = {"Error": {"Code": "InternalServerException"}, "ResponseMetadata": {"HTTPStatusCode": 500}}
+
+class ValidationError(Exception):
+    response = {"Error": {"Code": "ValidationException"}, "ResponseMetadata": {"HTTPStatusCode": 400}}
+
+class FakeAgent:
+    """Stands in for the bedrock-agent-runtime client; plays back scripted outcomes"""
+
+    def __init__(self, *outcomes, latency: float = 0.0, trace_events=()):
+        self.outcomes = list(outcomes)
+        self.latency = latency
+        self.trace_events = list(trace_events)
+        self.params = []
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def client(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def invoke_agent(self, **params):
+        self.calls += 1
+        self.params.append(params)
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(3600 if outcome == "hang" else self.latency)
+        finally:
+            self.in_flight -= 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return {"completion": self._stream(garbled=outcome == "garbled")}
+
+    async def _stream(self, garbled=False):
+        for event in self.trace_events:
+            yield event
+        yield {"chunk": {"bytes": b"{not json" if garbled else json.dumps(AGENT_REPLY).encode()}}
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_service(agent, breaker=None, limiter=None, **overrides):
+    values = dict(
+        bedrock_request_deadline_seconds=5,
+        bedrock_attempt_timeout_seconds=5,
+        bedrock_max_attempts=3,
+        bedrock_backoff_base_seconds=0.001,
+        bedrock_backoff_max_seconds=0.01,
+        llm_telemetry_enabled=False,
+    )
+    values.update(overrides)
+    settings = Settings(**values)
+    with patch("app.services.bedrock_agent_service.get_settings", lambda: settings):
+        return BedrockAgentService(
+            client_factory=agent.client,
+            breaker=breaker or CircuitBreaker("bedrock", failure_threshold=3, recovery_timeout=30),
+            limiter=limiter or AIMDLimiter(initial_limit=4, max_limit=8)
+        )
+
+@pytest.mark.asyncio
+async def test_retries_throttling_then_succeeds():
+    agent = FakeAgent(ThrottlingError("slow down"), "ok")
+    service = make_service(agent)
+
+    assert await service.invoke_agent("bench 3x5") == AGENT_REPLY
+    assert agent.calls == 2
+    assert service.breaker.state == CircuitState.CLOSED
+    # Halved on the throttle, then one additive step back up
+    assert service.limiter.limit == 2
+    assert service.limiter.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_then_recovers_after_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("bedrock", failure_threshold=3, recovery_timeout=30, clock=clock)
+    agent = FakeAgent(*[ServerError("brownout")] * 3)
+    service = make_service(agent, breaker=breaker)
+
+    with pytest.raises(ServerError):
+        await service.invoke_agent("squat 5x5")
+    assert breaker.state == CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        await service.invoke_agent("squat 5x5")
+    assert agent.calls == 3
+    assert excinfo.value.retry_after == pytest.approx(30)
+
+    clock.now = 31
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert await service.invoke_agent("squat 5x5") == AGENT_REPLY
+    assert breaker.state == CircuitState.CLOSED
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("outcome, error", [(ValidationError("bad input"), ValidationError), ("garbled", ValueError)])
+async def test_request_errors_fail_fast_without_tripping_breaker(outcome, error):
+    agent = FakeAgent(*[outcome] * 3)
+    service = make_service(agent, breaker=CircuitBreaker("bedrock", failure_threshold=1, recovery_timeout=30))
+
+    for _ in range(2):
+        with pytest.raises(error):
+            await service.invoke_agent("bench 3x5")
+
+    # No retries, and the breaker stays closed for everyone else
+    assert agent.calls == 2
+    assert service.breaker.state == CircuitState.CLOSED
+    assert service.limiter.in_flight == 0
+
+def test_failed_probe_reopens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker("bedrock", failure_threshold=1, recovery_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_all_attempts():
+    agent = FakeAgent("hang", "hang", "hang")
+    service = make_service(agent, bedrock_request_deadline_seconds=0.2, bedrock_attempt_timeout_seconds=30)
+
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceededError):
+        await service.invoke_agent("deadlift 1x5")
+    assert time.perf_counter() - started < 1
+    assert agent.calls == 1
+    # A timeout is an overload signal
+    assert service.limiter.limit == 2
+
+@pytest.mark.asyncio
+async def test_limiter_caps_concurrent_calls():
+    agent = FakeAgent(latency=0.05)
+    service = make_service(agent, limiter=AIMDLimiter(initial_limit=2, max_limit=2))
+
+    results = await asyncio.gather(*(service.invoke_agent(f"set {i}") for i in range(6)))
+    assert results == [AGENT_REPLY] * 6
+    assert agent.max_in_flight == 2
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_when_no_slot_frees_in_time():
+    limiter = AIMDLimiter(initial_limit=1)
+    await limiter.acquire()
+    with pytest.raises(ConcurrencyLimitError):
+        await limiter.acquire(timeout=0.01)
+    limiter.release()
+    await limiter.acquire(timeout=0.01)
+    assert limiter.in_flight == 1
+
+def test_aimd_adjusts_limit():
+    limiter = AIMDLimiter(initial_limit=4, min_limit=1, max_limit=5, latency_target=1.0)
+    for _ in range(5):
+        limiter.record(0.1)
+    assert limiter.limit == 5
+    limiter.record(2.0)  # slower than the target
+    assert limiter.limit == 2
+    for _ in range(5):
+        limiter.record(0.1, overloaded=True)
+    assert limiter.limit == 1
+
+def test_backoff_is_jittered_exponential_and_capped():
+    assert backoff_delay(0, base=0.5, cap=8, rng=lambda: 1.0) == 0.5
+    assert backoff_delay(3, base=0.5, cap=8, rng=lambda: 1.0) == 4
+    assert backoff_delay(10, base=0.5, cap=8, rng=lambda: 1.0) == 8
+    assert backoff_delay(3, base=0.5, cap=8, rng=lambda: 0.25) == 1
+
+def test_chat_returns_503_while_circuit_open(client):
+    breaker = CircuitBreaker("bedrock", failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    service = make_service(FakeAgent(), breaker=breaker)
+    app.dependency_overrides[get_agent_service] = lambda: service
+    try:
+        response = client.post("/api/chat/", json={"message": "bench 3x5"})
+    finally:
+        del app.dependency_overrides[get_agent_service]
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 29
@@ -0,0 +1,41 @@
+from datetime import date
+from benchmarks.bench_analytics import budget_for, check_budgets, prepare_scenario, run_scenario, sample_users
+
+BUDGETS = {
+    "default": {"p95_ms": {"month": 50, "5y": 500, "5y/1000u": 900}},
+    "targets": {"get_muscle_tracking": {"queries": 1}},
+}
+
+def result(target="get_muscle_tracking", scale="month", users=10, p95_ms=10.0, queries=1, error=None):
+    return {"target": target, "scale": scale, "users": users, "p95_ms": p95_ms, "queries": queries, "error": error}
+
+def test_budget_resolution():
+    assert budget_for(BUDGETS, "get_muscle_tracking", "month", 10) == {"p95_ms": 50, "queries": 1}
+    assert budget_for(BUDGETS, "analyze_muscle_balance", "5y", 1000) == {"p95_ms": 900}
+    assert budget_for(BUDGETS, "analyze_muscle_balance", "year", 10) == {"p95_ms": None}
+
+def test_regressions_and_errors_fail():
+    assert check_budgets([result()], BUDGETS) == []
+    failures = check_budgets([
+        result(p95_ms=60.0),
+        result(queries=4),
+        result(target="analyze_muscle_balance", error="OperationalError: boom"),
+    ], BUDGETS)
+    assert len(failures) == 3
+    assert "p95 60.0 ms > budget 50.0 ms" in failures[0]
+    assert "4 queries > budget 1" in failures[1]
+    assert check_budgets([result(p95_ms=60.0)], BUDGETS, latency_factor=2) == []
+
+def test_runs_targets_against_generated_history(tmp_path):
+    scenario = prepare_scenario("month", 3, seed=1, end=date.today(), data_dir=str(tmp_path))
+    try:
+        results = run_scenario(
+            scenario, ["analyze_muscle_balance", "GET /api/analysis/progression"], sample_users(3, 2), repeat=2
+        )
+    finally:
+        scenario.engine.dispose()
+
+    assert scenario.rows > 0
+    assert [r["error"] for r in results] == [None, None]
+    assert [r["queries"] for r in results] == [1, 1]
+    assert all(r["calls"] == 4 and r["p50_ms"] <= r["p95_ms"] <= r["max_ms"] for r in results)
@@ -0,0 +1,81 @@
+import gzip
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.middleware.compression import CompressionMiddleware, parse_accept_encoding
+
+PAYLOAD = [{"muscle_name": f"muscle_{i}", "total_volume": i * 10.0} for i in range(200)]
+
+@pytest.fixture
+def app_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for item in PAYLOAD[:50]:
+                yield json.dumps(item).encode() + b"\n"
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip;q=0.5, br, identity;q=0") == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+
+def test_large_json_is_gzipped(app_client):
+    response = app_client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(json.dumps(PAYLOAD))
+    assert response.json() == PAYLOAD
+
+def test_small_and_unaccepted_bodies_are_left_alone(app_client):
+    assert "content-encoding" not in app_client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in app_client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+    assert "content-encoding" not in app_client.get("/large", headers={"Accept-Encoding": "gzip;q=0"}).headers
+
+def test_streaming_body_is_compressed_incrementally(app_client):
+    with app_client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+    lines = gzip.decompress(raw).splitlines()
+    assert len(lines) == 50
+
+def test_analytics_routes_send_cache_policy(test_db, client):
+    response = client.get("/api/analysis/personal-records", params={"user_id": 1})
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert "Accept-Encoding" in response.headers["vary"]
+
+    revalidated = client.get(
+        "/api/analysis/personal-records",
+        params={"user_id": 1},
+        headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["cache-control"] == "private, no-cache"
+
+@pytest.mark.parametrize("format", ["csv", "json"])
+def test_report_exports_send_cache_policy(test_db, client, monkeypatch, format):
+    from app.main import app
+    from benchmarks.load_test import harness_app
+
+    # Reports are only mounted by the load-test harness; restore the routes afterwards
+    monkeypatch.setattr(app.router, "routes", list(app.router.routes))
+    harness_app()
+
+    response = client.get("/api/reports/export", params={"format": format})
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("private, max-age=")
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["content-disposition"].endswith(f'.{format}"')
@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime
+from app.models.user import User
+from app.models.exercise import WorkoutSession
+from app.services.data_version_service import DataVersionService
+from app.services.workout_storage_service import WorkoutStorageService
+
+@pytest.fixture
+def lifter(test_db, test_session):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    test_session.add(User(id=2, username="other", email="other@example.com"))
+    test_session.commit()
+    return WorkoutStorageService(test_session)
+
+def log_bench(storage, test_session):
+    session = WorkoutSession(user_id=1, start_time=datetime(2025, 1, 6, 9, 0))
+    test_session.add(session)
+    test_session.commit()
+    storage.store_exercise_data(session_id=session.id, name="Bench Press", reps=[5], weight=[100])
+    return session
+
+def test_workout_writes_bump_only_the_owner(lifter, test_session):
+    versions = DataVersionService(test_session)
+    assert versions.get_version(1) == 0
+
+    session = log_bench(lifter, test_session)
+    after_write = versions.get_version(1)
+    assert after_write > 0
+    assert versions.get_version(2) == 0
+
+    lifter.end_workout_session(session.id)
+    assert versions.get_version(1) > after_write
+
+def test_rolled_back_write_keeps_version(lifter, test_session):
+    test_session.add(WorkoutSession(user_id=1))
+    test_session.flush()
+    test_session.rollback()
+    assert DataVersionService(test_session).get_version(1) == 0
+
+def test_if_none_match_returns_304_until_data_changes(lifter, test_session, client):
+    url = "/api/analysis/personal-records"
+    first = client.get(url, params={"user_id": 1})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = client.get(url, params={"user_id": 1}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    # A different query string is a different representation
+    other = client.get(url, params={"user_id": 1, "exercise_name": "bench press"})
+    assert other.headers["etag"] != etag
+
+    log_bench(lifter, test_session)
+    test_session.commit()
+    fresh = client.get(url, params={"user_id": 1}, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert len(fresh.json()) > 0
+
+def test_windows_ending_now_revalidate_as_time_passes(lifter, test_session, client, monkeypatch):
+    from app.core import http_cache
+
+    log_bench(lifter, test_session)
+    test_session.commit()
+    monkeypatch.setattr(http_cache, "utc_timestamp", lambda: 1_700_000_000.0)
+    url = "/api/analytics/muscle-tracking"
+    etag = client.get(url, params={"user_id": 1}).headers["etag"]
+    assert client.get(url, params={"user_id": 1}, headers={"If-None-Match": etag}).status_code == 304
+
+    # Same data version, but the window has moved on
+    monkeypatch.setattr(http_cache, "utc_timestamp", lambda: 1_700_000_000.0 + http_cache.WINDOW_ETAG_SECONDS)
+    moved = client.get(url, params={"user_id": 1}, headers={"If-None-Match": etag})
+    assert moved.status_code == 200
+    assert moved.headers["etag"] != etag
+
+    # A pinned range doesn't depend on the clock
+    pinned = {"user_id": 1, "timeframe": "weekly", "start": "2025-01-01T00:00:00", "end": "2025-01-08T00:00:00"}
+    pinned_etag = client.get("/api/analytics/muscle-volume", params=pinned).headers["etag"]
+    monkeypatch.setattr(http_cache, "utc_timestamp", lambda: 1_800_000_000.0)
+    assert client.get("/api/analytics/muscle-volume", params=pinned, headers={"If-None-Match": pinned_etag}).status_code == 304
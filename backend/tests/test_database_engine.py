@@ -0,0 +1,48 @@
+from sqlalchemy.pool import NullPool
+from app.core.settings import Settings
+from app.core.pool_metrics import TimedNullPool, TimedQueuePool, pool_snapshot, render_prometheus
+from app.models.database import create_db_engine, engine_options
+
+POSTGRES_URL = "postgresql://user:pass@db:5432/workout"
+
+def test_postgres_pool_settings():
+    options = engine_options(Settings(
+        database_url=POSTGRES_URL,
+        db_pool_size=8,
+        db_max_overflow=2,
+        db_pool_recycle=600,
+        db_statement_timeout_ms=5000,
+    ))
+    assert options["poolclass"] is TimedQueuePool
+    assert (options["pool_size"], options["max_overflow"], options["pool_recycle"]) == (8, 2, 600)
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+def test_pgbouncer_mode_leaves_pooling_to_pgbouncer():
+    settings = Settings(database_url=POSTGRES_URL, db_pgbouncer_mode=True, db_statement_timeout_ms=5000)
+    options = engine_options(settings)
+    assert options["poolclass"] is TimedNullPool
+    assert "connect_args" not in options
+    assert isinstance(create_db_engine(settings).pool, NullPool)
+
+def test_pool_metrics_track_checkouts(tmp_path):
+    db_engine = create_db_engine(Settings(database_url=f"sqlite:///{tmp_path}/pool.db"))
+    assert isinstance(db_engine.pool, TimedQueuePool)
+
+    with db_engine.connect():
+        busy = pool_snapshot(db_engine.pool)
+    idle = pool_snapshot(db_engine.pool)
+
+    assert busy["checked_out"] == 1 and busy["utilization"] > 0
+    assert idle["checked_out"] == 0
+    assert idle["checkouts_total"] == 1
+    assert idle["checkout_wait_seconds_max"] >= 0
+
+    db_engine.dispose()
+    assert db_engine.pool.metrics.checkouts == 1
+    assert "# TYPE db_pool_checkouts_total counter" in render_prometheus(db_engine.pool)
+
+def test_metrics_endpoint(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "db_pool_utilization" in response.text
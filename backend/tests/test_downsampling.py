@@ -0,0 +1,79 @@
+import random
+from datetime import datetime, timedelta
+from app.core.downsampling import downsample_series, lttb_indices
+from app.main import app
+from app.routes.analytics import get_storage_service
+
+def reference_lttb(x, y, max_points):
+    """Straightforward LTTB with the same bucket edges, for comparison"""
+    n = len(x)
+    edges = [int(1 + i * (n - 2) / (max_points - 2)) for i in range(max_points - 1)]
+    edges[-1] = n - 1
+    selected, previous = [0], 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            nxt = range(edges[b + 1], edges[b + 2])
+            avg_x = sum(x[i] for i in nxt) / len(nxt)
+            avg_y = sum(y[i] for i in nxt) / len(nxt)
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        best = max(range(lo, hi), key=lambda i: abs(
+            (x[previous] - avg_x) * (y[i] - y[previous]) - (x[previous] - x[i]) * (avg_y - y[previous])
+        ))
+        selected.append(best)
+        previous = best
+    return selected + [n - 1]
+
+def test_matches_reference_implementation():
+    rng = random.Random(4)
+    x = sorted(rng.uniform(0, 1e6) for _ in range(997))
+    y = [rng.gauss(1000, 200) for _ in x]
+    for max_points in (3, 10, 137, 996):
+        assert lttb_indices(x, y, max_points) == reference_lttb(x, y, max_points)
+
+def test_keeps_endpoints_and_peaks():
+    x = list(range(5000))
+    y = [100.0 + (i % 7) for i in x]
+    y[1234], y[4000] = 5000.0, -3000.0
+
+    kept = lttb_indices(x, y, 100)
+
+    assert len(kept) == 100 and kept[0] == 0 and kept[-1] == 4999
+    assert kept == sorted(kept)
+    assert 1234 in kept and 4000 in kept
+    assert lttb_indices(x[:50], y[:50], 100) == list(range(50))
+
+def test_series_keeps_its_order():
+    start = datetime(2024, 1, 1)
+    points = [{"date": start + timedelta(days=i), "volume": float(i % 10)} for i in range(300)][::-1]
+
+    sampled = downsample_series(points, 20, x=lambda p: p["date"].timestamp(), y=lambda p: p["volume"])
+
+    assert len(sampled) == 20
+    assert sampled[0] is points[0] and sampled[-1] is points[-1]
+    assert [p["date"] for p in sampled] == sorted((p["date"] for p in sampled), reverse=True)
+
+class FakeStorage:
+    def get_muscle_volume_data(self, timeframe, user_id=None, **range_args):
+        start = datetime(2020, 1, 6)
+        return [
+            {"muscle_name": muscle, "total_volume": 9000.0 if i == 600 else 1000.0 + i % 13, "date": start + timedelta(days=i)}
+            for i in reversed(range(1500)) for muscle in ("quadriceps", "triceps")
+        ]
+
+def test_volume_progression_max_points(client):
+    app.dependency_overrides[get_storage_service] = FakeStorage
+    try:
+        full = client.get("/api/analytics/volume-progression?user_id=1").json()
+        sampled = client.get("/api/analytics/volume-progression?user_id=1&max_points=50").json()
+        too_small = client.get("/api/analytics/volume-progression?user_id=1&max_points=2")
+    finally:
+        del app.dependency_overrides[get_storage_service]
+
+    assert {len(points) for points in full.values()} == {1500}
+    assert {len(points) for points in sampled.values()} == {50}
+    quads = sampled["quadriceps"]
+    assert quads[0] == full["quadriceps"][0] and quads[-1] == full["quadriceps"][-1]
+    assert max(p["volume"] for p in quads) == 9000.0
+    assert too_small.status_code == 422
@@ -0,0 +1,55 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models.user import User
+from app.models.exercise import CanonicalExercise, WorkoutSession, ExerciseTemplate
+from app.services.workout_storage_service import WorkoutStorageService
+from app.services.analysis_service import AnalysisService
+from app.services.exercise_identity_service import ExerciseIdentityService, normalize_exercise_key
+
+def test_normalize_exercise_key():
+    assert normalize_exercise_key("Pull-Ups") == "pull up"
+    assert normalize_exercise_key("  Bench   Press ") == "bench press"
+    assert normalize_exercise_key("bench_press") == "bench press"
+
+def test_spellings_share_canonical_id(test_db, test_session):
+    identity = ExerciseIdentityService(test_session)
+    bench = identity.resolve_id("Bench Press")
+    assert identity.resolve_id("bench press") == bench
+    assert identity.resolve_id("Flat Bench Press") == bench
+    assert identity.resolve_id("Back Squats") == identity.resolve_id("squat")
+    assert identity.resolve_id("Zercher Carry") not in (None, bench)
+
+def test_templates_are_seeded(test_db, test_session):
+    test_session.add(ExerciseTemplate(name="Hip Thrust", movement_pattern="hinge", muscle_involvement={}))
+    test_session.commit()
+    identity = ExerciseIdentityService(test_session)
+    identity.ensure_catalog()
+    test_session.commit()
+    assert identity.lookup_id("hip thrusts") is not None
+    assert identity.lookup_id("never logged") is None
+
+def test_lookup_never_writes(test_db, test_session):
+    identity = ExerciseIdentityService(test_session)
+    assert identity.lookup_id("bench press") is None
+    assert not test_session.new and test_session.query(CanonicalExercise).count() == 0
+
+    # Ingest seeds the catalog, after which the pattern variations resolve on reads
+    bench = identity.resolve_id("Bench Press")
+    test_session.commit()
+    assert identity.lookup_id("flat bench press") == bench
+
+def test_progression_groups_across_spellings(test_db, test_session):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    test_session.commit()
+    storage = WorkoutStorageService(test_session)
+
+    for days_ago, name, volume in [(60, "Bench Press", 1000), (50, "flat bench press", 1000), (10, "BENCH PRESS", 1500)]:
+        session = WorkoutSession(user_id=1, start_time=datetime.utcnow() - timedelta(days=days_ago))
+        test_session.add(session)
+        test_session.commit()
+        storage.store_exercise_data(session_id=session.id, name=name, total_volume=volume)
+
+    progression = AnalysisService(test_session).analyze_volume_progression(1, 90)
+    assert list(progression) == ["bench press"]
+    assert progression["bench press"].trend == "increasing"
+    assert progression["bench press"].percent_change == pytest.approx(50.0)
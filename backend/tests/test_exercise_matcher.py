@@ -0,0 +1,81 @@
+import pytest
+from types import SimpleNamespace
+from app.services.exercise_analysis import MockClaudeService
+from app.services.exercise_matcher import ExerciseMatcher
+
+@pytest.fixture(scope="module")
+def matcher():
+    return ExerciseMatcher.from_catalog()
+
+@pytest.mark.parametrize("description,expected", [
+    ("3 sets of back squats at 225lbs", "squat"),
+    ("bench pres 3x8 @ 135", "bench_press"),
+    ("Incline bench press", "bench_press"),
+    ("romanian deadlifts 3x10", "deadlift"),
+    ("pendlay rows", "row"),
+    ("chin-ups", "pull_up"),
+    ("overhead pres", "overhead_press"),
+    # Transposed letters and run-together words
+    ("sqaut 4x6", "squat"),
+    ("deadlfit 1x5", "deadlift"),
+    ("pullups", "pull_up"),
+    ("benchpress 3x8", "bench_press"),
+])
+def test_matches_variations_and_misspellings(matcher, description, expected):
+    assert matcher.best_match(description).key == expected
+
+@pytest.mark.parametrize("description", [
+    "went for a swim",
+    # Share a word with an alias but are different exercises
+    "barbell curl",
+    "front raise",
+    "leg press",
+    "push ups",
+])
+def test_unrelated_text_does_not_match(matcher, description):
+    assert matcher.best_match(description) is None
+
+def test_templates_extend_catalog():
+    template = SimpleNamespace(
+        name="Hip Thrust",
+        movement_pattern="hinge",
+        muscle_involvement={"gluteus_maximus": 1.0, "hamstrings": 0.5},
+        equipment="barbell",
+    )
+    matcher = ExerciseMatcher.from_catalog([template])
+    match = matcher.best_match("barbell hip thrusts 4x8")
+    assert match.key == "Hip Thrust"
+    assert matcher.entries[match.key].muscle_activations[0]["activation_level"] == "PRIMARY"
+
+@pytest.mark.asyncio
+async def test_mock_service_analyzes_known_exercise():
+    analysis = await MockClaudeService().analyze_exercise("front squat 5x5")
+    assert analysis.exercise_name == "squat"
+    assert analysis.movement_pattern == "squat"
+    assert {m.muscle_name for m in analysis.muscle_activations} >= {"quadriceps", "gluteus_maximus"}
+
+def test_matcher_reloads_only_after_template_changes(test_db, test_session):
+    from sqlalchemy import event
+    from app.models.exercise import ExerciseTemplate
+    from tests.conftest import engine
+
+    service = MockClaudeService()
+    service.ensure_templates(test_session)
+    assert service.matcher.best_match("hip thrust") is None
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        service.ensure_templates(test_session)
+        assert statements == []
+
+        test_session.add(ExerciseTemplate(
+            name="Hip Thrust", movement_pattern="hinge", muscle_involvement={"gluteus_maximus": 1.0}
+        ))
+        test_session.commit()
+        service.ensure_templates(test_session)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert service.matcher.best_match("barbell hip thrusts").key == "Hip Thrust"
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Measured at ~1.3s and ~500 modules; the margins absorb slow CI machines,
+# not new heavy imports
+MAX_IMPORT_SECONDS = 3.0
+MAX_MODULES = 650
+
+# Only needed on specific request paths, never to boot a worker
+DEFERRED_MODULES = ["numpy", "boto3", "aioboto3", "botocore", "aiohttp", "redis"]
+
+SCRIPT = """
+import json, sys, time
+baseline = len(sys.modules)
+started = time.perf_counter()
+import app.main
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "modules": len(sys.modules) - baseline,
+    "loaded": sorted(name for name in %r if name in sys.modules),
+}))
+""" % (DEFERRED_MODULES,)
+
+def import_app_main():
+    env = {k: v for k, v in os.environ.items() if not k.startswith("AWS_")}
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], env=env, cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_import_defers_heavy_dependencies():
+    stats = import_app_main()
+    assert stats["loaded"] == []
+
+def test_import_stays_within_budget():
+    stats = import_app_main()
+    assert stats["modules"] <= MAX_MODULES, f"app.main imported {stats['modules']} modules"
+    assert stats["seconds"] <= MAX_IMPORT_SECONDS, f"app.main took {stats['seconds']:.2f}s to import"
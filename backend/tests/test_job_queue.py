@@ -0,0 +1,193 @@
+import asyncio
+import pytest
+from app.services import job_queue
+from app.services.job_queue import Job, JobQueue, JobStatus, LocalJobBackend, RedisJobBackend
+
+class FakeRedis:
+    """The list and string commands RedisJobBackend uses, kept in dicts (no Lua)"""
+
+    def __init__(self):
+        self.data, self.ttls, self.lists = {}, {}, {}
+
+    async def set(self, key, value, ex=None, px=None):
+        self.data[key] = value
+        self.ttls[key] = ex if ex is not None else (px / 1000 if px is not None else None)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def publish(self, channel, message):
+        pass
+
+    async def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    async def blmove(self, source, destination, timeout, src="LEFT", dest="RIGHT"):
+        items = self.lists.get(source)
+        if not items:
+            return None
+        value = items.pop() if src == "RIGHT" else items.pop(0)
+        target = self.lists.setdefault(destination, [])
+        target.insert(0, value) if dest == "LEFT" else target.append(value)
+        return value
+
+    async def lrem(self, key, count, value):
+        self.lists.get(key, []).remove(value)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis, self.commands = redis, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append(getattr(self.redis, name)(*args))
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+def redis_backend(lease_seconds=300):
+    backend = RedisJobBackend("localhost", 6379, result_ttl=60, lease_seconds=lease_seconds)
+    backend.redis = FakeRedis()
+    return backend
+
+@pytest.fixture
+def local_queue(monkeypatch):
+    queue = JobQueue(LocalJobBackend(), poll_timeout=0.05)
+    for module in ("app.routes.jobs", "app.routes.workout", "app.routes.chat"):
+        monkeypatch.setattr(f"{module}.get_job_queue", lambda: queue)
+    return queue
+
+@pytest.mark.asyncio
+async def test_workers_run_jobs_and_store_results(monkeypatch):
+    async def double(payload):
+        await asyncio.sleep(0.01)
+        return {"value": payload["value"] * 2}
+
+    async def explode(payload):
+        raise RuntimeError("bedrock timed out")
+
+    monkeypatch.setitem(job_queue.handlers, "double", double)
+    monkeypatch.setitem(job_queue.handlers, "explode", explode)
+    queue = JobQueue(LocalJobBackend(), poll_timeout=0.05)
+    queue.start(2)
+    try:
+        ok = await queue.submit("double", {"value": 21})
+        bad = await queue.submit("explode", {})
+        assert (await queue.get(ok.id)).status in (JobStatus.QUEUED, JobStatus.RUNNING)
+
+        done = await queue.wait(ok.id, timeout=2)
+        failed = await queue.wait(bad.id, timeout=2)
+    finally:
+        await queue.stop()
+
+    assert done.status == JobStatus.SUCCEEDED and done.result == {"value": 42}
+    assert done.started_at <= done.finished_at
+    assert failed.status == JobStatus.FAILED and failed.error == "bedrock timed out"
+
+@pytest.mark.asyncio
+async def test_local_backend_evicts_finished_jobs_after_ttl(monkeypatch):
+    async def noop(payload):
+        return None
+
+    monkeypatch.setitem(job_queue.handlers, "noop", noop)
+    backend = LocalJobBackend(result_ttl=0.05)
+    queue = JobQueue(backend)
+    finished = await queue.submit("noop", {})
+    await queue.run_one(await backend.pop(1))
+    pending = await queue.submit("noop", {})
+
+    assert (await queue.get(finished.id)).status == JobStatus.SUCCEEDED
+    await asyncio.sleep(0.1)
+    assert await queue.get(finished.id) is None
+    # Queued jobs are never evicted, however long they wait
+    assert (await queue.get(pending.id)).status == JobStatus.QUEUED
+    assert set(backend._jobs) == set(backend._done) == {pending.id}
+
+@pytest.mark.asyncio
+async def test_redis_jobs_stay_claimed_until_acked(monkeypatch):
+    async def double(payload):
+        return payload["value"] * 2
+
+    monkeypatch.setitem(job_queue.handlers, "double", double)
+    backend = redis_backend()
+    queue = JobQueue(backend)
+    job = await queue.submit("double", {"value": 21})
+    # Only results expire; a queued job survives however long the queue is
+    assert backend.redis.ttls[backend._key(job.id)] is None
+
+    assert await backend.pop(1) == job.id
+    # A worker that dies here leaves the job claimed and leased, for the sweep to requeue
+    assert backend.redis.lists[backend.processing_key] == [job.id]
+    assert backend.redis.ttls[backend._lease_key(job.id)] == 300
+
+    await queue.run_one(job.id)
+
+    assert (await queue.get(job.id)).result == 42
+    assert backend.redis.ttls[backend._key(job.id)] == 60
+    assert backend.redis.lists[backend.processing_key] == []
+    assert backend._lease_key(job.id) not in backend.redis.data
+
+@pytest.mark.asyncio
+async def test_redelivered_finished_job_is_acked_without_rerunning(monkeypatch):
+    calls = []
+
+    async def record(payload):
+        calls.append(payload)
+
+    monkeypatch.setitem(job_queue.handlers, "record", record)
+    backend = redis_backend()
+    queue = JobQueue(backend)
+    job = await queue.submit("record", {})
+    await queue.run_one(await backend.pop(1))
+
+    # The worker died after storing the result but before acking; the sweep put it back
+    await backend.redis.lpush(backend.queue_key, job.id)
+    await queue.run_one(await backend.pop(1))
+
+    assert len(calls) == 1
+    assert backend.redis.lists[backend.processing_key] == []
+
+@pytest.mark.asyncio
+async def test_submit_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        await JobQueue(LocalJobBackend()).submit("nope", {})
+
+def test_job_round_trips_through_json():
+    job = Job(kind="chat", payload={"message": "bench 3x5"}, status=JobStatus.FAILED, error="boom")
+    assert Job.from_json(job.to_json()) == job
+
+def test_async_process_returns_202_and_job_completes(client, local_queue, monkeypatch):
+    async def fake_process(payload):
+        return {"session_id": payload["session_id"], "text": payload["workout_text"]}
+
+    monkeypatch.setitem(job_queue.handlers, "process_workout", fake_process)
+
+    response = client.post(
+        "/api/workout/process?mode=async",
+        json={"session_id": 7, "workout_text": "squat 5x5 at 100kg"}
+    )
+    assert response.status_code == 202
+    body = response.json()
+    assert response.headers["location"] == body["status_url"] == f"/api/jobs/{body['job_id']}"
+    assert client.get(body["status_url"]).json()["status"] == "queued"
+
+    # Stand in for a worker
+    asyncio.run(local_queue.run_one(body["job_id"]))
+
+    job = client.get(body["status_url"], params={"wait": 1}).json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"session_id": 7, "text": "squat 5x5 at 100kg"}
+
+def test_unknown_job_is_404(client, local_queue):
+    assert client.get("/api/jobs/missing").status_code == 404
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import pytest
+from app.main import app
+from app.routes.chat import get_agent_service
+from app.services.bedrock_agent_service import get_bedrock_agent_service
+from app.services.job_queue import JobQueue, LocalJobBackend
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_app_imports_without_aws_credentials():
+    env = {k: v for k, v in os.environ.items() if not k.startswith("AWS_")}
+    env["TESTING"] = "true"
+    script = (
+        "import app.main\n"
+        "from app.services.bedrock_agent_service import get_bedrock_agent_service\n"
+        "assert get_bedrock_agent_service.cache_info().currsize == 0\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], env=env, cwd=BACKEND_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+def test_chat_reports_unconfigured_bedrock_as_503(client, monkeypatch):
+    monkeypatch.delenv("AWS_ACCESS_KEY_ID", raising=False)
+    monkeypatch.delenv("AWS_SECRET_ACCESS_KEY", raising=False)
+    monkeypatch.setattr("app.services.bedrock_agent_service.load_dotenv", lambda: None)
+    get_bedrock_agent_service.cache_clear()
+    try:
+        response = client.post("/api/chat/", json={"message": "bench 3x5 at 100"})
+    finally:
+        get_bedrock_agent_service.cache_clear()
+    assert response.status_code == 503
+
+def test_async_chat_queues_without_bedrock_configured(client, monkeypatch):
+    monkeypatch.delenv("AWS_ACCESS_KEY_ID", raising=False)
+    monkeypatch.delenv("AWS_SECRET_ACCESS_KEY", raising=False)
+    monkeypatch.setattr("app.services.bedrock_agent_service.load_dotenv", lambda: None)
+    monkeypatch.setattr("app.routes.chat.get_job_queue", lambda: queue)
+    queue = JobQueue(LocalJobBackend())
+    get_bedrock_agent_service.cache_clear()
+    try:
+        response = client.post("/api/chat/", params={"mode": "async"}, json={"message": "bench 3x5 at 100"})
+    finally:
+        get_bedrock_agent_service.cache_clear()
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+
+def test_chat_uses_injected_agent_service(client):
+    class FakeAgent:
+        calls = 0
+
+        async def invoke_agent(self, message, user_id=None):
+            FakeAgent.calls += 1
+            return None
+
+    app.dependency_overrides[get_agent_service] = FakeAgent
+    try:
+        response = client.post("/api/chat/", json={"message": "bench 3x5 at 100"})
+    finally:
+        del app.dependency_overrides[get_agent_service]
+
+    assert FakeAgent.calls == 1
+    assert "No response received" in response.json()["detail"]
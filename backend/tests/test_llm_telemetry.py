@@ -0,0 +1,88 @@
+import pytest
+from datetime import datetime, timedelta
+from app.core.resilience import CircuitBreaker, CircuitOpenError
+from app.models.telemetry import LLMCall
+from app.services.llm_telemetry_service import LLMTelemetryService, percentile
+from tests.conftest import TestingSessionLocal
+from tests.test_bedrock_resilience import FakeAgent, ThrottlingError, make_service
+
+@pytest.fixture
+def telemetry(test_db):
+    return LLMTelemetryService(TestingSessionLocal, batch_size=100)
+
+def recorded_calls():
+    with TestingSessionLocal() as db:
+        return db.query(LLMCall).order_by(LLMCall.id).all()
+
+@pytest.mark.asyncio
+async def test_invocation_is_recorded_with_timings(telemetry):
+    service = make_service(FakeAgent(ThrottlingError("slow down"), "ok", latency=0.01))
+    service.telemetry = telemetry
+
+    await service.invoke_agent("bench 3x5")
+    assert telemetry.flush() == 1
+
+    call, = recorded_calls()
+    assert call.outcome == "success" and call.error_type is None
+    assert call.attempts == 2
+    assert call.chunk_count == 1 and call.response_bytes > 0
+    assert 0 < call.first_chunk_ms <= call.total_ms
+    assert call.queue_wait_ms >= 0
+    assert call.input_tokens > 0 and call.tokens_estimated
+
+@pytest.mark.asyncio
+async def test_failures_are_classified(telemetry):
+    service = make_service(FakeAgent("garbled"), bedrock_max_attempts=1)
+    service.telemetry = telemetry
+    with pytest.raises(ValueError):
+        await service.invoke_agent("bench 3x5")
+
+    breaker = CircuitBreaker("bedrock", failure_threshold=1)
+    breaker.record_failure()
+    blocked = make_service(FakeAgent(), breaker=breaker)
+    blocked.telemetry = telemetry
+    with pytest.raises(CircuitOpenError):
+        await blocked.invoke_agent("squat 5x5")
+
+    telemetry.flush()
+    garbled, rejected = recorded_calls()
+    assert garbled.outcome == "parse_error" and garbled.parse_failures == 1
+    assert rejected.outcome == "circuit_open" and rejected.attempts == 0
+
+def test_percentile_interpolates():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 95) == pytest.approx(95.05)
+    assert percentile([], 50) is None
+
+def test_report_aggregates_window(telemetry):
+    now = datetime.utcnow()
+    with TestingSessionLocal() as db:
+        for i in range(1, 101):
+            db.add(LLMCall(
+                started_at=now - timedelta(minutes=i), outcome="success" if i % 10 else "timeout",
+                attempts=2 if i % 4 == 0 else 1, total_ms=float(i), queue_wait_ms=0.0,
+                first_chunk_ms=None if i % 10 == 0 else float(i) / 2,
+                chunk_count=1, response_bytes=100, parse_failures=0
+            ))
+        # Outside the window
+        db.add(LLMCall(started_at=now - timedelta(days=30), outcome="success", attempts=1, total_ms=99999.0,
+                       queue_wait_ms=0.0, chunk_count=1, response_bytes=100, parse_failures=0))
+        db.commit()
+
+    report = telemetry.report(now - timedelta(days=1))
+
+    assert report["calls"] == 100
+    assert report["outcomes"] == {"success": 90, "timeout": 10}
+    assert report["retry_rate"] == pytest.approx(0.25)
+    assert report["latency_ms"]["total_ms"]["p95"] == pytest.approx(95.05)
+    assert report["latency_ms"]["total_ms"]["max"] == 100
+    assert report["latency_ms"]["first_chunk_ms"]["count"] == 90
+
+def test_telemetry_endpoint(client, telemetry, monkeypatch):
+    monkeypatch.setattr("app.routes.telemetry.get_llm_telemetry", lambda: telemetry)
+    response = client.get("/api/telemetry/llm", params={"hours": 24})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["calls"] == 0
+    assert body["latency_ms"]["total_ms"]["p95"] is None
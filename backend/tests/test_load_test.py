@@ -0,0 +1,55 @@
+import httpx
+import pytest
+from app.main import app
+from app.models import User
+from app.services.workout_storage_service import WorkoutStorageService
+from benchmarks.load_test import find_saturation, harness_app, parse_mix, run_level
+
+@pytest.fixture
+def harness(monkeypatch):
+    # Route changes are undone afterwards so other tests see the production app
+    monkeypatch.setattr(app.router, "routes", list(app.router.routes))
+    return harness_app()
+
+def test_parse_mix():
+    assert parse_mix("chat=1,dashboard=4") == {"chat": 1.0, "dashboard": 4.0}
+    assert parse_mix("export") == {"export": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("upload=1")
+    with pytest.raises(ValueError):
+        parse_mix("chat=0")
+
+def test_saturation_is_first_level_near_peak():
+    levels = [{"concurrency": c, "throughput_rps": rps} for c, rps in [(1, 20), (2, 38), (4, 60), (8, 62), (16, 55)]]
+    assert find_saturation(levels)["concurrency"] == 4
+    assert find_saturation(levels, knee=0.0)["concurrency"] == 8
+    assert find_saturation([]) is None
+
+@pytest.mark.asyncio
+async def test_run_level_reports_per_route(client, test_session, harness):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    test_session.commit()
+    storage = WorkoutStorageService(test_session)
+    session = storage.create_workout_session(1)
+    storage.store_exercise_data(session.id, "Bench Press", "push", num_sets=1, reps=[5], weight=[100.0], total_volume=500,
+                                muscle_activations=[{"muscle_name": "triceps", "activation_level": "SECONDARY", "estimated_volume": 0.7}])
+    storage.end_workout_session(session.id)
+    test_session.commit()
+
+    # One virtual user: the in-memory test database is a single shared connection
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=harness), base_url="http://test") as http:
+        level = await run_level(http, 1, {"dashboard": 1, "export": 1}, [1], duration=0.5)
+
+    assert level["concurrency"] == 1 and level["requests"] > 0 and level["error_rate"] == 0
+    assert set(level["routes"]) == {
+        "GET /api/workout/user-sessions/{user_id}", "GET /api/analytics/muscle-tracking", "GET /api/reports/export"
+    }
+    tracking = level["routes"]["GET /api/analytics/muscle-tracking"]
+    # The virtual user revalidates its previous response
+    assert set(tracking["statuses"]) <= {"200", "304"} and tracking["p50_ms"] <= tracking["p95_ms"]
+
+def test_report_routes_are_only_mounted_for_the_harness(harness):
+    assert any(route.path == "/api/reports/export" for route in harness.routes)
+
+def test_production_app_has_no_report_routes():
+    assert not any(route.path.startswith("/api/reports/") for route in app.routes)
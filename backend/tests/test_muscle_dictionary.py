@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+from app.models.user import User
+from app.models.exercise import WorkoutSession, Muscle
+from app.services.workout_storage_service import WorkoutStorageService
+from app.services.analysis_service import AnalysisService
+from app.services.muscle_dictionary_service import MuscleDictionaryService, normalize_muscle_name
+
+def test_normalize_muscle_name():
+    assert normalize_muscle_name("Front Deltoids") == "front_deltoids"
+    assert normalize_muscle_name(" gluteus_maximus ") == "gluteus_maximus"
+
+def test_ids_round_trip(test_db, test_session):
+    muscles = MuscleDictionaryService(test_session)
+    chest = muscles.id_for("Chest")
+    assert muscles.id_for("chest") == chest
+    assert muscles.name_for(chest) == "chest"
+    # Known muscles from the pattern catalog are seeded up front
+    assert muscles.lookup_id("quadriceps") is not None
+    assert muscles.lookup_id("never seen") is None
+
+def test_lookup_never_writes(test_db, test_session):
+    muscles = MuscleDictionaryService(test_session)
+    assert muscles.lookup_id("chest") is None
+    assert not test_session.new and test_session.query(Muscle).count() == 0
+
+    # Ingest seeds the dictionary, after which known muscles resolve on reads
+    muscles.ensure_dictionary()
+    test_session.commit()
+    assert muscles.lookup_id("quadriceps") is not None
+
+def test_rolled_back_muscle_is_not_cached(test_db, test_session):
+    muscles = MuscleDictionaryService(test_session)
+    muscles.id_for("quadriceps")
+    test_session.commit()
+
+    muscles.id_for("serratus")
+    test_session.rollback()
+
+    assert test_session.query(Muscle).filter(Muscle.name == "serratus").count() == 0
+    assert muscles.lookup_id("serratus") is None
+
+def test_muscle_balance_groups_spellings(test_db, test_session):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    session = WorkoutSession(user_id=1, start_time=datetime.utcnow() - timedelta(days=1))
+    test_session.add(session)
+    test_session.commit()
+
+    storage = WorkoutStorageService(test_session)
+    for muscle_name in ["Chest", "chest"]:
+        storage.store_exercise_data(
+            session_id=session.id,
+            name="Bench Press",
+            muscle_activations=[{"muscle_name": muscle_name, "activation_level": "PRIMARY", "estimated_volume": 100.0}],
+        )
+
+    exercise = storage.get_session_exercises(session.id)[0]
+    assert exercise.to_dict()["muscle_activations"][0]["muscle_name"] == "chest"
+
+    balance = AnalysisService(test_session).analyze_muscle_balance(1)
+    assert [(m.muscle_name, m.total_volume, m.frequency) for m in balance] == [("chest", 200.0, 2)]
@@ -0,0 +1,101 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models.user import User
+from app.models.exercise import WorkoutSession
+from app.models.progress import RecordType
+from app.services.workout_storage_service import WorkoutStorageService
+from app.services.personal_record_service import (
+    PersonalRecordService,
+    epley_1rm,
+    brzycki_1rm,
+)
+
+@pytest.fixture
+def storage(test_db, test_session):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    test_session.commit()
+    return WorkoutStorageService(test_session)
+
+def log_bench(storage, session_id, reps, weight, total_volume=None):
+    return storage.store_exercise_data(
+        session_id=session_id,
+        name="Bench Press",
+        reps=reps,
+        weight=weight,
+        total_volume=total_volume,
+    )
+
+def start_session(test_session, start_time):
+    session = WorkoutSession(user_id=1, start_time=start_time)
+    test_session.add(session)
+    test_session.commit()
+    return session
+
+def test_formulas():
+    assert epley_1rm(100, 1) == 100
+    assert epley_1rm(100, 10) == pytest.approx(133.33, rel=1e-3)
+    assert brzycki_1rm(100, 10) == pytest.approx(133.33, rel=1e-3)
+    assert brzycki_1rm(100, 40) is None
+
+def test_records_are_updated_incrementally(storage, test_session):
+    service = PersonalRecordService(test_session)
+    first = start_session(test_session, datetime.utcnow() - timedelta(days=7))
+    log_bench(storage, first.id, [5, 5, 5], [185, 185, 185], total_volume=2775)
+
+    heaviest = service.get_record(1, "bench press", RecordType.HEAVIEST_SET)
+    assert heaviest.value == 185
+    assert service.get_record(1, "Bench Press", RecordType.REP_MAX, reps=5).value == 185
+
+    second = start_session(test_session, datetime.utcnow())
+    log_bench(storage, second.id, [3], [205], total_volume=615)
+
+    assert service.get_record(1, "bench press", RecordType.HEAVIEST_SET).value == 205
+    # Lower-volume day does not replace the volume record
+    assert service.get_record(1, "bench press", RecordType.BEST_VOLUME_DAY).value == 2775
+    # Untouched rep counts keep their original records
+    assert service.get_record(1, "bench press", RecordType.REP_MAX, reps=5).value == 185
+    assert service.get_record(1, "bench press", RecordType.ESTIMATED_1RM).value == pytest.approx(epley_1rm(205, 3))
+
+    series = service.get_e1rm_series(1, "BENCH PRESS")
+    assert [round(p.value, 2) for p in series] == [round(epley_1rm(185, 5), 2), round(epley_1rm(205, 3), 2)]
+
+def test_single_weight_applies_to_every_set(storage, test_session):
+    session = start_session(test_session, datetime.utcnow())
+    log_bench(storage, session.id, [8, 8, 6], [135])
+
+    service = PersonalRecordService(test_session)
+    assert service.get_record(1, "bench press", RecordType.REP_MAX, reps=6).value == 135
+    assert service.get_record(1, "bench press", RecordType.BEST_VOLUME_DAY).value == 135 * 22
+
+def test_personal_records_endpoint(client, storage, test_session):
+    session = start_session(test_session, datetime.utcnow())
+    log_bench(storage, session.id, [5], [225])
+    # The app shares the in-memory connection, so release this session's transaction
+    test_session.commit()
+
+    response = client.get("/api/analysis/personal-records/bench press/heaviest_set?user_id=1")
+    assert response.status_code == 200
+    assert response.json()["value"] == 225
+
+    response = client.get("/api/analysis/personal-records/squat/heaviest_set?user_id=1")
+    assert response.status_code == 404
+
+def test_rebuild_matches_incremental_records(storage, test_session):
+    service = PersonalRecordService(test_session)
+    morning = start_session(test_session, datetime(2024, 3, 4, 8))
+    log_bench(storage, morning.id, [5, 5, 5], [185, 185, 185], total_volume=2775)
+    evening = start_session(test_session, datetime(2024, 3, 4, 18))
+    log_bench(storage, evening.id, [3], [205], total_volume=615)
+    log_bench(storage, start_session(test_session, datetime(2024, 3, 11)).id, [8, 8], [135])
+
+    def snapshot():
+        records = sorted(
+            (r.exercise_name, r.record_type.value, r.reps, round(r.value, 4), r.weight, r.set_reps, r.exercise_id)
+            for r in service.get_records(1)
+        )
+        return records, [round(p.value, 4) for p in service.get_e1rm_series(1, "bench press")]
+
+    incremental = snapshot()
+    assert service.rebuild() == len(incremental[0])
+    test_session.commit()
+    assert snapshot() == incremental
@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+from app.services.request_coalescer import RequestCoalescer, coalescing_key, normalize_workout_text
+from tests.test_bedrock_resilience import AGENT_REPLY, FakeAgent, make_service
+
+class FakeRedis:
+    """The handful of async redis commands the coalescer uses, kept in a dict"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise ConnectionError("redis down")
+        return fail
+
+def counting_call(result, delay=0.02):
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+    return calls, call
+
+def test_normalization_ignores_case_and_spacing():
+    assert normalize_workout_text("  Bench Press\n3x5   @ 100kg ") == "bench press 3x5 @ 100kg"
+    assert coalescing_key("Squat 5x5") == coalescing_key("squat   5x5")
+    assert coalescing_key("squat 5x5") != coalescing_key("squat 5x3")
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_one_call():
+    coalescer = RequestCoalescer()
+    calls, call = counting_call({"sets": [5, 5, 5]})
+
+    results = await asyncio.gather(*(coalescer.run("k", call) for _ in range(5)))
+
+    assert len(calls) == 1
+    assert results == [{"sets": [5, 5, 5]}] * 5
+    results[0]["sets"].append(99)
+    assert results[1]["sets"] == [5, 5, 5]
+    assert coalescer.stats["coalesced"] == 4
+
+    # Nothing is cached in-process once the call has finished
+    await coalescer.run("k", call)
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_failure_is_shared_but_not_remembered():
+    coalescer = RequestCoalescer()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("throttled")
+
+    results = await asyncio.gather(*(coalescer.run("k", flaky) for _ in range(3)), return_exceptions=True)
+    assert len(attempts) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    with pytest.raises(RuntimeError):
+        await coalescer.run("k", flaky)
+    assert len(attempts) == 2
+
+@pytest.mark.asyncio
+async def test_workers_share_results_through_redis():
+    redis = FakeRedis()
+    worker_a = RequestCoalescer(redis=redis, poll_interval=0.005)
+    worker_b = RequestCoalescer(redis=redis, poll_interval=0.005)
+    calls, call = counting_call({"ok": True}, delay=0.05)
+
+    results = await asyncio.gather(worker_a.run("k", call), worker_b.run("k", call))
+
+    assert results == [{"ok": True}] * 2
+    assert len(calls) == 1
+    assert worker_b.stats["remote_hits"] == 1
+    assert "coalesce:lock:k" not in redis.data
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_direct_call():
+    coalescer = RequestCoalescer(redis=BrokenRedis())
+    calls, call = counting_call("result")
+    assert await coalescer.run("k", call) == "result"
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_agent_invocations_are_coalesced():
+    agent = FakeAgent(latency=0.05)
+    service = make_service(agent)
+    service.coalescer = RequestCoalescer()
+
+    results = await asyncio.gather(
+        service.invoke_agent("Bench 3x5 @ 100kg"),
+        service.invoke_agent("bench 3x5  @ 100kg"),
+        service.invoke_agent("BENCH 3x5 @ 100KG"),
+        service.invoke_agent("squat 5x5"),
+    )
+
+    assert results == [AGENT_REPLY] * 4
+    assert agent.calls == 2
+
+@pytest.mark.asyncio
+async def test_session_mode_never_shares_replies_across_users():
+    agent = FakeAgent(latency=0.05)
+    service = make_service(agent, bedrock_prompt_mode="session")
+    service.coalescer = RequestCoalescer(redis=FakeRedis(), poll_interval=0.005)
+
+    await asyncio.gather(
+        service.invoke_agent("bench 3x5", user_id=1),
+        service.invoke_agent("Bench 3x5", user_id=1),
+        service.invoke_agent("bench 3x5", user_id=2),
+    )
+    # A later request from another user isn't served the first user's published result
+    await service.invoke_agent("bench 3x5", user_id=3)
+
+    assert agent.calls == 3
+    assert len({params["sessionId"] for params in agent.params}) == 3
@@ -0,0 +1,38 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from app.core.responses import dumps
+from app.models.exercise import MuscleActivationLevel
+from app.routes.workout import WorkoutSummaryResponse
+from benchmarks.bench_serialization import build_exercises, summary_payload
+
+def test_dumps_handles_internal_types():
+    payload = {
+        "when": datetime(2025, 1, 6, 9, 30),
+        "level": MuscleActivationLevel.PRIMARY,
+        "volume": Decimal("12.5"),
+        "series": np.array([1.0, 2.0]),
+        7: "non-string key",
+    }
+    assert json.loads(dumps(payload)) == {
+        "when": "2025-01-06T09:30:00",
+        "level": "PRIMARY",
+        "volume": 12.5,
+        "series": [1.0, 2.0],
+        "7": "non-string key",
+    }
+
+def test_trusted_summary_matches_response_model():
+    start, end, exercises = build_exercises(3)
+    payload = summary_payload(start, end, exercises)
+
+    trusted = json.loads(dumps(payload))
+    validated = jsonable_encoder(WorkoutSummaryResponse(**payload))
+
+    # Same data, and the response model accepts the trusted body unchanged
+    assert WorkoutSummaryResponse(**trusted) == WorkoutSummaryResponse(**validated)
+    for key in validated:
+        if key != "exercises":
+            assert trusted[key] == validated[key]
@@ -0,0 +1,80 @@
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.models.user import User
+from app.models.exercise import WorkoutSession
+from app.services.workout_storage_service import WorkoutStorageService
+from tests.conftest import engine
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+def log_session(test_session, exercise_count):
+    storage = WorkoutStorageService(test_session)
+    session = WorkoutSession(user_id=1)
+    test_session.add(session)
+    test_session.commit()
+    for i in range(exercise_count):
+        storage.store_exercise_data(
+            session_id=session.id,
+            name=f"Movement {i}",
+            reps=[10, 10],
+            weight=[50, 50],
+            total_volume=1000.0,
+            muscle_activations=[
+                {"muscle_name": "chest", "activation_level": "PRIMARY", "estimated_volume": 1.0},
+                {"muscle_name": "triceps", "activation_level": "SECONDARY", "estimated_volume": 0.5},
+            ],
+        )
+    test_session.expire_all()
+    return session.id
+
+@pytest.fixture
+def user(test_db, test_session):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    test_session.commit()
+
+@pytest.mark.parametrize("exercise_count", [1, 8])
+def test_session_graph_uses_fixed_query_count(user, test_session, exercise_count):
+    session_id = log_session(test_session, exercise_count)
+    storage = WorkoutStorageService(test_session)
+
+    with count_queries() as statements:
+        session = storage.get_session_graph(session_id)
+        payload = [exercise.to_dict() for exercise in session.exercises]
+
+    assert len(payload) == exercise_count
+    assert all(len(ex["muscle_activations"]) == 2 for ex in payload)
+    assert {ma["muscle_name"] for ma in payload[0]["muscle_activations"]} == {"chest", "triceps"}
+    assert len(statements) == 3
+
+def test_session_exercises_load_activations_up_front(user, test_session):
+    session_id = log_session(test_session, 5)
+    storage = WorkoutStorageService(test_session)
+
+    with count_queries() as statements:
+        exercises = storage.get_session_exercises(session_id)
+        [exercise.to_dict() for exercise in exercises]
+
+    assert len(statements) == 2
+
+def test_summary_endpoint(user, test_session, client):
+    session_id = log_session(test_session, 3)
+    test_session.commit()
+
+    response = client.get(f"/api/workout/{session_id}/summary")
+    assert response.status_code == 200
+    body = response.json()
+    assert [ex["name"] for ex in body["exercises"]] == ["Movement 0", "Movement 1", "Movement 2"]
+    assert body["total_volume"] == pytest.approx(3000.0)
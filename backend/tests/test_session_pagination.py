@@ -0,0 +1,54 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models.user import User
+from app.models.exercise import WorkoutSession
+from app.services.workout_storage_service import WorkoutStorageService, encode_session_cursor
+
+@pytest.fixture
+def sessions(test_db, test_session):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    base = datetime(2025, 1, 1, 9, 0)
+    # Two sessions share a start time so the id tie-breaker is exercised
+    start_times = [base + timedelta(days=i) for i in range(5)] + [base + timedelta(days=2)]
+    for start_time in start_times:
+        test_session.add(WorkoutSession(user_id=1, start_time=start_time, total_volume=100.0))
+    test_session.add(WorkoutSession(user_id=2, start_time=base))
+    test_session.commit()
+    return WorkoutStorageService(test_session)
+
+def test_pages_cover_every_session_once(sessions):
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = sessions.list_user_sessions(1, limit=4, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert len(seen) == 6
+    assert len({s["id"] for s in seen}) == 6
+    keys = [(s["start_time"], s["id"]) for s in seen]
+    assert keys == sorted(keys, reverse=True)
+
+def test_date_range_filter(sessions):
+    page, cursor = sessions.list_user_sessions(
+        1,
+        start_date=datetime(2025, 1, 2),
+        end_date=datetime(2025, 1, 4)
+    )
+    assert cursor is None
+    assert [s["start_time"].day for s in page] == [3, 3, 2]
+
+def test_invalid_cursor_is_rejected(sessions):
+    with pytest.raises(ValueError):
+        sessions.list_user_sessions(1, cursor="not-a-cursor")
+
+def test_endpoint_returns_page_and_cursor(sessions, client):
+    response = client.get("/api/workout/user-sessions/1", params={"limit": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["sessions"]) == 2
+    assert body["next_cursor"] == encode_session_cursor(datetime(2025, 1, 4, 9, 0), 4)
+
+    assert client.get("/api/workout/user-sessions/1", params={"limit": 500}).status_code == 422
+    assert client.get("/api/workout/user-sessions/1", params={"cursor": "bogus"}).status_code == 400
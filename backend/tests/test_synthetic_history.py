@@ -0,0 +1,83 @@
+import json
+from datetime import date
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from app.data.exercise_patterns import EXERCISE_PATTERNS
+from app.models import Base, Exercise, MuscleActivation, User, WorkoutSession
+from app.services.personal_record_service import PersonalRecordService
+from app.services.workout_storage_service import WorkoutStorageService
+from benchmarks.synthetic_history import Catalog, HistoryConfig, LIFTS, generate_history, load_history
+
+CONFIG = HistoryConfig(users=3, weeks=104, seed=11, end=date(2026, 6, 28))
+CATALOG = Catalog(
+    canonical_ids={key: i for i, key in enumerate(LIFTS, start=1)},
+    muscle_ids={
+        activation["muscle_name"]: 0 for key in LIFTS for activation in EXERCISE_PATTERNS[key]["muscle_activations"]
+    },
+)
+
+def generate(config=CONFIG):
+    ids = {"users": 1, "workout_sessions": 1, "exercises": 1, "muscle_activations": 1}
+    return list(generate_history(config, CATALOG, ids))
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def test_same_seed_same_history():
+    assert generate() == generate()
+    other = HistoryConfig(users=3, weeks=104, seed=12, end=CONFIG.end)
+    assert generate(other) != generate()
+
+def test_history_looks_like_training():
+    user = generate()[0]
+    sessions = user["workout_sessions"]
+    days = {s[2][:10] for s in sessions}
+    assert sessions[-1][2] <= "2026-06-28 23:59"
+    # Missed weeks and layoffs leave gaps, but most weeks are trained
+    assert 0.6 * 104 * 3 < len(sessions) < 104 * 6
+    assert len(days) == len(sessions)
+
+    squat = [
+        json.loads(json.loads(exercise[7]))[0]
+        for exercise in user["exercises"] if exercise[3] == CATALOG.canonical_ids["squat"]
+    ]
+    assert sum(squat[-10:]) / 10 > 1.3 * sum(squat[:10]) / 10
+
+    lift_for = {canonical_id: key for key, canonical_id in CATALOG.canonical_ids.items()}
+    per_exercise = {}
+    for activation in user["muscle_activations"]:
+        per_exercise[activation[1]] = per_exercise.get(activation[1], 0) + 1
+    for exercise in user["exercises"]:
+        assert per_exercise[exercise[0]] == len(EXERCISE_PATTERNS[lift_for[exercise[3]]]["muscle_activations"])
+
+def test_loads_into_sqlite_after_existing_rows(file_engine):
+    Session = sessionmaker(bind=file_engine)
+    with Session() as db:
+        db.add(User(id=1, username="existing", email="existing@example.com"))
+        db.commit()
+
+    counts = load_history(file_engine, HistoryConfig(users=2, weeks=8, seed=3, end=date.today()), batch_rows=50)
+
+    with Session() as db:
+        assert db.query(User).count() == 3
+        assert db.query(func.count(WorkoutSession.id)).scalar() == counts["workout_sessions"] > 0
+        assert db.query(func.count(MuscleActivation.id)).scalar() == counts["muscle_activations"]
+
+        exercise = db.query(Exercise).order_by(Exercise.id).first()
+        data = exercise.to_dict()
+        assert data["num_sets"] == len(data["reps"]) == len(data["weight"])
+        assert {m["muscle_name"] for m in data["muscle_activations"]} <= {
+            a["muscle_name"] for key in LIFTS for a in EXERCISE_PATTERNS[key]["muscle_activations"]
+        }
+
+        tracking = WorkoutStorageService(db).get_muscle_tracking(days=30, user_id=2)
+        assert tracking and all(row["total_volume"] > 0 for row in tracking)
+
+        records = PersonalRecordService(db)
+        assert records.get_records(2)
+        assert records.get_e1rm_series(2, "squat")
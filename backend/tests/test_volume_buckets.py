@@ -0,0 +1,119 @@
+import pytest
+from datetime import datetime, timedelta
+from app.core.time_buckets import BucketSpec
+from app.models.user import User
+from app.models.exercise import WorkoutSession
+from app.services.workout_storage_service import WorkoutStorageService
+
+@pytest.fixture
+def storage(test_db, test_session):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    test_session.add(User(id=2, username="other", email="other@example.com"))
+    test_session.commit()
+    return WorkoutStorageService(test_session)
+
+def log_session(storage, test_session, start_time, volume, muscles=("chest",), user_id=1):
+    session = WorkoutSession(user_id=user_id, start_time=start_time, end_time=start_time + timedelta(hours=1))
+    test_session.add(session)
+    test_session.commit()
+    storage.store_exercise_data(
+        session_id=session.id,
+        name="Bench Press",
+        reps=[10],
+        weight=[volume / 10],
+        total_volume=volume,
+        muscle_activations=[
+            {"muscle_name": muscle, "activation_level": "PRIMARY", "estimated_volume": 1.0} for muscle in muscles
+        ],
+    )
+
+def test_bucket_alignment():
+    moment = datetime(2024, 3, 14, 17, 30)  # a Thursday
+    assert BucketSpec("day").floor(moment) == datetime(2024, 3, 14)
+    assert BucketSpec("week").floor(moment) == datetime(2024, 3, 11)
+    assert BucketSpec("month").floor(moment) == datetime(2024, 3, 1)
+    assert BucketSpec("mesocycle", 6).step == (0, 42)
+    assert BucketSpec("month").count(datetime(2023, 11, 20), datetime(2024, 3, 1)) == 4
+    assert BucketSpec("month").count(datetime(2023, 11, 20), datetime(2024, 3, 2)) == 5
+    assert BucketSpec("week").count(datetime(2024, 1, 3), datetime(2024, 1, 22)) == 3
+    with pytest.raises(ValueError):
+        BucketSpec("fortnight")
+
+def test_weekly_buckets_are_aggregated_and_zero_filled(storage, test_session):
+    monday = datetime(2024, 1, 1)
+    # Three sessions in the first week, nothing in the second, one in the third
+    for day, volume in ((0, 1000), (2, 1500), (4, 500), (15, 2000)):
+        log_session(storage, test_session, monday + timedelta(days=day, hours=18), volume)
+    log_session(storage, test_session, monday + timedelta(days=3), 9999, user_id=2)
+
+    rows = storage.get_muscle_volume_data(user_id=1, bucket="week", start=monday, end=monday + timedelta(days=21))
+
+    assert [(r["date"], r["total_volume"], r["exercise_count"]) for r in rows] == [
+        (monday, 3000.0, 3),
+        (monday + timedelta(days=7), 0.0, 0),
+        (monday + timedelta(days=14), 2000.0, 1),
+    ]
+    assert {r["muscle_name"] for r in rows} == {"chest"}
+
+def test_every_muscle_gets_every_bucket(storage, test_session):
+    start = datetime(2024, 1, 10)
+    log_session(storage, test_session, datetime(2024, 1, 12), 800, muscles=("chest", "triceps"))
+    log_session(storage, test_session, datetime(2024, 3, 5), 600, muscles=("lats",))
+
+    rows = storage.get_muscle_volume_data(user_id=1, bucket="month", start=start, end=datetime(2024, 3, 20))
+
+    months = [datetime(2024, 1, 1), datetime(2024, 2, 1), datetime(2024, 3, 1)]
+    assert [r["date"] for r in rows] == [month for month in months for _ in range(3)]
+    assert all({r["muscle_name"] for r in rows[i:i + 3]} == {"chest", "triceps", "lats"} for i in (0, 3, 6))
+    volumes = {(r["date"].month, r["muscle_name"]): r["total_volume"] for r in rows}
+    assert volumes[(1, "triceps")] == 800.0 and volumes[(2, "chest")] == 0.0 and volumes[(3, "lats")] == 600.0
+
+def test_mesocycles_and_range_validation(storage, test_session):
+    start = datetime(2024, 1, 3)
+    for week in range(9):
+        log_session(storage, test_session, start + timedelta(weeks=week), 100)
+
+    rows = storage.get_muscle_volume_data(user_id=1, bucket="mesocycle", mesocycle_weeks=4,
+                                          start=start, end=start + timedelta(weeks=9))
+
+    assert [(r["date"], r["total_volume"]) for r in rows] == [
+        (datetime(2024, 1, 1), 400.0), (datetime(2024, 1, 29), 400.0), (datetime(2024, 2, 26), 100.0),
+    ]
+    assert storage.get_muscle_volume_data(user_id=2) == []
+    with pytest.raises(ValueError):
+        storage.get_muscle_volume_data(user_id=1, start=start, end=start)
+    with pytest.raises(ValueError):
+        storage.get_muscle_volume_data(user_id=1, bucket="day", start=datetime(1990, 1, 1), end=start)
+
+def test_default_timeframes(storage, test_session):
+    now = datetime.utcnow()
+    log_session(storage, test_session, now - timedelta(days=2), 700)
+    log_session(storage, test_session, now - timedelta(days=20), 300)
+
+    weekly = storage.get_muscle_volume_data("weekly", user_id=1)
+    monthly = storage.get_muscle_volume_data("monthly", user_id=1)
+
+    assert len(weekly) == 8 and sum(r["total_volume"] for r in weekly) == 700.0
+    assert all(r["date"] == r["week_start"] for r in monthly)
+    assert sum(r["total_volume"] for r in monthly) == 1000.0
+
+def test_routes_accept_buckets_and_ranges(client, storage, test_session):
+    log_session(storage, test_session, datetime(2024, 1, 2, 9), 1200, muscles=("chest", "triceps"))
+    test_session.commit()
+
+    progression = client.get(
+        "/api/analytics/volume-progression?user_id=1&bucket=day&start=2024-01-01T00:00:00&end=2024-01-04T00:00:00"
+    )
+    volume = client.get(
+        "/api/analytics/muscle-volume?user_id=1&timeframe=weekly&bucket=week&start=2024-01-01T00:00:00Z&end=2024-01-08T00:00:00Z"
+    )
+    backwards = client.get("/api/analytics/muscle-volume?user_id=1&timeframe=weekly&start=2024-02-01T00:00:00&end=2024-01-01T00:00:00")
+
+    assert progression.status_code == 200
+    assert progression.json()["chest"] == [
+        {"date": "2024-01-01T00:00:00", "volume": 0.0},
+        {"date": "2024-01-02T00:00:00", "volume": 1200.0},
+        {"date": "2024-01-03T00:00:00", "volume": 0.0},
+    ]
+    assert sorted((r["muscle_name"], r["total_volume"]) for r in volume.json()) == [("chest", 1200.0), ("triceps", 1200.0)]
+    assert backwards.status_code == 400
@@ -0,0 +1,81 @@
+import pytest
+import threading
+from datetime import datetime
+from app.core.settings import Settings
+from app.models.user import User
+from app.models.exercise import WorkoutSession
+from app.services import warmup_service
+from app.services.warmup_service import WarmupService
+from app.services.exercise_identity_service import alias_cache
+from app.services.muscle_dictionary_service import muscle_cache
+from tests.conftest import engine, TestingSessionLocal
+
+def make_settings(**overrides):
+    values = dict(warmup_db_connections=1, warmup_redis=False, warmup_bedrock=False, warmup_user_id=None)
+    values.update(overrides)
+    return Settings(**values)
+
+def test_warmup_loads_caches_and_runs_queries(test_db, test_session):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    test_session.add(WorkoutSession(user_id=1, start_time=datetime(2025, 1, 6, 9, 0)))
+    test_session.commit()
+
+    warmed = []
+    report = WarmupService(
+        engine, TestingSessionLocal, make_settings(), cache_warmers=[warmed.append]
+    ).run()
+
+    steps = {step.name: step for step in report.steps}
+    assert report.ready and warmup_service.last_report is report
+    assert set(steps) == {"db_pool", "lookup_caches", "analytics_queries"}
+    assert steps["db_pool"].ok and steps["lookup_caches"].ok
+    assert steps["analytics_queries"].detail.startswith("user 1")
+    assert alias_cache.loaded and muscle_cache.loaded
+    assert len(warmed) == 1
+
+def test_failing_backends_do_not_abort_warmup(test_db, monkeypatch):
+    def unreachable(self):
+        raise ConnectionError("redis unavailable")
+
+    monkeypatch.setattr(WarmupService, "ping_redis", unreachable)
+    report = WarmupService(engine, TestingSessionLocal, make_settings(warmup_redis=True)).run()
+
+    steps = {step.name: step for step in report.steps}
+    assert report.ready
+    assert not steps["redis"].ok and "unavailable" in steps["redis"].detail
+    assert steps["analytics_queries"].detail == "no users yet"
+
+def test_health_reports_warmup(client, monkeypatch):
+    report = warmup_service.WarmupReport()
+    monkeypatch.setattr(warmup_service, "last_report", report)
+    assert client.get("/health").status_code == 503
+
+    report.completed_at = datetime.utcnow()
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["warmup"]["ready"] is True
+
+@pytest.mark.asyncio
+async def test_timed_out_warmup_reports_ready(test_db, client, monkeypatch):
+    release, finished = threading.Event(), threading.Event()
+
+    def stuck(self):
+        release.wait(5)
+        finished.set()
+        return "late"
+
+    # Keep the background thread off the shared test connection
+    monkeypatch.setattr(WarmupService, "warm_db_pool", lambda self: "skipped")
+    monkeypatch.setattr(WarmupService, "warm_lookup_caches", lambda self: "skipped")
+    monkeypatch.setattr(WarmupService, "run_analytics_queries", stuck)
+    warmup = WarmupService(engine, TestingSessionLocal, make_settings())
+    try:
+        report = await warmup.run_with_timeout(0.05)
+        assert report.ready and report.timed_out
+
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json()["warmup"]["timed_out"] is True
+    finally:
+        release.set()
+        finished.wait(5)
@@ -0,0 +1,149 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.models.user import User
+from app.models.exercise import MuscleTracking, WorkoutSession
+from app.services.muscle_dictionary_service import MuscleDictionaryService
+from app.services.workout_storage_service import WorkoutStorageService
+from app.services.workload_service import (
+    ACUTE_RATE,
+    CHRONIC_RATE,
+    WorkloadService,
+    WorkloadState,
+    assess_workload,
+)
+from tests.conftest import engine
+
+START = datetime(2024, 1, 1, 18)
+
+@pytest.fixture
+def storage(test_db, test_session):
+    test_session.add(User(id=1, username="lifter", email="lifter@example.com"))
+    test_session.commit()
+    return WorkoutStorageService(test_session)
+
+def log_workout(storage, test_session, start_time, volume, muscles=(("quadriceps", 1.0), ("glutes", 0.5))):
+    session = WorkoutSession(user_id=1, start_time=start_time, end_time=start_time + timedelta(hours=1))
+    test_session.add(session)
+    test_session.commit()
+    storage.store_exercise_data(
+        session_id=session.id,
+        name="Squat",
+        reps=[5, 5],
+        weight=[volume / 10, volume / 10],
+        total_volume=volume,
+        muscle_activations=[
+            {"muscle_name": muscle, "activation_level": "PRIMARY", "estimated_volume": share} for muscle, share in muscles
+        ],
+    )
+
+def daily_ewma(loads, rate, days):
+    """Textbook day-by-day EWMA over days of (day -> load)"""
+    value = 0.0
+    for day in range(days):
+        value = rate * loads.get(day, 0.0) + (1 - rate) * value
+    return value
+
+def tracking_row(test_session, muscle_name):
+    muscle_id = MuscleDictionaryService(test_session).lookup_id(muscle_name)
+    return test_session.query(MuscleTracking).filter_by(user_id=1, muscle_id=muscle_id).one()
+
+def test_incremental_state_matches_daily_replay():
+    loads = {0: 3000.0, 2: 2500.0, 5: 4000.0, 9: 1000.0, 30: 3500.0}
+    state = WorkloadState(0.0, 0.0, None)
+    for day in sorted(loads):
+        state = state.add(loads[day], START + timedelta(days=day))
+    state = state.at(START + timedelta(days=40))
+
+    assert state.acute == pytest.approx(daily_ewma(loads, ACUTE_RATE, 41))
+    assert state.chronic == pytest.approx(daily_ewma(loads, CHRONIC_RATE, 41))
+
+    backdated = WorkloadState(0.0, 0.0, None)
+    for day in (0, 5, 30, 2, 9):
+        backdated = backdated.add(loads[day], START + timedelta(days=day))
+    backdated = backdated.at(START + timedelta(days=40))
+    assert (backdated.acute, backdated.chronic) == (pytest.approx(state.acute), pytest.approx(state.chronic))
+
+def test_status_bands():
+    now = START + timedelta(days=60)
+    started = START
+    assert assess_workload(0.0, 0.0, None, now) == ("Undertrained", 1.0, None)
+    assert assess_workload(100.0, 100.0, started, now) == ("Optimal", 1.0, 1.0)
+    assert assess_workload(70.0, 100.0, started, now)[0] == "Undertrained"
+    assert assess_workload(140.0, 100.0, started, now)[0] == "Overreaching"
+    status, recovery, ratio = assess_workload(200.0, 100.0, started, now)
+    assert (status, recovery, ratio) == ("Overtrained", 0.5, 2.0)
+    assert assess_workload(200.0, 100.0, now - timedelta(days=10), now)[0] == "Building"
+
+def test_state_is_maintained_at_ingest(storage, test_session):
+    for week in range(6):
+        log_workout(storage, test_session, START + timedelta(weeks=week), 3000.0)
+
+    quads = tracking_row(test_session, "quadriceps")
+    glutes = tracking_row(test_session, "glutes")
+    expected = daily_ewma({7 * week: 3000.0 for week in range(6)}, ACUTE_RATE, 36)
+    assert quads.acute_load == pytest.approx(expected)
+    assert glutes.acute_load == pytest.approx(expected / 2)
+    assert quads.load_started_at == START and quads.last_trained == quads.load_updated_at == START + timedelta(weeks=5)
+    assert test_session.query(MuscleTracking).count() == 2
+
+def test_update_cost_does_not_grow_with_history(storage, test_session):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        counts = []
+        for day in range(40):
+            statements.clear()
+            log_workout(storage, test_session, START + timedelta(days=day), 2000.0)
+            counts.append(sum("muscle_tracking" in sql for sql in statements))
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert set(counts[1:]) == {counts[1]}
+    assert all("FROM muscle_activations" not in sql for sql in statements if "muscle_tracking" in sql)
+
+def test_tracking_reads_recovery_from_state(storage, test_session):
+    now = datetime.utcnow()
+    # Steady training for two months, then a much heavier week
+    for day in range(60, 7, -3):
+        log_workout(storage, test_session, now - timedelta(days=day), 2000.0)
+    for day in (6, 4, 2, 1):
+        log_workout(storage, test_session, now - timedelta(days=day), 9000.0)
+
+    tracking = {row["muscle_name"]: row for row in storage.get_muscle_tracking(user_id=1)}
+
+    quads = tracking["quadriceps"]
+    assert quads["status"] == "Overtrained"
+    assert quads["acute_chronic_ratio"] > 1.5
+    assert quads["recovery_status"] == pytest.approx(1 / quads["acute_chronic_ratio"])
+    assert quads["acute_load"] > quads["chronic_load"] > 0
+
+def test_rebuild_matches_incremental_state(storage, test_session):
+    for day in (0, 3, 10, 7, 20):  # one back-dated log
+        log_workout(storage, test_session, START + timedelta(days=day), 1000.0 + day)
+    incremental = {row.muscle_id: (row.acute_load, row.chronic_load, row.load_updated_at, row.load_started_at)
+                   for row in test_session.query(MuscleTracking)}
+
+    assert WorkloadService(test_session).rebuild(user_id=1) == 2
+    test_session.commit()
+
+    for row in test_session.query(MuscleTracking):
+        acute, chronic, updated_at, started_at = incremental[row.muscle_id]
+        assert row.acute_load == pytest.approx(acute) and row.chronic_load == pytest.approx(chronic)
+        assert (row.load_updated_at, row.load_started_at) == (updated_at, started_at)
+    assert test_session.query(MuscleTracking).count() == 2
+
+def test_first_workout_tolerates_a_concurrently_created_row(storage, test_session):
+    # Another ingest created the row between this one's start and its upsert
+    muscle_id = MuscleDictionaryService(test_session).id_for("quadriceps")
+    test_session.add(MuscleTracking(user_id=1, muscle_id=muscle_id, acute_load=100.0, chronic_load=50.0,
+                                    load_updated_at=START, load_started_at=START, last_trained=START))
+    test_session.commit()
+
+    log_workout(storage, test_session, START, 1000.0)
+
+    quads = tracking_row(test_session, "quadriceps")
+    assert quads.acute_load == pytest.approx(100.0 + ACUTE_RATE * 1000.0)
+    assert quads.chronic_load == pytest.approx(50.0 + CHRONIC_RATE * 1000.0)
+    assert test_session.query(MuscleTracking).count() == 2
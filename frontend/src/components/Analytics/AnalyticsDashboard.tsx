@@ -147,7 +147,7 @@ const AnalyticsDashboard: React.FC = () => {
             <Typography variant="h5" gutterBottom sx={{ mb: 3 }}>
               Volume Progression
             </Typography>
-            <VolumeProgressionChart data={progressionData || []} />
+            <VolumeProgressionChart data={progressionData || {}} />
           </Paper>
         </Grid>
       </Grid>
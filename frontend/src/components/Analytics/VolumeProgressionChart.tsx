@@ -10,15 +10,16 @@ import {
   Legend,
   ResponsiveContainer,
 } from 'recharts';
-import { VolumeProgressionData } from '../../types/exercise';
+import { VolumeProgressionResponse } from '../../types/exercise';
 
 interface VolumeProgressionChartProps {
-  data: VolumeProgressionData[];
+  data: VolumeProgressionResponse;
 }
 
 const VolumeProgressionChart: React.FC<VolumeProgressionChartProps> = ({ data }) => {
   // Handle empty or undefined data
-  if (!data || !Array.isArray(data) || data.length === 0) {
+  const muscles = Object.keys(data || {});
+  if (muscles.length === 0) {
     return (
       <Box sx={{ p: 2, textAlign: 'center' }}>
         <Typography sx={{ color: '#fff' }}>
@@ -34,18 +35,8 @@ const VolumeProgressionChart: React.FC<VolumeProgressionChartProps> = ({ data })
     return new Intl.NumberFormat().format(Math.round(value));
   };
 
-  // Group data by date and muscle
-  const groupedData = data.reduce((acc, item) => {
-    const date = new Date(item.date).toLocaleDateString();
-    if (!acc[date]) {
-      acc[date] = { date };
-    }
-    acc[date][item.muscle_name] = item.total_volume;
-    return acc;
-  }, {} as Record<string, any>);
+  const formatDate = (value: string) => new Date(value).toLocaleDateString();
 
-  const chartData = Object.values(groupedData);
-  const muscles = Array.from(new Set(data.map(item => item.muscle_name)));
   const colors = ['#8884d8', '#82ca9d', '#ffc658', '#ff7300', '#ff0000', '#0088FE', '#00C49F'];
 
   return (
@@ -54,10 +45,14 @@ const VolumeProgressionChart: React.FC<VolumeProgressionChartProps> = ({ data })
         Volume Progression
       </Typography>
       <ResponsiveContainer>
-        <LineChart data={chartData}>
+        <LineChart>
           <CartesianGrid strokeDasharray="3 3" stroke="rgba(255,255,255,0.1)" />
+          {/* Each muscle is its own series on the API's shared bucket dates; list each date once */}
           <XAxis 
             dataKey="date" 
+            type="category"
+            allowDuplicatedCategory={false}
+            tickFormatter={formatDate}
             tick={{ fill: '#fff', fontSize: 12 }}
             stroke="rgba(255,255,255,0.3)"
           />
@@ -74,6 +69,7 @@ const VolumeProgressionChart: React.FC<VolumeProgressionChartProps> = ({ data })
               fontSize: 12,
             }}
             labelStyle={{ color: '#fff', fontWeight: 'bold' }}
+            labelFormatter={formatDate}
             formatter={formatVolume}
           />
           <Legend 
@@ -83,8 +79,9 @@ const VolumeProgressionChart: React.FC<VolumeProgressionChartProps> = ({ data })
           {muscles.map((muscle, index) => (
             <Line
               key={muscle}
+              data={data[muscle]}
               type="monotone"
-              dataKey={muscle}
+              dataKey="volume"
               stroke={colors[index % colors.length]}
               name={muscle}
               dot={false}
@@ -31,15 +31,16 @@ describe('useVolumeProgression', () => {
   });
 
   it('fetches volume progression data successfully', async () => {
-    const mockData = [
-      {
-        date: '2025-01-16',
-        total_volume: 3000,
-        chest_volume: 800,
-        back_volume: 900,
-        legs_volume: 1300,
-      },
-    ];
+    const mockData = {
+      chest: [
+        { date: '2025-01-15T00:00:00', volume: 0 },
+        { date: '2025-01-16T00:00:00', volume: 800 },
+      ],
+      lats: [
+        { date: '2025-01-15T00:00:00', volume: 900 },
+        { date: '2025-01-16T00:00:00', volume: 0 },
+      ],
+    };
 
     mockFetchVolumeProgressionData.mockResolvedValueOnce(mockData);
 
@@ -73,15 +74,16 @@ describe('useVolumeProgression', () => {
   });
 
   it('refetches data when timeframe changes', async () => {
-    const mockData = [
-      {
-        date: '2025-01-16',
-        total_volume: 3000,
-        chest_volume: 800,
-        back_volume: 900,
-        legs_volume: 1300,
-      },
-    ];
+    const mockData = {
+      chest: [
+        { date: '2025-01-15T00:00:00', volume: 0 },
+        { date: '2025-01-16T00:00:00', volume: 800 },
+      ],
+      lats: [
+        { date: '2025-01-15T00:00:00', volume: 900 },
+        { date: '2025-01-16T00:00:00', volume: 0 },
+      ],
+    };
 
     mockFetchVolumeProgressionData.mockResolvedValue(mockData);
 
@@ -1,8 +1,8 @@
 import { useQuery } from '@tanstack/react-query';
 import { fetchVolumeProgressionData } from '../services/analytics';
-import { VolumeProgressionData } from '../types/exercise';
+import { VolumeProgressionResponse } from '../types/exercise';
 
-export const useVolumeProgression = (timeframe: 'weekly' | 'monthly'): { data: VolumeProgressionData[] | undefined, isLoading: boolean } => {
+export const useVolumeProgression = (timeframe: 'weekly' | 'monthly'): { data: VolumeProgressionResponse | undefined, isLoading: boolean } => {
   return useQuery({
     queryKey: ['volumeProgression', timeframe],
     queryFn: () => fetchVolumeProgressionData(timeframe),
@@ -1,6 +1,9 @@
-import { MuscleTrackingStatus, MuscleVolumeData, VolumeProgressionData, VolumeProgressionResponse } from '../types/exercise';
+import { MuscleTrackingStatus, MuscleVolumeData, VolumeProgressionResponse } from '../types/exercise';
 import { API_BASE_URL, ENDPOINTS } from '../config';
 
+// Points per muscle the volume chart can usefully draw; the API downsamples longer histories
+const MAX_CHART_POINTS = 200;
+
 export const fetchMuscleData = async (): Promise<MuscleTrackingStatus[]> => {
   // TODO: Get actual user ID from auth context. Using 1 for now.
   const userId = 1;
@@ -35,10 +38,10 @@ export const fetchMuscleVolumeData = async (timeframe: 'weekly' | 'monthly'): Pr
   return response.json();
 };
 
-export const fetchVolumeProgressionData = async (timeframe: 'weekly' | 'monthly'): Promise<VolumeProgressionData[]> => {
+export const fetchVolumeProgressionData = async (timeframe: 'weekly' | 'monthly'): Promise<VolumeProgressionResponse> => {
   // TODO: Get actual user ID from auth context. Using 1 for now.
   const userId = 1;
-  const response = await fetch(`${ENDPOINTS.VOLUME_PROGRESSION}?timeframe=${timeframe}&user_id=${userId}`, {
+  const response = await fetch(`${ENDPOINTS.VOLUME_PROGRESSION}?timeframe=${timeframe}&user_id=${userId}&max_points=${MAX_CHART_POINTS}`, {
     method: 'GET',
     headers: {
       'Content-Type': 'application/json',
@@ -49,16 +52,6 @@ export const fetchVolumeProgressionData = async (timeframe: 'weekly' | 'monthly'
     throw new Error('Failed to fetch volume progression data');
   }
 
-  const data: VolumeProgressionResponse = await response.json();
-  
-  // Transform the data into the expected format
-  const transformedData: VolumeProgressionData[] = Object.entries(data).flatMap(([muscleName, dataPoints]) =>
-    dataPoints.map(point => ({
-      muscle_name: muscleName,
-      date: point.date,
-      total_volume: point.volume,
-    }))
-  );
-
-  return transformedData;
+  // One gap-filled series per muscle on shared bucket dates, ready to chart
+  return response.json();
 };
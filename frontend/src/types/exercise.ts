@@ -53,9 +53,3 @@ export interface VolumeDataPoint {
 export interface VolumeProgressionResponse {
   [muscleName: string]: VolumeDataPoint[];
 }
-
-export interface VolumeProgressionData {
-  muscle_name: string;
-  date: string;
-  total_volume: number;
-}